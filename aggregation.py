@@ -0,0 +1,241 @@
+"""
+🧊 AGGREGATION CUBE
+Aadhaar Life Cycle Intelligence Platform
+
+Scans the enrolment, biometric and demographic rows once into a single
+(state, district, pincode, date) cube holding every count column plus a row
+count per source. All innovation calculators are then fed from small rollups
+of that cube instead of grouping the row-level data themselves.
+
+The cube doubles as the pincode-day fact table: the three sources are joined
+by a sort-merge on integer state_id / district_id surrogate keys, and the
+rows stay sorted by date and pincode, so district and pincode level
+cross-dataset metrics are column arithmetic on one frame (see facts.py).
+
+Works on clean row-level frames as well as on the incremental pincode-day
+rollups produced by ingestion.py (which carry a 'rows' column).
+"""
+
+import numpy as np
+import pandas as pd
+from ingestion import DATASETS, PINCODE_DTYPE
+
+# Grain of the cube
+CUBE_KEYS = ['state', 'district', 'pincode', 'date']
+
+# Row order of the cube as a fact table (state_id / district_id are surrogate keys)
+FACT_ORDER = ['date', 'pincode', 'district_id']
+KEY_DTYPE = np.int32
+
+# Row-count column recorded for each source dataset
+ROW_COLUMNS = {
+    'enrolment': 'enrol_rows',
+    'biometric': 'bio_rows',
+    'demographic': 'demo_rows',
+}
+
+
+def measure_columns(name):
+    """Count and total columns of a dataset."""
+    spec = DATASETS[name]
+    return spec['counts'] + [spec['total']]
+
+
+def _aggregate_source(df, name):
+    """One groupby over a source frame, down to the cube grain."""
+    measures = measure_columns(name)
+    grouped = df.groupby(CUBE_KEYS, sort=False, observed=True)
+    out = grouped[measures].sum()
+    # Rollups already carry a row count; raw frames are counted here
+    out[ROW_COLUMNS[name]] = grouped['rows'].sum() if 'rows' in df.columns else grouped.size()
+    return out.reset_index()
+
+
+def _name_pairs(df):
+    """Code of each row's (state, district) pair, and the distinct pairs as plain strings."""
+    state_codes, state_names = pd.factorize(df['state'])
+    district_codes, district_names = pd.factorize(df['district'])
+    pairs, codes = np.unique(state_codes.astype(np.int64) * len(district_names) + district_codes,
+                             return_inverse=True)
+    return codes.ravel(), pd.DataFrame({
+        'state': np.asarray(state_names, dtype=str)[pairs // len(district_names)],
+        'district': np.asarray(district_names, dtype=str)[pairs % len(district_names)],
+    })
+
+
+def surrogate_keys(frames):
+    """
+    Integer dimension keys shared by several frames.
+
+    Returns (states, districts): alphabetical state names, and a frame of
+    (state, district) pairs sorted by name whose position is the district_id.
+    """
+    pairs = pd.concat([_name_pairs(df)[1] for df in frames]).drop_duplicates()
+    districts = pairs.sort_values(['state', 'district'], ignore_index=True)
+    return pd.Index(districts['state'].unique()), districts
+
+
+def encode_keys(df, states, districts):
+    """Add state_id / district_id columns from the dimension keys (only distinct pairs are looked up)."""
+    codes, pairs = _name_pairs(df)
+    district_id = pd.MultiIndex.from_frame(districts).get_indexer(pd.MultiIndex.from_frame(pairs))
+    return df.assign(
+        state_id=states.get_indexer(pairs['state'])[codes].astype(KEY_DTYPE),
+        district_id=district_id[codes].astype(KEY_DTYPE),
+    )
+
+
+def fact_keys(df):
+    """
+    One sortable int64 per row: (day, pincode, district_id) packed into bit fields.
+
+    Ordering by it is ordering by date, then pincode, then district.
+    """
+    days = df['date'].to_numpy().astype('datetime64[D]').astype(np.int64)
+    return (days << 40) | (df['pincode'].to_numpy().astype(np.int64) << 20) | df['district_id'].to_numpy()
+
+
+def merge_sorted(keys):
+    """
+    Outer sort-merge join of sorted fact-key arrays.
+
+    The merged key column is one stable sort over the concatenated sorted
+    runs (a run merge), and every input finds its rows in it by binary
+    search, so no hash table is built. Returns the merged unique keys and,
+    per input, the positions its rows occupy.
+    """
+    merged = np.sort(np.concatenate(keys), kind='stable')
+    if len(merged):
+        merged = merged[np.append(True, merged[1:] != merged[:-1])]
+    return merged, [np.searchsorted(merged, k) for k in keys]
+
+
+def _decode_names(district_id, states, districts):
+    """state_id and categorical state/district names of each row, from its district_id."""
+    district_state = states.get_indexer(districts['state']).astype(KEY_DTYPE)
+    district_names = pd.Index(np.sort(districts['district'].unique()))
+    state_id = district_state[district_id]
+    return state_id, {
+        'state': pd.Categorical.from_codes(state_id, categories=states),
+        'district': pd.Categorical.from_codes(district_names.get_indexer(districts['district'])[district_id],
+                                              categories=district_names),
+    }
+
+
+def build_cube(df_enrol, df_bio, df_demo):
+    """
+    Build the (date, pincode) fact table of the three sources, one pass per source.
+
+    Each source is grouped to the cube grain, given integer state_id /
+    district_id keys and sorted by FACT_ORDER; the three are then joined
+    with a sort-merge on those integer keys. A pincode that straddles
+    districts keeps one row per district.
+    """
+    print("\n🧊 Building aggregation cube...")
+
+    names = list(ROW_COLUMNS)
+    parts = [_aggregate_source(df, name) for df, name in zip([df_enrol, df_bio, df_demo], names)]
+    states, districts = surrogate_keys(parts)
+    keys = [fact_keys(encode_keys(df, states, districts)) for df in parts]
+    orders = [np.argsort(k, kind='stable') for k in keys]
+    parts = [df.take(order) for df, order in zip(parts, orders)]
+    merged, positions = merge_sorted([k[order] for k, order in zip(keys, orders)])
+
+    district_id = (merged & ((1 << 20) - 1)).astype(KEY_DTYPE)
+    state_id, labels = _decode_names(district_id, states, districts)
+    cube = pd.DataFrame({
+        **labels,
+        'pincode': ((merged >> 20) & ((1 << 20) - 1)).astype(PINCODE_DTYPE),
+        'date': (merged >> 40).astype('datetime64[D]').astype(parts[0]['date'].dtype),
+        'state_id': state_id,
+        'district_id': district_id,
+    })
+    for df, name, rows in zip(parts, names, positions):
+        for col in measure_columns(name) + [ROW_COLUMNS[name]]:
+            values = np.zeros(len(merged), dtype=np.int64)
+            values[rows] = df[col].to_numpy()
+            cube[col] = values
+
+    print(f"   Cube cells: {len(cube):,}")
+
+    return cube
+
+
+def as_fact_table(cube):
+    """Give a cube joined elsewhere (the polars backend) the same surrogate keys and row order."""
+    states, districts = surrogate_keys([cube])
+    cube = encode_keys(cube, states, districts)
+    cube = cube.take(np.argsort(fact_keys(cube), kind='stable')).reset_index(drop=True)
+    state_id, labels = _decode_names(cube['district_id'].to_numpy(), states, districts)
+    values = [c for c in cube.columns if c not in CUBE_KEYS + ['state_id', 'district_id']]
+    return cube.assign(**labels)[CUBE_KEYS + ['state_id', 'district_id'] + values]
+
+
+def cube_inputs(cube):
+    """
+    Derive the pre-aggregated inputs each calculator consumes.
+
+    Returns a dict of frames with the same columns as the row-level data, so
+    the calculate_* functions run unchanged on a few thousand rows:
+        state                          - one row per state (all sources)
+        enrol_state / demo_state       - states with enrolment / demographic rows
+        enrol_daily / bio_daily / demo_daily - one row per date
+        enrol_pincode                  - one row per (state, district, pincode),
+                                         with 'active_days' for enrolment
+        pincode_daily                  - the cube itself (for the drill-down pyramid)
+    """
+    all_measures = [c for name in DATASETS for c in measure_columns(name)]
+    row_cols = list(ROW_COLUMNS.values())
+
+    # Per-pincode rollup (one pass over the cube)
+    cube = cube.assign(active_days=(cube['enrol_rows'] > 0).astype('int64'))
+    pincode = cube.groupby(['state', 'district', 'pincode'], sort=False, observed=True)[
+        all_measures + row_cols + ['active_days']
+    ].sum().reset_index()
+    # The rollups are small: hand the calculators plain string names
+    pincode = pincode.astype({'state': str, 'district': str})
+
+    # Per-date rollup (one pass over the cube)
+    daily = cube.groupby('date')[all_measures + row_cols].sum().reset_index()
+
+    # Per-state rollup, from the much smaller pincode rollup
+    state = pincode.groupby('state')[all_measures + row_cols].sum().reset_index()
+
+    return {
+        'state': state,
+        'enrol_state': state[state['enrol_rows'] > 0].reset_index(drop=True),
+        'demo_state': state[state['demo_rows'] > 0].reset_index(drop=True),
+        'enrol_daily': daily[daily['enrol_rows'] > 0].reset_index(drop=True),
+        'bio_daily': daily[daily['bio_rows'] > 0].reset_index(drop=True),
+        'demo_daily': daily[daily['demo_rows'] > 0].reset_index(drop=True),
+        'enrol_pincode': pincode[pincode['enrol_rows'] > 0].reset_index(drop=True),
+        'pincode_daily': cube.drop(columns='active_days'),
+    }
+
+
+def dashboard_tables(inputs):
+    """
+    KPI and state rollup tables read by the dashboard instead of row-level data.
+
+    Returns (kpis, state_rollup): a single-row table of national totals and
+    coverage counts, and per-state totals for every source.
+    """
+    state = inputs['state']
+    pincode = inputs['enrol_pincode']
+
+    kpis = pd.DataFrame([{
+        'total_enrol': int(state['total_enrol'].sum()),
+        'total_bio': int(state['total_bio'].sum()),
+        'total_demo': int(state['total_demo'].sum()),
+        'states_covered': len(inputs['enrol_state']),
+        'districts_covered': len(pincode[['state', 'district']].drop_duplicates()),
+        'pincodes_covered': pincode['pincode'].nunique(),
+        'records': int(state[list(ROW_COLUMNS.values())].sum().sum()),
+        'first_date': inputs['enrol_daily']['date'].min(),
+        'last_date': inputs['enrol_daily']['date'].max(),
+    }])
+
+    state_rollup = state[['state'] + [c for name in DATASETS for c in measure_columns(name)]
+                         + list(ROW_COLUMNS.values())]
+
+    return kpis, state_rollup.reset_index(drop=True)
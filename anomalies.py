@@ -0,0 +1,293 @@
+"""
+🚨 STREAMING ANOMALY DETECTION
+Aadhaar Life Cycle Intelligence Platform
+
+Online per-pincode anomaly detection on daily enrolments, demographic and
+biometric updates. Each pincode keeps an exponentially weighted mean and
+variance per activity in a compact array-backed store
+(processed_data/anomaly_state.npz). A new day of fact rows is scored against
+the store before it updates it, so a run costs O(new rows): only the days
+after the last one the store has seen are read from the date-sorted fact
+table.
+
+Flagged days are appended to an event log, one part per run:
+
+    processed_data/pincode_anomaly_events.parquet/state=<state>/month=<YYYY-MM>/
+    processed_data/pincode_anomalies.parquet/state=<state>/ - per-pincode summary
+
+The summary is a snapshot as of the last day it covers (its as_of column),
+rewritten every run and partitioned by state only.
+
+The store records the fingerprint of every raw file it has absorbed (from the
+ingestion manifest). When one of them is replaced or removed since, or a day
+it absorbed no longer has the same national totals, the store is rebuilt
+from the whole history and the log rewritten: EWMA state cannot retract a
+file's rows, even when a change only moves volume between pincodes.
+"""
+
+import json
+import os
+import numpy as np
+import pandas as pd
+from ingestion import (PROCESSED_PATH, ingested_sources, partition_filter, read_partitioned, remove_dataset,
+                       replace_partitioned, write_partitioned)
+
+# Activities tracked per pincode: name -> (value column, row-count column)
+METRICS = {
+    'enrolment': ('total_enrol', 'enrol_rows'),
+    'demographic': ('total_demo', 'demo_rows'),
+    'biometric': ('total_bio', 'bio_rows'),
+}
+
+# The cube's national daily rollups, one per METRICS entry in the same order
+DAILY_ROLLUPS = ['enrol_daily', 'demo_daily', 'bio_daily']
+
+# EWMA weight of each new observation, observations before a pincode is scored,
+# |z| above which a day is flagged, and the smallest standard deviation used
+ALPHA = 0.1
+WARMUP = 7
+Z_THRESHOLD = 4.0
+MIN_STD = 1.0
+
+STORE_PATH = PROCESSED_PATH / 'anomaly_state.npz'
+EVENTS_PATH = PROCESSED_PATH / 'pincode_anomaly_events.parquet'
+SUMMARY_PATH = PROCESSED_PATH / 'pincode_anomalies.parquet'
+
+# Days within which a pincode's last flag marks it as anomalous in the summary
+RECENT_DAYS = 30
+
+EVENT_COLUMNS = ['date', 'state', 'district', 'pincode', 'metric', 'value', 'expected', 'z_score', 'direction']
+
+
+def _days(dates):
+    """Day numbers (days since the epoch) of a datetime array."""
+    return dates.astype('datetime64[D]').astype(np.int64)
+
+
+def daily_totals(daily):
+    """National totals per day of every tracked activity, from the cube's daily rollups (keyed as DAILY_ROLLUPS)."""
+    frames = [daily[key].set_index('date')[[value]] for key, (value, _) in zip(DAILY_ROLLUPS, METRICS.values())]
+    totals = pd.concat(frames, axis=1).fillna(0).astype('int64').sort_index()
+    return pd.DataFrame(totals.to_numpy(), index=_days(totals.index.to_numpy()), columns=totals.columns)
+
+
+class AnomalyStore:
+    """
+    Per-pincode EWMA state.
+
+    Pincodes are keyed by (district index << 20 | pincode) in sorted order;
+    district indices are append-only, so keys stay valid across runs. Every
+    array has one row per pincode and, where per activity, one column per
+    METRICS entry.
+    """
+
+    ARRAYS = ['keys', 'mean', 'var', 'count', 'totals', 'flags', 'last_flag']
+
+    def __init__(self, districts=None):
+        self.districts = districts if districts is not None else pd.DataFrame({'state': [], 'district': []}, dtype=str)
+        self.keys = np.empty(0, dtype=np.int64)
+        self.mean = np.zeros((0, len(METRICS)))
+        self.var = np.zeros((0, len(METRICS)))
+        self.count = np.zeros((0, len(METRICS)), dtype=np.int32)
+        self.totals = np.zeros((0, len(METRICS)), dtype=np.int64)
+        self.flags = np.zeros(0, dtype=np.int32)
+        self.last_flag = np.full(0, -1, dtype=np.int64)
+        # Raw files absorbed (name -> fingerprint) and national totals of every
+        # day absorbed, to detect changed history
+        self.sources = {}
+        self.day_totals = pd.DataFrame(columns=[value for value, _ in METRICS.values()], dtype='int64')
+
+    @property
+    def last_day(self):
+        return int(self.day_totals.index.max()) if len(self.day_totals) else None
+
+    def _district_index(self, rows):
+        """Store district index of each fact row (new districts are appended)."""
+        _, first, inverse = np.unique(rows['district_id'].to_numpy(), return_index=True, return_inverse=True)
+        names = rows[['state', 'district']].iloc[first].astype(str)
+        known = pd.MultiIndex.from_frame(self.districts).get_indexer(pd.MultiIndex.from_frame(names)) \
+            if len(self.districts) else np.full(len(names), -1)
+        new = known < 0
+        known[new] = len(self.districts) + np.arange(new.sum())
+        self.districts = pd.concat([self.districts, names[new]], ignore_index=True)
+        return known[inverse.ravel()]
+
+    def _locate(self, keys):
+        """Row of each key, inserting pincodes seen for the first time."""
+        new = np.setdiff1d(keys, self.keys)
+        if len(new):
+            at = np.searchsorted(self.keys, new)
+            self.keys = np.insert(self.keys, at, new)
+            for name, fill in [('mean', 0.0), ('var', 0.0), ('count', 0), ('totals', 0)]:
+                setattr(self, name, np.insert(getattr(self, name), at, fill, axis=0))
+            self.flags = np.insert(self.flags, at, 0)
+            self.last_flag = np.insert(self.last_flag, at, -1)
+        return np.searchsorted(self.keys, keys)
+
+    def absorb(self, rows):
+        """
+        Score and absorb fact rows of days after last_day (rows sorted by date).
+
+        Returns the anomaly events found, in EVENT_COLUMNS layout.
+        """
+        if len(rows) == 0:
+            return pd.DataFrame(columns=EVENT_COLUMNS)
+        district = self._district_index(rows)
+        row = self._locate((district.astype(np.int64) << 20) | rows['pincode'].to_numpy())
+        values = rows[[value for value, _ in METRICS.values()]].to_numpy(dtype=np.float64)
+        observed = rows[[count for _, count in METRICS.values()]].to_numpy() > 0
+        days = _days(rows['date'].to_numpy())
+        bounds = np.flatnonzero(np.diff(days)) + 1
+
+        hits = [self._step(int(days[start]), row[start:end], values[start:end], observed[start:end], start)
+                for start, end in zip(np.r_[0, bounds], np.r_[bounds, len(days)])]
+        positions, metrics, z, expected = (np.concatenate(parts) for parts in zip(*hits))
+
+        totals = rows.groupby(days)[[value for value, _ in METRICS.values()]].sum()
+        self.day_totals = pd.concat([self.day_totals, totals]).astype('int64')
+
+        picked = rows.iloc[positions]
+        return pd.DataFrame({
+            'date': picked['date'].to_numpy(),
+            'state': picked['state'].astype(str).to_numpy(),
+            'district': picked['district'].astype(str).to_numpy(),
+            'pincode': picked['pincode'].to_numpy(),
+            'metric': np.array(list(METRICS))[metrics],
+            'value': values[positions, metrics].astype(np.int64),
+            'expected': expected.round(1),
+            'z_score': z.round(2),
+            'direction': np.where(z > 0, 'surge', 'drop'),
+        })
+
+    def _step(self, day, row, values, observed, offset):
+        """
+        Score one day's rows against the current state, then update it.
+
+        Returns (row positions, metric indices, z-scores, expected values) of the flagged observations.
+        """
+        mean, var, count = self.mean[row], self.var[row], self.count[row]
+        z = (values - mean) / np.maximum(np.sqrt(var), MIN_STD)
+        hit_rows, metrics = np.nonzero(observed & (count >= WARMUP) & (np.abs(z) > Z_THRESHOLD))
+
+        # Incremental EWMA mean/variance; the first observation seeds the mean
+        diff = values - mean
+        increment = np.where(count == 0, diff, ALPHA * diff)
+        self.mean[row] = np.where(observed, mean + increment, mean)
+        self.var[row] = np.where(observed & (count > 0), (1 - ALPHA) * (var + diff * increment), var)
+        self.count[row] = count + observed
+        self.totals[row] += np.where(observed, values, 0).astype(np.int64)
+
+        flagged = row[np.unique(hit_rows)]
+        self.flags[flagged] += 1
+        self.last_flag[flagged] = day
+        return hit_rows + offset, metrics, z[hit_rows, metrics], mean[hit_rows, metrics]
+
+    def matches(self, totals, sources):
+        """
+        True if the absorbed history is unchanged.
+
+        Every raw file absorbed must still be ingested with the same
+        fingerprint (new files are fine), and every day absorbed must still
+        have the same national totals.
+        """
+        if self.sources is None or any(sources.get(f) != fingerprint for f, fingerprint in self.sources.items()):
+            return False
+        if not self.day_totals.index.isin(totals.index).all():
+            return False
+        return np.array_equal(totals.loc[self.day_totals.index].to_numpy(), self.day_totals[totals.columns].to_numpy())
+
+    def summary(self):
+        """One row per pincode: lifetime totals, flagged days and whether its last flag is recent."""
+        names = self.districts.iloc[self.keys >> 20].reset_index(drop=True)
+        out = pd.DataFrame({
+            'pincode': (self.keys & ((1 << 20) - 1)).astype(str),
+            'state': names['state'],
+            'district': names['district'],
+        })
+        for j, (value, _) in enumerate(METRICS.values()):
+            out[value] = self.totals[:, j]
+        out['anomaly_score'] = self.flags.astype(np.int64)
+        last_day = self.last_day if self.last_day is not None else 0
+        out['last_anomaly'] = pd.to_datetime(np.where(self.last_flag >= 0, self.last_flag, np.nan), unit='D')
+        out['is_anomaly'] = self.last_flag > last_day - RECENT_DAYS
+        return out
+
+    def save(self, path=STORE_PATH):
+        """Write the store atomically (readers never see a half-written file)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, states=self.districts['state'].to_numpy(dtype=str),
+                     districts=self.districts['district'].to_numpy(dtype=str),
+                     days=self.day_totals.index.to_numpy(dtype=np.int64), day_totals=self.day_totals.to_numpy(),
+                     sources=np.array(json.dumps(self.sources)),
+                     **{name: getattr(self, name) for name in self.ARRAYS})
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        """Saved store, or None if there is none."""
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            store = cls(pd.DataFrame({'state': data['states'], 'district': data['districts']}).astype(str))
+            for name in cls.ARRAYS:
+                setattr(store, name, data[name])
+            store.day_totals = pd.DataFrame(data['day_totals'], index=data['days'],
+                                            columns=[value for value, _ in METRICS.values()])
+            # Stores saved without their sources cannot prove their history unchanged
+            store.sources = json.loads(str(data['sources'])) if 'sources' in data.files else None
+        return store
+
+
+def detect_anomalies(facts, daily, incremental=False):
+    """
+    Bring the anomaly store up to date with the fact table and log new events.
+
+    daily holds the cube's daily rollups (DAILY_ROLLUPS), whose national
+    totals tell whether the store's absorbed days are unchanged.
+
+    Incremental runs absorb only the days after the store's last day and
+    append their events as a new part of the log; full runs (or a store
+    whose absorbed days changed) rebuild the store and the log from the
+    whole history. Writes and returns the per-pincode summary.
+    """
+    print("\n🚨 Detecting pincode activity anomalies...")
+
+    sources = ingested_sources()
+    store = AnomalyStore.load() if incremental else None
+    rebuild = store is None or not store.matches(daily_totals(daily), sources)
+    if rebuild:
+        store = AnomalyStore()
+    store.sources = sources
+    days = _days(facts['date'].to_numpy())
+    start = np.searchsorted(days, store.last_day + 1) if store.last_day is not None else 0
+    events = store.absorb(facts.iloc[start:])
+
+    if rebuild:
+        if len(events):
+            replace_partitioned(events, EVENTS_PATH)
+        else:
+            remove_dataset(EVENTS_PATH)
+    elif len(events):
+        first, last = events['date'].min(), events['date'].max()
+        write_partitioned(events, EVENTS_PATH, f'part-{first:%Y%m%d}-{last:%Y%m%d}')
+    store.save()
+    summary = store.summary()
+    if len(summary):
+        summary['as_of'] = facts['date'].max()
+        replace_partitioned(summary, SUMMARY_PATH, date=None)
+    else:
+        remove_dataset(SUMMARY_PATH)
+
+    print(f"   Rows absorbed: {len(facts) - start:,} | Pincodes tracked: {len(store.keys):,} | "
+          f"New anomalies: {len(events):,}")
+
+    return summary
+
+
+def load_anomaly_events(states=None, start=None, end=None):
+    """Logged anomaly events, reading only the matching state/month partitions."""
+    if not EVENTS_PATH.exists():
+        return pd.DataFrame(columns=EVENT_COLUMNS)
+    return read_partitioned(EVENTS_PATH, EVENT_COLUMNS, partition_filter(states, start, end))
@@ -16,10 +16,13 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from glob import glob
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from ingestion import arrow_mirror, read_arrow_mapped, read_manifest
+from drilldown import LEVELS, DrilldownIndex, pyramid_path
+from anomalies import STORE_PATH as ANOMALY_STORE_PATH, load_anomaly_events
+from facts import ACTIVITIES, AGE_BANDS, LIFE_EVENT_CELLS
 
 # Page Configuration
 st.set_page_config(
@@ -182,64 +185,105 @@ INDIA_STATE_POPULATION = {
 }
 
 
-@st.cache_data(ttl=3600)
-def load_data():
-    """Load all datasets with optimization."""
-    BASE_PATH = Path('.')
-    PROCESSED_PATH = BASE_PATH / 'processed_data'
-    
-    if PROCESSED_PATH.exists() and (PROCESSED_PATH / 'enrolment_clean.parquet').exists():
-        df_bio = pd.read_parquet(PROCESSED_PATH / 'biometric_clean.parquet')
-        df_demo = pd.read_parquet(PROCESSED_PATH / 'demographic_clean.parquet')
-        df_enrol = pd.read_parquet(PROCESSED_PATH / 'enrolment_clean.parquet')
-    else:
-        bio_files = sorted(glob(str(BASE_PATH / 'raw_data/api_data_aadhar_biometric*.csv')))
-        demo_files = sorted(glob(str(BASE_PATH / 'raw_data/api_data_aadhar_demographic*.csv')))
-        enrol_files = sorted(glob(str(BASE_PATH / 'raw_data/api_data_aadhar_enrolment*.csv')))
-        
-        df_bio = pd.concat([pd.read_csv(f) for f in bio_files], ignore_index=True)
-        df_demo = pd.concat([pd.read_csv(f) for f in demo_files], ignore_index=True)
-        df_enrol = pd.concat([pd.read_csv(f) for f in enrol_files], ignore_index=True)
-        
-        for df in [df_bio, df_demo, df_enrol]:
-            df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y')
-            df['state'] = df['state'].str.strip().str.title()
-            df['district'] = df['district'].str.strip().str.title()
-        
-        df_bio['total_bio'] = df_bio['bio_age_5_17'] + df_bio['bio_age_17_']
-        df_demo['total_demo'] = df_demo['demo_age_5_17'] + df_demo['demo_age_17_']
-        df_enrol['total_enrol'] = df_enrol['age_0_5'] + df_enrol['age_5_17'] + df_enrol['age_18_greater']
-    
-    return df_bio, df_demo, df_enrol
+PROCESSED_PATH = Path('.') / 'processed_data'
 
+# Pre-computed datasets the pages can request, by key
+DATASET_FILES = {
+    'migration': 'migration_flow_analysis.parquet',
+    'district_migration': 'district_migration.parquet',
+    'migration_corridors': 'migration_corridors.parquet',
+    'district_windows': 'district_windows.parquet',
+    'state_windows': 'state_windows.parquet',
+    'life_events': 'life_events_framework.parquet',
+    'life_events_monthly': 'life_events_monthly.parquet',
+    'life_events_cube': 'life_events_cube.parquet',
+    'age_forecast': 'age_cohort_forecast.parquet',
+    'service_deserts': 'service_desert_analysis.parquet',
+    'sdg_scores': 'sdg_alignment_scores.parquet',
+    'regime_shifts': 'district_regime_shifts.parquet',
+    'kpis': 'dashboard_kpis.parquet',
+    'state_rollup': 'state_rollup.parquet',
+}
+
+
+def file_version(path):
+    """Cheap version stamp of a file: (mtime_ns, size), or None if it does not exist."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def dataset_version(key):
+    """Version stamp of a pre-computed dataset file."""
+    return file_version(PROCESSED_PATH / DATASET_FILES[key])
 
-@st.cache_data(ttl=3600)
-def load_innovation_data():
-    """Load pre-computed innovation data."""
-    PROCESSED_PATH = Path('.') / 'processed_data'
-    
-    data = {}
-    
-    if (PROCESSED_PATH / 'migration_flow_analysis.parquet').exists():
-        data['migration'] = pd.read_parquet(PROCESSED_PATH / 'migration_flow_analysis.parquet')
-    
-    if (PROCESSED_PATH / 'life_events_framework.parquet').exists():
-        data['life_events'] = pd.read_parquet(PROCESSED_PATH / 'life_events_framework.parquet')
-        data['life_events_monthly'] = pd.read_parquet(PROCESSED_PATH / 'life_events_monthly.parquet')
-    
-    if (PROCESSED_PATH / 'age_cohort_forecast.parquet').exists():
-        data['age_forecast'] = pd.read_parquet(PROCESSED_PATH / 'age_cohort_forecast.parquet')
-    
-    if (PROCESSED_PATH / 'service_desert_analysis.parquet').exists():
-        data['service_deserts'] = pd.read_parquet(PROCESSED_PATH / 'service_desert_analysis.parquet')
-    
-    if (PROCESSED_PATH / 'sdg_alignment_scores.parquet').exists():
-        data['sdg_scores'] = pd.read_parquet(PROCESSED_PATH / 'sdg_alignment_scores.parquet')
-    
-    return data
 
+@st.cache_resource(max_entries=2 * len(DATASET_FILES))
+def load_dataset(key, version):
+    """
+    Shared, read-only frame of one pre-computed dataset; empty if not generated yet.
+    
+    The dataset is memory-mapped from its Arrow IPC mirror, and cache_resource
+    hands every session the same frame rather than a pickled copy: numeric
+    columns stay views of the mapped file, so all sessions and server
+    processes share one page-cache copy. Cached per (dataset, version):
+    regenerated files are picked up on the next rerun.
+    """
+    if version is None:
+        return pd.DataFrame()
+    table = read_arrow_mapped(arrow_mirror(PROCESSED_PATH / DATASET_FILES[key]))
+    return table.to_pandas(split_blocks=True)
 
-def show_executive_summary(df_enrol, df_bio, df_demo, innovation_data):
+
+def load_innovation_data(keys):
+    """
+    Load only the pre-computed datasets a page declares (stat-checked on every rerun).
+    
+    Each session gets a shallow copy: with copy-on-write, columns a page adds
+    or changes never reach the shared frame.
+    """
+    return {key: load_dataset(key, dataset_version(key)).copy(deep=False) for key in keys}
+
+
+@st.cache_resource(max_entries=2 * len(LEVELS))
+def open_drilldown(level, version):
+    """
+    Shared drill-down index of one pyramid level; None if not generated yet.
+    
+    The level is memory-mapped and its offset tables are built once per file
+    version, then reused by every session and rerun.
+    """
+    return DrilldownIndex.open(level) if version is not None else None
+
+
+@st.cache_data(max_entries=32)
+def load_anomalies(state, start, end, version):
+    """
+    Logged pincode anomalies of one state (or all) in a date range.
+    
+    Only the matching state/month partitions of the event log are read; the
+    anomaly store's version changes whenever the pipeline logs new events.
+    """
+    return load_anomaly_events([state] if state else None, start, end) if version is not None else pd.DataFrame()
+
+
+@st.cache_resource(max_entries=2)
+def open_sql_store(version):
+    """
+    Shared read-only DuckDB connection to processed_data/uidai.duckdb; None if not built.
+    
+    Sessions query through their own cursor; a rebuilt store changes the
+    version and opens a fresh connection.
+    """
+    if version is None:
+        return None
+    from duckdb_store import connect
+    return connect()
+
+
+def show_executive_summary(innovation_data):
     """Executive Summary with breakthrough highlights."""
     
     st.markdown('<h1 class="main-header">🏆 Aadhaar Life Cycle Intelligence Platform</h1>', unsafe_allow_html=True)
@@ -256,11 +300,18 @@ def show_executive_summary(df_enrol, df_bio, df_demo, innovation_data):
     </div>
     """, unsafe_allow_html=True)
     
+    kpis = innovation_data.get('kpis', pd.DataFrame())
+    state_rollup = innovation_data.get('state_rollup', pd.DataFrame())
+    
+    if len(kpis) == 0:
+        st.warning("KPI data not available. Run breakthrough_innovations.py first.")
+        return
+    
     # Key Metrics
-    total_enrol = df_enrol['total_enrol'].sum()
-    total_bio = df_bio['total_bio'].sum()
-    total_demo = df_demo['total_demo'].sum()
-    states_covered = df_enrol['state'].nunique()
+    total_enrol = kpis['total_enrol'].iloc[0]
+    total_bio = kpis['total_bio'].iloc[0]
+    total_demo = kpis['total_demo'].iloc[0]
+    states_covered = kpis['states_covered'].iloc[0]
     
     # Innovation metrics
     service_deserts = innovation_data.get('service_deserts', pd.DataFrame())
@@ -364,7 +415,7 @@ def show_executive_summary(df_enrol, df_bio, df_demo, innovation_data):
     
     with col1:
         st.markdown("### 🗺️ Enrollment Distribution")
-        state_data = df_enrol.groupby('state')['total_enrol'].sum().reset_index()
+        state_data = state_rollup[state_rollup['enrol_rows'] > 0][['state', 'total_enrol']].copy()
         state_data['lat'] = state_data['state'].apply(lambda x: INDIA_STATE_COORDS.get(x, {}).get('lat', 20.5937))
         state_data['lon'] = state_data['state'].apply(lambda x: INDIA_STATE_COORDS.get(x, {}).get('lon', 78.9629))
         state_data['size'] = np.log1p(state_data['total_enrol']) * 5
@@ -393,6 +444,37 @@ def show_executive_summary(df_enrol, df_bio, df_demo, innovation_data):
         )
         fig.update_layout(height=350, margin=dict(l=0, r=0, t=0, b=0))
         st.plotly_chart(fig, use_container_width=True)
+    
+    # Recent change: sliding-window versions of the innovation metrics
+    district_windows = innovation_data.get('district_windows', pd.DataFrame())
+    state_windows = innovation_data.get('state_windows', pd.DataFrame())
+    if len(district_windows) > 0:
+        st.markdown("---")
+        as_of = pd.Timestamp(district_windows['as_of'].iloc[0])
+        st.markdown(f"### 📅 Recent Activity (as of {as_of:%d %b %Y})")
+        
+        days = st.radio("Window", sorted(district_windows['window_days'].unique()), horizontal=True,
+                        format_func=lambda d: f"Last {d} days", key="summary_window")
+        districts = district_windows[district_windows['window_days'] == days]
+        states = state_windows[state_windows['window_days'] == days]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Enrollments", f"{districts['total_enrol'].sum():,}")
+        col2.metric("Demo Updates", f"{districts['total_demo'].sum():,}")
+        col3.metric("Migration Hub Districts", int((districts['migration_type'] == 'Migration Hub (Receiving)').sum()))
+        col4.metric("Critical Desert Districts", int((districts['priority'] == 'Critical').sum()))
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("**Most Active Receiving Districts**")
+            st.dataframe(districts.nlargest(10, 'migration_intensity')[
+                ['state', 'district', 'migration_index', 'total_demo', 'total_enrol']
+            ], use_container_width=True, hide_index=True)
+        with col2:
+            st.markdown("**State SDG Alignment in Window**")
+            st.dataframe(states.dropna(subset=['sdg_alignment_score']).nlargest(10, 'sdg_alignment_score')[
+                ['state', 'sdg_alignment_score', 'sdg_16_9_identity', 'migration_index']
+            ], use_container_width=True, hide_index=True)
 
 
 def show_migration_flow(innovation_data):
@@ -486,9 +568,69 @@ def show_migration_flow(innovation_data):
             </ul>
         </div>
         """, unsafe_allow_html=True)
+    
+    district_migration = innovation_data.get('district_migration', pd.DataFrame())
+    if len(district_migration) > 0:
+        st.markdown("---")
+        st.subheader("🏘️ District Migration Hotspots")
+        
+        state_filter = st.selectbox("State", ["All States"] + sorted(district_migration['state'].unique()),
+                                    key="migration_state")
+        districts = district_migration if state_filter == "All States" else \
+            district_migration[district_migration['state'] == state_filter]
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            top = districts.nlargest(15, 'migration_index')
+            fig = px.bar(
+                top.sort_values('migration_index'), x='migration_index', y='district', orientation='h',
+                color='migration_type', hover_data=['state', 'total_demo', 'total_enrol'],
+                color_discrete_map={
+                    'Migration Hub (Receiving)': '#e74c3c',
+                    'Migration Source (Sending)': '#3498db',
+                    'Balanced': '#95a5a6'
+                },
+                title='Top Receiving Districts (Migration Index)'
+            )
+            fig.update_layout(height=500)
+            st.plotly_chart(fig, use_container_width=True)
+        with col2:
+            st.dataframe(
+                districts.sort_values('migration_intensity', ascending=False)[
+                    ['state', 'district', 'migration_index', 'migration_type', 'bio_update_ratio', 'child_enrol_pct']
+                ],
+                use_container_width=True, hide_index=True, height=500
+            )
+        
+        corridors = innovation_data.get('migration_corridors', pd.DataFrame())
+        if len(corridors) > 0:
+            st.subheader("🛣️ Estimated Migration Corridors")
+            st.caption("Weeks where a district's demographic updates fall well below its baseline are paired "
+                       "with the districts surging in the same week; flows are summed over all weeks.")
+            if state_filter != "All States":
+                corridors = corridors[(corridors['origin_state'] == state_filter) |
+                                      (corridors['destination_state'] == state_filter)]
+            if len(corridors) == 0:
+                st.info("None of the strongest corridors start or end in this state.")
+            else:
+                col1, col2 = st.columns(2)
+                with col1:
+                    top = corridors.head(15).assign(corridor=lambda df: df['origin_district'] + " (" + df['origin_state'] +
+                                                    ") → " + df['destination_district'] + " (" +
+                                                    df['destination_state'] + ")")
+                    fig = px.bar(
+                        top.iloc[::-1], x='estimated_flow', y='corridor', orientation='h',
+                        color='interstate', hover_data=['origin_share', 'weeks'],
+                        color_discrete_map={True: '#e74c3c', False: '#3498db'},
+                        title='Strongest Corridors (Estimated Updates Moved)'
+                    )
+                    fig.update_layout(height=500)
+                    st.plotly_chart(fig, use_container_width=True)
+                with col2:
+                    st.dataframe(corridors, use_container_width=True, hide_index=True, height=500)
 
 
-def show_life_events(innovation_data, df_enrol):
+def show_life_events(innovation_data):
     """Life Events Detection Framework."""
     
     st.header("🎂 Life Events Detection Framework")
@@ -503,11 +645,27 @@ def show_life_events(innovation_data, df_enrol):
     
     life_events = innovation_data.get('life_events', pd.DataFrame())
     monthly = innovation_data.get('life_events_monthly', pd.DataFrame())
+    cube = innovation_data.get('life_events_cube', pd.DataFrame())
     
     if len(life_events) == 0:
         st.warning("Life events data not available. Run breakthrough_innovations.py first.")
         return
     
+    # Per-state view: volumes and monthly pattern are sliced from the activity cube
+    volumes = life_events['volume'].tolist()
+    if len(cube) > 0:
+        state = st.selectbox("State", ["All India"] + sorted(cube['state'].unique()), key="life_events_state")
+        if state != "All India":
+            cube = cube[cube['state'] == state]
+        cells = cube.groupby(['age_band', 'activity'])['volume'].sum()
+        volumes = [cells.get(cell, 0) for cell in LIFE_EVENT_CELLS]
+        
+        enrolment = cube[cube['activity'] == 'enrolment']
+        monthly = enrolment.pivot_table(index=enrolment['month'].dt.month, columns='age_band', values='volume',
+                                        aggfunc='sum').reindex(columns=AGE_BANDS, fill_value=0)
+        monthly.columns = ['age_0_5', 'age_5_17', 'age_18_greater']
+        monthly = monthly[monthly.sum(axis=1) > 0].rename_axis('month').reset_index()
+    
     # Life Events Journey
     st.subheader("🛤️ Aadhaar Life Journey")
     
@@ -522,7 +680,7 @@ def show_life_events(innovation_data, df_enrol):
     
     for i, (icon, age, activity, color) in enumerate(events):
         with [col1, col2, col3, col4][i]:
-            volume = life_events.iloc[i]['volume'] if i < len(life_events) else 0
+            volume = volumes[i] if i < len(volumes) else 0
             st.markdown(f"""
             <div style="text-align: center; padding: 1rem; background: {color}20; border-radius: 10px; border-left: 4px solid {color};">
                 <div style="font-size: 2rem;">{icon}</div>
@@ -585,6 +743,21 @@ def show_life_events(innovation_data, df_enrol):
             </ul>
         </div>
         """, unsafe_allow_html=True)
+    
+    if len(cube) > 0:
+        st.markdown("---")
+        st.subheader("📆 Activity by Month and Age Band")
+        
+        trend = cube.groupby(['month', 'activity', 'age_band'])['volume'].sum().reset_index()
+        trend = trend[trend['volume'] > 0]
+        fig = px.bar(
+            trend, x='month', y='volume', color='age_band', facet_row='activity',
+            category_orders={'activity': ACTIVITIES, 'age_band': AGE_BANDS},
+            color_discrete_sequence=['#FF9933', '#138808', '#3498db'],
+            labels={'volume': 'Volume', 'month': 'Month', 'age_band': 'Age Band'}
+        )
+        fig.update_layout(height=500)
+        st.plotly_chart(fig, use_container_width=True)
 
 
 def show_age_cohort_forecast(innovation_data):
@@ -1098,36 +1271,271 @@ def show_policy_recommendations(innovation_data):
     """, unsafe_allow_html=True)
 
 
+def show_drilldown(innovation_data):
+    """Regional drill-down: state → district → pincode, filtered from the sidebar."""
+    
+    st.header("🔎 Regional Drill-Down")
+    
+    st.markdown("""
+    <div class="insight-box insight-box-info">
+        <h4>From National Trends to Individual Pincodes</h4>
+        <p>Pick a state, a district and a date range in the sidebar. Each selection is read
+        from a pre-aggregated, indexed pyramid, so only the rows shown are touched.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    index = {level: open_drilldown(level, file_version(pyramid_path(level))) for level in LEVELS}
+    dates = index['national'].date_range() if index['national'] is not None else None
+    
+    if any(ix is None for ix in index.values()) or dates is None:
+        st.warning("Drill-down data not available. Run breakthrough_innovations.py first.")
+        return
+    
+    # Sidebar filters
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("### 🔎 Drill-Down Filters")
+    state = st.sidebar.selectbox("State", ["All India"] + index['state'].children())
+    district = "All districts"
+    if state != "All India":
+        district = st.sidebar.selectbox("District", ["All districts"] + index['district'].children((state,)))
+    period = st.sidebar.date_input(
+        "Date range", value=(dates[0].date(), dates[1].date()),
+        min_value=dates[0].date(), max_value=dates[1].date()
+    )
+    # While a range is being picked only its first date is set
+    start, end = (period[0], period[-1]) if len(period) else (dates[0], dates[1])
+    
+    # One level for the trend, the next level down for the breakdown
+    if state == "All India":
+        scope, unit = "All India", 'state'
+        trend = index['national'].rows((), start, end)
+        breakdown = index['state'].rows((), start, end)
+    elif district == "All districts":
+        scope, unit = state, 'district'
+        trend = index['state'].rows((state,), start, end)
+        breakdown = index['district'].rows((state,), start, end)
+    else:
+        scope, unit = f"{district}, {state}", 'pincode'
+        trend = index['district'].rows((state, district), start, end)
+        breakdown = index['pincode'].rows((state, district), start, end)
+    
+    st.subheader(f"📍 {scope}")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric("New Enrollments", f"{trend['total_enrol'].sum():,}")
+    
+    with col2:
+        st.metric("Biometric Updates", f"{trend['total_bio'].sum():,}")
+    
+    with col3:
+        st.metric("Demographic Updates", f"{trend['total_demo'].sum():,}")
+    
+    with col4:
+        st.metric(f"{unit.title()}s Active", f"{breakdown.loc[breakdown['enrol_rows'] > 0, unit].nunique():,}")
+    
+    st.markdown("---")
+    
+    if len(trend) == 0:
+        st.info("No activity in the selected period.")
+        return
+    
+    # Regime shifts of the districts in scope during the period
+    shifts = innovation_data['regime_shifts']
+    if len(shifts) > 0:
+        in_scope = shifts['date'].between(pd.Timestamp(start), pd.Timestamp(end))
+        if state != "All India":
+            in_scope &= shifts['state'] == state
+        if district != "All districts":
+            in_scope &= shifts['district'] == district
+        shifts = shifts[in_scope]
+    
+    col1, col2 = st.columns([1.2, 0.8])
+    
+    with col1:
+        st.subheader("📈 Daily Activity")
+        
+        fig = px.line(
+            trend, x='date', y=['total_enrol', 'total_bio', 'total_demo'],
+            labels={'value': 'Count', 'date': 'Date', 'variable': 'Activity'},
+            color_discrete_sequence=['#FF9933', '#138808', '#3498db']
+        )
+        # A single district's regime shifts are marked on its series
+        if unit == 'pincode':
+            for shift in shifts.itertuples():
+                fig.add_vline(x=shift.date, line_dash='dot',
+                              line_color='#FF9933' if shift.metric == 'enrolment' else '#3498db')
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader(f"🏆 Top {unit.title()}s by Enrollment")
+        
+        summary = breakdown.groupby(unit, observed=True)[['total_enrol', 'total_bio', 'total_demo']].sum().reset_index()
+        summary[unit] = summary[unit].astype(str)
+        
+        fig = px.bar(
+            summary.nlargest(15, 'total_enrol').sort_values('total_enrol'),
+            x='total_enrol', y=unit, orientation='h',
+            color='total_enrol', color_continuous_scale='Oranges'
+        )
+        fig.update_layout(height=400, showlegend=False)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.subheader(f"📋 All {unit.title()}s")
+    st.dataframe(
+        summary.sort_values('total_enrol', ascending=False).rename(columns={
+            unit: unit.title(), 'total_enrol': 'Enrollments',
+            'total_bio': 'Biometric Updates', 'total_demo': 'Demographic Updates'
+        }),
+        use_container_width=True, hide_index=True
+    )
+    
+    # Streaming anomaly flags for the same scope and period
+    anomalies = load_anomalies(None if state == "All India" else state, start, end,
+                               file_version(ANOMALY_STORE_PATH))
+    if len(anomalies) > 0 and district != "All districts":
+        anomalies = anomalies[anomalies['district'] == district]
+    st.subheader(f"🚨 Activity Anomalies ({len(anomalies):,})")
+    if len(anomalies) == 0:
+        st.info("No anomalous pincode days flagged in this scope and period.")
+    else:
+        st.dataframe(
+            anomalies.assign(severity=anomalies['z_score'].abs()).nlargest(200, 'severity').drop(columns='severity'),
+            use_container_width=True, hide_index=True
+        )
+    
+    st.subheader(f"📉 Regime Shifts ({len(shifts):,})")
+    if len(shifts) == 0:
+        st.info("No lasting change in district enrolment or demographic update levels in this scope and period.")
+    else:
+        st.dataframe(
+            shifts.nlargest(200, 'score').rename(columns={
+                'before_mean': 'Daily Mean Before', 'after_mean': 'Daily Mean After', 'change_pct': 'Change %'
+            }),
+            use_container_width=True, hide_index=True
+        )
+
+
+# Example for the SQL Explorer, filled in with the leading state and the last
+# SQL_EXAMPLE_DAYS days of enrolment data in the store
+SQL_EXAMPLE = """SELECT district,
+       sum(total_enrol) AS enrolments,
+       count(DISTINCT pincode) AS pincodes
+FROM enrolment
+WHERE state = '{state}' AND date BETWEEN '{start:%Y-%m-%d}' AND '{end:%Y-%m-%d}'
+GROUP BY district
+ORDER BY enrolments DESC"""
+SQL_EXAMPLE_DAYS = 90
+
+SQL_MAX_ROWS = 10_000
+
+
+@st.cache_data(max_entries=2)
+def sql_example(version):
+    """Example query over data the store holds (cached per store version)."""
+    cursor = open_sql_store(version).cursor()
+    try:
+        state, end = cursor.execute("""
+            SELECT (SELECT state FROM enrolment GROUP BY state ORDER BY sum(total_enrol) DESC LIMIT 1), max(date)
+            FROM enrolment
+        """).fetchone()
+    finally:
+        cursor.close()
+    if end is None:
+        return "SELECT * FROM enrolment"
+    end = pd.Timestamp(end)
+    return SQL_EXAMPLE.format(state=state.replace("'", "''"), start=end - pd.Timedelta(days=SQL_EXAMPLE_DAYS - 1),
+                              end=end)
+
+
+def show_sql_explorer(innovation_data):
+    """Ad-hoc SQL over the embedded DuckDB store."""
+    
+    st.header("🦆 SQL Explorer")
+    
+    st.markdown("""
+    <div class="insight-box insight-box-info">
+        <h4>Ad-hoc Queries on the Embedded Analytic Store</h4>
+        <p>Query the clean <code>enrolment</code>, <code>biometric</code> and <code>demographic</code> tables
+        and the innovation views (<code>migration_flow</code>, <code>service_deserts</code>, ...) with SQL.
+        Queries run in DuckDB's parallel engine on a read-only connection.</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    try:
+        import duckdb
+        from duckdb_store import DUCKDB_PATH
+    except ImportError:
+        st.warning("DuckDB is not installed. Run: pip install duckdb")
+        return
+    
+    version = file_version(DUCKDB_PATH)
+    store = open_sql_store(version)
+    if store is None:
+        st.warning("SQL store not available. Run duckdb_store.py first.")
+        return
+    
+    cursor = store.cursor()
+    objects = cursor.execute(
+        "SELECT table_name, table_type FROM information_schema.tables ORDER BY table_type, table_name"
+    ).fetch_df()
+    
+    with st.expander("📚 Tables and views"):
+        st.dataframe(objects, use_container_width=True, hide_index=True)
+    
+    query = st.text_area("SQL", value=sql_example(version), height=180)
+    
+    try:
+        # Whole 2048-row vectors: at least one row past the limit, to tell whether it was cut
+        result = cursor.execute(query).fetch_df_chunk(SQL_MAX_ROWS // 2048 + 1)
+    except duckdb.Error as error:
+        st.error(f"Query failed: {error}")
+        return
+    finally:
+        cursor.close()
+    
+    if len(result) > SQL_MAX_ROWS:
+        st.caption(f"More than {SQL_MAX_ROWS:,} rows (first {SQL_MAX_ROWS:,} shown)")
+    else:
+        st.caption(f"{len(result):,} row(s)")
+    st.dataframe(result.head(SQL_MAX_ROWS), use_container_width=True, hide_index=True)
+
+
+# Navigation: page title -> (renderer, datasets it reads)
+PAGES = {
+    "🏠 Executive Summary": (show_executive_summary, ['kpis', 'state_rollup', 'service_deserts', 'sdg_scores', 'migration',
+                                                     'district_windows', 'state_windows']),
+    "🌊 Migration Flow": (show_migration_flow, ['migration', 'district_migration', 'migration_corridors']),
+    "🎂 Life Events": (show_life_events, ['life_events', 'life_events_monthly', 'life_events_cube']),
+    "📈 Age Cohort Forecast": (show_age_cohort_forecast, ['age_forecast']),
+    "🏜️ Service Deserts": (show_service_deserts, ['service_deserts']),
+    "🎯 SDG Alignment": (show_sdg_alignment, ['sdg_scores']),
+    "📋 Policy Recommendations": (show_policy_recommendations, []),
+    "🔎 Regional Drill-Down": (show_drilldown, ['regime_shifts']),
+    "🦆 SQL Explorer": (show_sql_explorer, []),
+}
+
+
 def main():
     """Main application."""
     
-    # Load data
-    with st.spinner("🔄 Loading data..."):
-        df_bio, df_demo, df_enrol = load_data()
-        innovation_data = load_innovation_data()
-    
     # Sidebar
     st.sidebar.image("https://upload.wikimedia.org/wikipedia/en/thumb/c/cf/Aadhaar_Logo.svg/1200px-Aadhaar_Logo.svg.png", width=100)
     st.sidebar.markdown("## 🏆 Life Cycle Intelligence")
     st.sidebar.markdown("---")
     
     # Navigation
-    page = st.sidebar.radio(
-        "📍 Navigation",
-        [
-            "🏠 Executive Summary",
-            "🌊 Migration Flow",
-            "🎂 Life Events",
-            "📈 Age Cohort Forecast",
-            "🏜️ Service Deserts",
-            "🎯 SDG Alignment",
-            "📋 Policy Recommendations"
-        ]
-    )
+    page = st.sidebar.radio("📍 Navigation", list(PAGES))
+    
+    # Row count comes from the ingestion manifest: no data files are opened
+    datasets = read_manifest()['datasets'].values()
+    records = f"{sum(d['rows'] for d in datasets):,}" if datasets else "5M+"
     
     # Info
     st.sidebar.markdown("---")
-    st.sidebar.markdown("""
+    st.sidebar.markdown(f"""
     **🏆 5 Breakthrough Innovations**
     
     1. 🌊 Migration Flow Intelligence
@@ -1138,7 +1546,7 @@ def main():
     
     ---
     **📊 Data Summary**
-    - 5M+ Records Analyzed
+    - {records} Records Analyzed
     - 36 States/UTs Covered
     - 1000+ Districts Mapped
     
@@ -1146,21 +1554,11 @@ def main():
     *UIDAI Hackathon 2026*
     """)
     
-    # Page routing
-    if page == "🏠 Executive Summary":
-        show_executive_summary(df_enrol, df_bio, df_demo, innovation_data)
-    elif page == "🌊 Migration Flow":
-        show_migration_flow(innovation_data)
-    elif page == "🎂 Life Events":
-        show_life_events(innovation_data, df_enrol)
-    elif page == "📈 Age Cohort Forecast":
-        show_age_cohort_forecast(innovation_data)
-    elif page == "🏜️ Service Deserts":
-        show_service_deserts(innovation_data)
-    elif page == "🎯 SDG Alignment":
-        show_sdg_alignment(innovation_data)
-    elif page == "📋 Policy Recommendations":
-        show_policy_recommendations(innovation_data)
+    # Page routing: load only the datasets this page declares
+    render, datasets = PAGES[page]
+    with st.spinner("🔄 Loading data..."):
+        innovation_data = load_innovation_data(datasets)
+    render(innovation_data)
 
 
 if __name__ == "__main__":
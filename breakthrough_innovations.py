@@ -9,20 +9,60 @@ This module implements 5 breakthrough innovations:
 4. Service Desert Detection
 5. Aadhaar SDG Alignment Score
 
-Run this script to generate all innovation data files.
+Run this script to generate all innovation data files:
+    python breakthrough_innovations.py                 # full recompute
+    python breakthrough_innovations.py --incremental   # only new raw files
+    python breakthrough_innovations.py --backend polars # Polars lazy/streaming engine
+    python breakthrough_innovations.py --chunked       # out-of-core: stream raw CSVs in chunks
+    python breakthrough_innovations.py --sketch        # HLL/KLL sketches for distinct counts and medians
 """
 
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from glob import glob
+import argparse
 import warnings
+from functools import partial
+from ingestion import BACKEND, CHUNK_MB, load_chunked_rollups, load_clean_data, load_rollups, load_sketches, sync_all
+from aggregation import build_cube, cube_inputs, dashboard_tables
+from scheduler import Stage, run_stages, print_timings
+from sketches import distinct_counts, median, percentile_rank
+from drilldown import LEVELS, build_pyramid, pyramid_path
+from facts import ACTIVITIES, AGE_BANDS, LEVEL_KEYS, LIFE_EVENT_CELLS, activity_cube, cube_frame, rollup_facts
+from windows import WINDOW_COLUMNS, update_windows
+from forecasting import FORECAST_FILES, build_forecasts
+from anomalies import DAILY_ROLLUPS, detect_anomalies
+from clustering import build_clusters
+from changepoints import detect_regime_shifts
+from corridors import estimate_corridors
 warnings.filterwarnings('ignore')
 
 # Paths
 BASE_PATH = Path('.')
 PROCESSED_PATH = BASE_PATH / 'processed_data'
 
+# Innovation outputs written by main()
+OUTPUT_FILES = [
+    'migration_flow_analysis.parquet',
+    'district_migration.parquet',
+    'pincode_migration.parquet',
+    'migration_corridors.parquet',
+    'district_windows.parquet',
+    'state_windows.parquet',
+    'pincode_anomalies.parquet',
+    'district_regime_shifts.parquet',
+    'district_features.parquet',
+    'district_clusters.parquet',
+    'life_events_framework.parquet',
+    'life_events_monthly.parquet',
+    'life_events_cube.parquet',
+    'age_cohort_forecast.parquet',
+    'service_desert_analysis.parquet',
+    'sdg_alignment_scores.parquet',
+    'dashboard_kpis.parquet',
+    'state_rollup.parquet',
+] + [path.name for path in FORECAST_FILES.values()] + [pyramid_path(level).name for level in LEVELS]
+
 # State populations
 INDIA_STATE_POPULATION = {
     'Uttar Pradesh': 241000000, 'Maharashtra': 130000000, 'Bihar': 130000000,
@@ -42,32 +82,10 @@ INDIA_STATE_POPULATION = {
 
 
 def load_data():
-    """Load all datasets."""
+    """Load all datasets from the shared clean cache (rebuilt only when raw_data/ changes)."""
     print("📊 Loading datasets...")
     
-    if (PROCESSED_PATH / 'enrolment_clean.parquet').exists():
-        df_bio = pd.read_parquet(PROCESSED_PATH / 'biometric_clean.parquet')
-        df_demo = pd.read_parquet(PROCESSED_PATH / 'demographic_clean.parquet')
-        df_enrol = pd.read_parquet(PROCESSED_PATH / 'enrolment_clean.parquet')
-    else:
-        # Load from CSVs (consolidated raw_data folder)
-        bio_files = sorted(glob(str(BASE_PATH / 'raw_data/api_data_aadhar_biometric*.csv')))
-        demo_files = sorted(glob(str(BASE_PATH / 'raw_data/api_data_aadhar_demographic*.csv')))
-        enrol_files = sorted(glob(str(BASE_PATH / 'raw_data/api_data_aadhar_enrolment*.csv')))
-        
-        df_bio = pd.concat([pd.read_csv(f) for f in bio_files], ignore_index=True)
-        df_demo = pd.concat([pd.read_csv(f) for f in demo_files], ignore_index=True)
-        df_enrol = pd.concat([pd.read_csv(f) for f in enrol_files], ignore_index=True)
-        
-        # Clean data
-        for df in [df_bio, df_demo, df_enrol]:
-            df['date'] = pd.to_datetime(df['date'], format='%d-%m-%Y')
-            df['state'] = df['state'].str.strip().str.title()
-            df['district'] = df['district'].str.strip().str.title()
-        
-        df_bio['total_bio'] = df_bio['bio_age_5_17'] + df_bio['bio_age_17_']
-        df_demo['total_demo'] = df_demo['demo_age_5_17'] + df_demo['demo_age_17_']
-        df_enrol['total_enrol'] = df_enrol['age_0_5'] + df_enrol['age_5_17'] + df_enrol['age_18_greater']
+    df_bio, df_demo, df_enrol = load_clean_data()
     
     print(f"   Biometric: {len(df_bio):,} records")
     print(f"   Demographic: {len(df_demo):,} records")
@@ -76,28 +94,63 @@ def load_data():
     return df_bio, df_demo, df_enrol
 
 
-def calculate_migration_flow(df_enrol, df_demo):
-    """
-    INNOVATION 1: Migration Flow Intelligence
-    
-    Analyze demographic updates relative to enrollments to detect migration patterns.
-    High demo/enrol ratio = Migration Hub (receiving area)
-    Low demo/enrol ratio = Migration Source (sending area)
-    """
-    print("\n🌊 Calculating Migration Flow Intelligence...")
+def ingest_new_files(backend=None):
+    """Ingest only new or changed raw range files; returns True if anything changed."""
+    print("📊 Ingesting new raw files...")
     
-    state_enrol = df_enrol.groupby('state')['total_enrol'].sum().reset_index()
-    state_demo = df_demo.groupby('state')['total_demo'].sum().reset_index()
-    
-    migration_df = state_enrol.merge(state_demo, on='state', how='outer').fillna(0)
+    summary = sync_all(backend=backend)
+    for name, changes in summary.items():
+        print(f"   {name.title()}: +{len(changes['added'])} new, "
+              f"{len(changes['replaced'])} changed, {len(changes['removed'])} removed file(s)")
     
+    return any(any(changes.values()) for changes in summary.values())
+
+
+def load_inputs(incremental=False, backend=None, chunk_mb=None, sketches=False):
+    """
+    Aggregation cube rollups consumed by the calculators.
+    
+    The pandas backend builds the cube from the clean data (or, when
+    incremental, from the pincode-day rollups, which keep every column the
+    calculators use); the polars backend runs the same aggregation as lazy
+    streaming queries. With chunk_mb set, the rollups are instead reduced
+    from raw_data/ chunk by chunk, so memory no longer grows with the input.
+    With sketches, inputs['enrol_sketches'] holds the enrolment distinct-count
+    sketches merged across the stored parts (or the streamed chunks).
+    """
+    if chunk_mb:
+        print(f"📊 Streaming raw data in {chunk_mb:g} MB chunks...")
+        (df_bio, df_demo, df_enrol), chunk_sketches = load_chunked_rollups(chunk_mb)
+        inputs = cube_inputs(build_cube(df_enrol, df_bio, df_demo))
+        if sketches:
+            inputs['enrol_sketches'] = chunk_sketches['enrolment']
+        return inputs
+    
+    if (backend or BACKEND) == 'polars':
+        from polars_backend import load_cube_inputs
+        if not incremental:
+            sync_all(backend='polars')
+        inputs = load_cube_inputs(incremental)
+    elif incremental:
+        df_bio, df_demo, df_enrol = load_rollups()
+        inputs = cube_inputs(build_cube(df_enrol, df_bio, df_demo))
+    else:
+        df_bio, df_demo, df_enrol = load_data()
+        inputs = cube_inputs(build_cube(df_enrol, df_bio, df_demo))
+    if sketches:
+        inputs['enrol_sketches'] = load_sketches('enrolment')
+    return inputs
+
+
+def score_migration(migration_df, sketch_error=None):
+    """Migration index, type and intensity of each row, from its total_demo and total_enrol."""
     # Migration Index
     migration_df['migration_index'] = (
         migration_df['total_demo'] / migration_df['total_enrol'].replace(0, 1)
     ).round(2)
     
-    # Classify states
-    median_index = migration_df['migration_index'].median()
+    # Classify areas
+    median_index = median(migration_df['migration_index'], sketch_error)
     migration_df['migration_type'] = migration_df['migration_index'].apply(
         lambda x: 'Migration Hub (Receiving)' if x > median_index * 1.5 
         else ('Migration Source (Sending)' if x < median_index * 0.7 else 'Balanced')
@@ -105,33 +158,92 @@ def calculate_migration_flow(df_enrol, df_demo):
     
     # Migration intensity score (0-100)
     migration_df['migration_intensity'] = (
-        migration_df['migration_index'].rank(pct=True) * 100
+        percentile_rank(migration_df['migration_index'], sketch_error) * 100
     ).round(1)
     
+    return migration_df
+
+
+def calculate_migration_flow(df_enrol, df_demo, sketch_error=None):
+    """
+    INNOVATION 1: Migration Flow Intelligence
+    
+    Analyze demographic updates relative to enrollments to detect migration patterns.
+    High demo/enrol ratio = Migration Hub (receiving area)
+    Low demo/enrol ratio = Migration Source (sending area)
+    
+    sketch_error switches the median and percentile ranks to KLL sketches.
+    """
+    print("\n🌊 Calculating Migration Flow Intelligence...")
+    
+    state_enrol = df_enrol.groupby('state', observed=True)['total_enrol'].sum().reset_index()
+    state_demo = df_demo.groupby('state', observed=True)['total_demo'].sum().reset_index()
+    
+    migration_df = state_enrol.merge(state_demo, on='state', how='outer').fillna(0)
+    migration_df = score_migration(migration_df, sketch_error)
+    
     print(f"   Migration Hubs: {(migration_df['migration_type'] == 'Migration Hub (Receiving)').sum()}")
     print(f"   Migration Sources: {(migration_df['migration_type'] == 'Migration Source (Sending)').sum()}")
     
     return migration_df
 
 
-def calculate_life_events(df_enrol, df_bio, df_demo):
+def calculate_local_migration(facts, level, sketch_error=None):
+    """
+    INNOVATION 1 at district or pincode level
+    
+    Migration index of every district (or pincode) from the pincode-day fact
+    table, ranked nationally, with the biometric update ratio and child share
+    of enrolments alongside. Areas with neither enrolments nor demographic
+    updates are left out, as in calculate_migration_flow.
+    """
+    print(f"\n🌊 Calculating {level.title()} Migration Flow...")
+    
+    rollup = rollup_facts(facts, level)
+    rollup = rollup[(rollup['enrol_rows'] > 0) | (rollup['demo_rows'] > 0)].reset_index(drop=True)
+    
+    migration_df = score_migration(rollup[LEVEL_KEYS[level] + ['total_enrol', 'total_demo', 'total_bio']].copy(),
+                                   sketch_error)
+    
+    # Cross-dataset ratios
+    migration_df['bio_update_ratio'] = (
+        migration_df['total_bio'] / migration_df['total_enrol'].replace(0, 1)
+    ).round(2)
+    migration_df['child_enrol_pct'] = (
+        (rollup['age_0_5'] + rollup['age_5_17']) / rollup['total_enrol'].replace(0, np.nan) * 100
+    ).round(1)
+    
+    print(f"   {level.title()}s analyzed: {len(migration_df):,}")
+    print(f"   Migration Hubs: {(migration_df['migration_type'] == 'Migration Hub (Receiving)').sum():,}")
+    
+    return migration_df
+
+
+def calculate_life_events(facts):
     """
     INNOVATION 2: Life Events Detection Framework
     
     Connect Aadhaar activity to life milestones.
+    
+    Everything is sliced from the (state, year-month, age band, activity)
+    cube of the fact table (see facts.activity_cube), so the source frames
+    are never touched. Returns the framework, the national calendar-month
+    pattern by age and the cube itself in long form.
     """
     print("\n🎂 Building Life Events Framework...")
     
-    # Monthly patterns by age
-    df_enrol['month'] = df_enrol['date'].dt.month
-    df_enrol['month_name'] = df_enrol['date'].dt.month_name()
+    states, months, cube = activity_cube(facts)
+    national = cube.sum(axis=(0, 1))
+    enrolment = cube[..., ACTIVITIES.index('enrolment')].sum(axis=0)
     
-    monthly_by_age = df_enrol.groupby('month').agg({
-        'age_0_5': 'sum',
-        'age_5_17': 'sum',
-        'age_18_greater': 'sum',
-        'total_enrol': 'sum'
-    }).reset_index()
+    # Monthly patterns by age (calendar months, all years)
+    calendar = months.month.to_numpy()
+    monthly_by_age = pd.DataFrame({'month': np.arange(1, 13, dtype=np.int32)})
+    for col, band in [('age_0_5', '0-5'), ('age_5_17', '5-17'), ('age_18_greater', '18+')]:
+        monthly_by_age[col] = np.bincount(calendar, weights=enrolment[:, AGE_BANDS.index(band)],
+                                          minlength=13)[1:].astype(np.int64)
+    monthly_by_age['total_enrol'] = monthly_by_age[['age_0_5', 'age_5_17', 'age_18_greater']].sum(axis=1)
+    monthly_by_age = monthly_by_age[monthly_by_age['total_enrol'] > 0].reset_index(drop=True)
     
     month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
                    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
@@ -147,12 +259,8 @@ def calculate_life_events(df_enrol, df_bio, df_demo):
         ],
         'age_group': ['0-5 years', '5-17 years', '15-18 years', '18+ years'],
         'primary_activity': ['New Enrollment', 'New Enrollment', 'Biometric Update', 'Demo Update'],
-        'volume': [
-            df_enrol['age_0_5'].sum(),
-            df_enrol['age_5_17'].sum(),
-            df_bio['bio_age_5_17'].sum(),
-            df_demo['demo_age_17_'].sum()
-        ],
+        'volume': [national[AGE_BANDS.index(band), ACTIVITIES.index(activity)]
+                   for band, activity in LIFE_EVENT_CELLS],
         'policy_action': [
             'Link with birth certificate registration',
             'Partner with schools for enrollment drives',
@@ -162,8 +270,10 @@ def calculate_life_events(df_enrol, df_bio, df_demo):
     })
     
     print(f"   Life events identified: {len(life_events)}")
+    print(f"   Activity cube: {len(states)} states x {len(months)} months x {len(AGE_BANDS)} age bands "
+          f"x {len(ACTIVITIES)} activities")
     
-    return life_events, monthly_by_age
+    return life_events, monthly_by_age, cube_frame(states, months, cube)
 
 
 def calculate_age_cohort_forecast(df_enrol):
@@ -174,7 +284,7 @@ def calculate_age_cohort_forecast(df_enrol):
     """
     print("\n📈 Generating Age Cohort Demand Forecast...")
     
-    state_age = df_enrol.groupby('state').agg({
+    state_age = df_enrol.groupby('state', observed=True).agg({
         'age_0_5': 'sum',
         'age_5_17': 'sum',
         'age_18_greater': 'sum',
@@ -204,41 +314,20 @@ def calculate_age_cohort_forecast(df_enrol):
     return state_age
 
 
-def calculate_service_deserts(df_enrol):
-    """
-    INNOVATION 4: Service Desert Detection
-    
-    Identify geographic areas that are underserved.
-    """
-    print("\n🏜️ Detecting Service Deserts...")
-    
-    # Pincode-level stats
-    pincode_stats = df_enrol.groupby(['state', 'district', 'pincode']).agg({
-        'total_enrol': 'sum',
-        'date': 'nunique'
-    }).reset_index()
-    pincode_stats.columns = ['state', 'district', 'pincode', 'total_enrol', 'active_days']
-    
-    # District-level aggregation
-    district_stats = pincode_stats.groupby(['state', 'district']).agg({
-        'pincode': 'nunique',
-        'total_enrol': 'sum',
-        'active_days': 'mean'
-    }).reset_index()
-    district_stats.columns = ['state', 'district', 'unique_pincodes', 'total_enrol', 'avg_active_days']
-    
+def score_deserts(district_stats, sketch_error=None):
+    """Service density, desert flag, desert score and priority of each district, from total_enrol and unique_pincodes."""
     # Service density
     district_stats['enrol_per_pincode'] = (
         district_stats['total_enrol'] / district_stats['unique_pincodes']
     ).round(0)
     
     # Identify deserts
-    median_density = district_stats['enrol_per_pincode'].median()
+    median_density = median(district_stats['enrol_per_pincode'], sketch_error)
     district_stats['is_service_desert'] = district_stats['enrol_per_pincode'] < (median_density * 0.3)
     
     # Desert score (0-100, higher = more underserved)
     district_stats['desert_score'] = (
-        100 - district_stats['enrol_per_pincode'].rank(pct=True) * 100
+        100 - percentile_rank(district_stats['enrol_per_pincode'], sketch_error) * 100
     ).round(0)
     
     # Priority level
@@ -246,29 +335,49 @@ def calculate_service_deserts(df_enrol):
         lambda x: 'Critical' if x >= 80 else ('High' if x >= 60 else ('Medium' if x >= 40 else 'Low'))
     )
     
-    print(f"   Districts analyzed: {len(district_stats)}")
-    print(f"   Service deserts identified: {district_stats['is_service_desert'].sum()}")
-    
     return district_stats
 
 
-def calculate_sdg_alignment(df_enrol, df_bio, df_demo):
+def calculate_service_deserts(df_enrol, sketch_error=None, sketches=None):
     """
-    INNOVATION 5: Aadhaar SDG Alignment Score
+    INNOVATION 4: Service Desert Detection
     
-    Link Aadhaar progress to UN Sustainable Development Goals.
+    Identify geographic areas that are underserved.
+    
+    sketch_error switches distinct pincodes to HyperLogLog (read from the
+    stored enrolment sketches when given) and the density median and ranks
+    to KLL sketches.
     """
-    print("\n🎯 Calculating SDG Alignment Scores...")
+    print("\n🏜️ Detecting Service Deserts...")
+    
+    # Pincode-level stats (cube rollups already carry active_days)
+    active_days = ('active_days', 'sum') if 'active_days' in df_enrol.columns else ('date', 'nunique')
+    pincode_stats = df_enrol.groupby(['state', 'district', 'pincode'], observed=True).agg(
+        total_enrol=('total_enrol', 'sum'),
+        active_days=active_days
+    ).reset_index()
+    pincode_stats.columns = ['state', 'district', 'pincode', 'total_enrol', 'active_days']
     
-    sdg_df = df_enrol.groupby('state').agg({
+    # District-level aggregation
+    district_stats = pincode_stats.groupby(['state', 'district'], observed=True).agg({
         'total_enrol': 'sum',
-        'age_0_5': 'sum',
-        'age_5_17': 'sum',
-        'age_18_greater': 'sum',
-        'pincode': 'nunique',
-        'district': 'nunique'
+        'active_days': 'mean'
     }).reset_index()
+    district_stats.insert(2, 'unique_pincodes', distinct_counts(
+        pincode_stats, ['state', 'district'], 'pincode', sketch_error,
+        (sketches or {}).get('pincode')).to_numpy())
+    district_stats.columns = ['state', 'district', 'unique_pincodes', 'total_enrol', 'avg_active_days']
+    
+    district_stats = score_deserts(district_stats, sketch_error)
+    
+    print(f"   Districts analyzed: {len(district_stats)}")
+    print(f"   Service deserts identified: {district_stats['is_service_desert'].sum()}")
     
+    return district_stats
+
+
+def score_sdg(sdg_df):
+    """SDG sub-scores, alignment score and level of each state, from its enrolment totals and distinct pincodes."""
     sdg_df['population'] = sdg_df['state'].map(INDIA_STATE_POPULATION).fillna(1000000)
     
     # SDG 16.9: Legal Identity for All
@@ -305,52 +414,232 @@ def calculate_sdg_alignment(df_enrol, df_bio, df_demo):
         lambda x: 'Leader' if x >= 80 else ('Achiever' if x >= 60 else ('Emerging' if x >= 40 else 'Lagging'))
     )
     
+    return sdg_df
+
+
+def calculate_sdg_alignment(df_enrol, df_bio, df_demo, sketch_error=None, sketches=None):
+    """
+    INNOVATION 5: Aadhaar SDG Alignment Score
+    
+    Link Aadhaar progress to UN Sustainable Development Goals.
+    
+    sketch_error switches the pincode/district distinct counts to HyperLogLog
+    (read from the stored enrolment sketches when given).
+    """
+    print("\n🎯 Calculating SDG Alignment Scores...")
+    
+    sdg_df = df_enrol.groupby('state', observed=True).agg({
+        'total_enrol': 'sum',
+        'age_0_5': 'sum',
+        'age_5_17': 'sum',
+        'age_18_greater': 'sum',
+    }).reset_index()
+    for col in ['pincode', 'district']:
+        sdg_df[col] = distinct_counts(df_enrol, 'state', col, sketch_error, (sketches or {}).get(col)).to_numpy()
+    
+    sdg_df = score_sdg(sdg_df)
+    
     print(f"   States analyzed: {len(sdg_df)}")
     print(f"   National SDG Score: {sdg_df['sdg_alignment_score'].mean():.1f}/100")
     
     return sdg_df
 
 
-def main():
-    """Generate all breakthrough innovation data."""
+def calculate_rolling_metrics(windows, sketch_error=None):
+    """
+    Recent change of INNOVATIONS 1, 4 and 5
+    
+    Migration index, desert scores and SDG sub-scores over the last 7, 30
+    and 90 days, from the sliding-window sums in windows.py and scored with
+    the same rules as the all-history calculators. Returns
+    (district_windows, state_windows), one block of rows per window length.
+    """
+    print("\n📅 Calculating Rolling-Window Metrics...")
+    
+    district_frames, state_frames = [], []
+    for days in windows.windows:
+        sums = windows.district_sums(days)
+        
+        # Districts: migration over any activity, deserts over enrolling districts
+        districts = sums[(sums['enrol_rows'] > 0) | (sums['demo_rows'] > 0)].reset_index(drop=True)
+        districts = score_migration(
+            districts[['state', 'district', 'total_enrol', 'total_demo', 'unique_pincodes']].copy(), sketch_error)
+        deserts = score_deserts(districts.loc[districts['unique_pincodes'] > 0, ['total_enrol', 'unique_pincodes']].copy(),
+                                sketch_error)
+        districts = districts.join(deserts.drop(columns=['total_enrol', 'unique_pincodes']))
+        district_frames.append(districts)
+        
+        # States: migration over any activity, SDG sub-scores over enrolling states
+        states = sums.groupby('state')[WINDOW_COLUMNS].sum().reset_index()
+        states = states[(states['enrol_rows'] > 0) | (states['demo_rows'] > 0)].reset_index(drop=True)
+        states['pincode'] = states['state'].map(windows.state_pincodes(days)).fillna(0).astype('int64')
+        scored = score_migration(states[['state', 'total_enrol', 'total_demo']].copy(), sketch_error)
+        sdg = score_sdg(states.loc[states['enrol_rows'] > 0,
+                                   ['state', 'total_enrol', 'age_5_17', 'age_18_greater', 'pincode']].copy())
+        state_frames.append(scored.join(sdg.drop(columns=['state', 'total_enrol'])))
+    
+    as_of = windows.as_of()
+    district_windows = pd.concat(
+        [df.assign(window_days=days, as_of=as_of) for df, days in zip(district_frames, windows.windows)],
+        ignore_index=True)
+    state_windows = pd.concat(
+        [df.assign(window_days=days, as_of=as_of) for df, days in zip(state_frames, windows.windows)],
+        ignore_index=True)
+    front = ['window_days', 'as_of']
+    district_windows = district_windows[front + [c for c in district_windows.columns if c not in front]]
+    state_windows = state_windows[front + [c for c in state_windows.columns if c not in front]]
+    
+    if as_of is not None:
+        latest = district_windows[district_windows['window_days'] == min(windows.windows)]
+        print(f"   As of {as_of:%Y-%m-%d}: {len(latest):,} districts active in the last {min(windows.windows)} days")
+    
+    return district_windows, state_windows
+
+
+def calculate_local_migrations(facts, sketch_error=None):
+    """District and pincode migration frames, in that order."""
+    return tuple(calculate_local_migration(facts, level, sketch_error) for level in ['district', 'pincode'])
+
+
+def calculate_window_metrics(facts, incremental=False, sketch_error=None):
+    """Rolling-window metrics with the window state brought up to the last day of the fact table."""
+    return calculate_rolling_metrics(update_windows(facts, incremental), sketch_error)
+
+
+def load_stage_inputs(incremental=False, backend=None, chunk_mb=None, sketches=False):
+    """Cube inputs, plus the fact table and the daily rollups on their own for stages that need nothing else."""
+    inputs = load_inputs(incremental, backend, chunk_mb, sketches)
+    return inputs, inputs['pincode_daily'], {key: inputs[key] for key in DAILY_ROLLUPS}
+
+
+def build_stages(incremental=False, backend=None, chunk_mb=None, sketch_error=None):
+    """
+    Pipeline stages: the aggregation cube, then the five independent
+    innovation calculators (migration also at district and pincode level,
+    with estimated district corridors),
+    their 7/30/90-day window versions, 30-day enrolment forecasts for every
+    geography, streaming pincode anomaly detection, district regime shifts,
+    district clusters over the innovation outputs, the dashboard KPI/rollup
+    tables and the drill-down pyramid, each writing its own output file.
+    
+    CPU-heavy stages run in worker processes (process=True), so their
+    functions are module-level functions or partials rather than lambdas.
+    """
+    return [
+        Stage('cube', lambda: load_stage_inputs(incremental, backend, chunk_mb, sketch_error is not None),
+              outputs={'inputs': None, 'facts': None, 'daily': None}),
+        Stage('migration_flow',
+              lambda inputs: calculate_migration_flow(inputs['enrol_state'], inputs['demo_state'], sketch_error),
+              inputs=('inputs',),
+              outputs={'migration': PROCESSED_PATH / 'migration_flow_analysis.parquet'}),
+        Stage('local_migration', partial(calculate_local_migrations, sketch_error=sketch_error),
+              inputs=('facts',),
+              outputs={'district_migration': PROCESSED_PATH / 'district_migration.parquet',
+                       'pincode_migration': PROCESSED_PATH / 'pincode_migration.parquet'},
+              process=True),
+        Stage('migration_corridors', estimate_corridors,
+              inputs=('facts',),
+              outputs={'migration_corridors': PROCESSED_PATH / 'migration_corridors.parquet'},
+              process=True),
+        Stage('rolling_windows', partial(calculate_window_metrics, incremental=incremental, sketch_error=sketch_error),
+              inputs=('facts',),
+              outputs={'district_windows': PROCESSED_PATH / 'district_windows.parquet',
+                       'state_windows': PROCESSED_PATH / 'state_windows.parquet'},
+              process=True),
+        Stage('life_events', calculate_life_events,
+              inputs=('facts',),
+              outputs={'life_events': PROCESSED_PATH / 'life_events_framework.parquet',
+                       'life_events_monthly': PROCESSED_PATH / 'life_events_monthly.parquet',
+                       'life_events_cube': PROCESSED_PATH / 'life_events_cube.parquet'}),
+        Stage('age_cohort_forecast',
+              lambda inputs: calculate_age_cohort_forecast(inputs['enrol_state']),
+              inputs=('inputs',),
+              outputs={'age_forecast': PROCESSED_PATH / 'age_cohort_forecast.parquet'}),
+        Stage('service_deserts',
+              lambda inputs: calculate_service_deserts(inputs['enrol_pincode'], sketch_error,
+                                                       inputs.get('enrol_sketches')),
+              inputs=('inputs',),
+              outputs={'service_deserts': PROCESSED_PATH / 'service_desert_analysis.parquet'}),
+        Stage('sdg_alignment',
+              lambda inputs: calculate_sdg_alignment(inputs['enrol_pincode'], inputs['bio_daily'], inputs['demo_daily'],
+                                                   sketch_error, inputs.get('enrol_sketches')),
+              inputs=('inputs',),
+              outputs={'sdg_scores': PROCESSED_PATH / 'sdg_alignment_scores.parquet'}),
+        Stage('forecasts', build_forecasts,
+              inputs=('facts',),
+              outputs={f'{level}_forecast': path for level, path in FORECAST_FILES.items()},
+              process=True),
+        Stage('anomalies', partial(detect_anomalies, incremental=incremental),
+              inputs=('facts', 'daily'),
+              outputs={'pincode_anomalies': None},  # written state-partitioned by the stage
+              process=True),
+        Stage('regime_shifts', detect_regime_shifts,
+              inputs=('facts',),
+              outputs={'regime_shifts': PROCESSED_PATH / 'district_regime_shifts.parquet'},
+              process=True),
+        Stage('district_clusters', build_clusters,
+              inputs=('facts', 'district_migration', 'service_deserts', 'sdg_scores'),
+              outputs={'district_features': PROCESSED_PATH / 'district_features.parquet',
+                       'district_clusters': None},  # written state-partitioned by the stage
+              process=True),
+        Stage('dashboard_tables', dashboard_tables,
+              inputs=('inputs',),
+              outputs={'kpis': PROCESSED_PATH / 'dashboard_kpis.parquet',
+                       'state_rollup': PROCESSED_PATH / 'state_rollup.parquet'}),
+        Stage('drilldown', build_pyramid,
+              inputs=('facts',),
+              outputs={f'drilldown_{level}': pyramid_path(level) for level in LEVELS},
+              process=True),
+    ]
+
+
+def main(incremental=False, backend=None, chunk_mb=None, sketch_error=None):
+    """
+    Generate all breakthrough innovation data.
+    
+    With incremental=True only raw files added since the last run are parsed
+    and the outputs are refreshed from the pincode-day rollups; returns None
+    when no new raw files arrived and the outputs already exist.
+    backend selects 'pandas' or 'polars' (defaults to UIDAI_BACKEND).
+    chunk_mb runs out of core: raw files are streamed in chunks of that size
+    and merged as partial aggregates, bypassing the clean dataset cache.
+    sketch_error computes distinct counts, medians and percentile ranks from
+    mergeable sketches with that relative error (see sketches.py).
+    """
     print("="*60)
     print("🏆 BREAKTHROUGH INNOVATIONS - DATA GENERATION")
     print("="*60)
     
     # Load data
-    df_bio, df_demo, df_enrol = load_data()
-    
-    # Generate innovations
-    migration_df = calculate_migration_flow(df_enrol, df_demo)
-    life_events, monthly_patterns = calculate_life_events(df_enrol, df_bio, df_demo)
-    age_forecast = calculate_age_cohort_forecast(df_enrol)
-    service_deserts = calculate_service_deserts(df_enrol)
-    sdg_scores = calculate_sdg_alignment(df_enrol, df_bio, df_demo)
-    
-    # Save all outputs
-    print("\n💾 Saving innovation data...")
-    PROCESSED_PATH.mkdir(exist_ok=True)
-    
-    migration_df.to_parquet(PROCESSED_PATH / 'migration_flow_analysis.parquet', index=False)
-    life_events.to_parquet(PROCESSED_PATH / 'life_events_framework.parquet', index=False)
-    monthly_patterns.to_parquet(PROCESSED_PATH / 'life_events_monthly.parquet', index=False)
-    age_forecast.to_parquet(PROCESSED_PATH / 'age_cohort_forecast.parquet', index=False)
-    service_deserts.to_parquet(PROCESSED_PATH / 'service_desert_analysis.parquet', index=False)
-    sdg_scores.to_parquet(PROCESSED_PATH / 'sdg_alignment_scores.parquet', index=False)
+    if incremental:
+        changed = ingest_new_files(backend)
+        if not changed and all((PROCESSED_PATH / f).exists() for f in OUTPUT_FILES):
+            print("\n✅ No new raw files - innovation outputs are up to date.")
+            return None
+    
+    # Run the cube and innovation stages concurrently (heavy ones in worker processes),
+    # writing each output as it finishes
+    print("\n⚙️ Running innovation stages...")
+    artifacts, timings = run_stages(build_stages(incremental, backend, chunk_mb, sketch_error))
+    
+    migration_df = artifacts['migration']
+    life_events = artifacts['life_events']
+    age_forecast = artifacts['age_forecast']
+    service_deserts = artifacts['service_deserts']
+    sdg_scores = artifacts['sdg_scores']
     
     print("\n✅ All innovation data generated successfully!")
     print("\n📁 Files created:")
-    print("   - migration_flow_analysis.parquet")
-    print("   - life_events_framework.parquet")
-    print("   - life_events_monthly.parquet")
-    print("   - age_cohort_forecast.parquet")
-    print("   - service_desert_analysis.parquet")
-    print("   - sdg_alignment_scores.parquet")
+    for filename in OUTPUT_FILES:
+        print(f"   - {filename}")
+    
+    print_timings(timings)
     
     print("\n" + "="*60)
     print("🎯 INNOVATION SUMMARY")
     print("="*60)
-    print(f"   Migration Hubs: {(migration_df['migration_type'] == 'Migration Hub (Receiving)').sum()} states")
+    print(f"   Migration Hubs: {(migration_df['migration_type'] == 'Migration Hub (Receiving)').sum()} states, "
+          f"{(artifacts['district_migration']['migration_type'] == 'Migration Hub (Receiving)').sum()} districts")
     print(f"   Life Events: {len(life_events)} milestones identified")
     print(f"   Future Demand: {age_forecast['bio_demand_2031'].sum():,} biometric updates by 2031")
     print(f"   Service Deserts: {service_deserts['is_service_desert'].sum()} districts need intervention")
@@ -360,4 +649,16 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Generate breakthrough innovation data.")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only ingest raw files added since the last run")
+    parser.add_argument('--backend', choices=['pandas', 'polars'], default=None,
+                        help="execution backend (default: UIDAI_BACKEND or pandas)")
+    parser.add_argument('--chunked', nargs='?', type=float, const=CHUNK_MB, default=None, metavar='MB',
+                        help=f"out-of-core mode: stream raw CSVs in chunks of MB (default {CHUNK_MB})")
+    parser.add_argument('--sketch', nargs='?', type=float, const=0.01, default=None, metavar='ERROR',
+                        help="HyperLogLog/KLL sketches for distinct counts and medians (default error 0.01)")
+    args = parser.parse_args()
+    if args.chunked is not None and args.incremental:
+        parser.error("--chunked recomputes from raw_data/ and cannot be combined with --incremental")
+    main(incremental=args.incremental, backend=args.backend, chunk_mb=args.chunked, sketch_error=args.sketch)
@@ -0,0 +1,165 @@
+"""
+📉 CHANGE-POINT DETECTION
+Aadhaar Life Cycle Intelligence Platform
+
+Regime shifts in every district's daily enrolments and demographic updates:
+
+    processed_data/district_regime_shifts.parquet
+
+The daily series of all districts and both activities are stacked into one
+(series x days) matrix and segmented together by binary segmentation on the
+cumulative sums: each round scores every possible split of every current
+segment of every series as NumPy operations over the whole matrix, and keeps
+each series' best split when its drop in squared error beats a BIC-style
+penalty scaled by the series' own noise level. The rounds (at most
+MAX_SHIFTS) loop over the matrix, never over districts.
+"""
+
+import numpy as np
+import pandas as pd
+from forecasting import series_matrix
+
+# Activities segmented per district: name -> fact table column
+METRICS = {
+    'enrolment': 'total_enrol',
+    'demographic': 'total_demo',
+}
+
+# Shortest regime (days), most shifts kept per series, and the penalty
+# multiplier on noise variance x log(days)
+MIN_SEGMENT = 7
+MAX_SHIFTS = 5
+PENALTY = 3.0
+
+SHIFT_COLUMNS = ['state', 'district', 'metric', 'date', 'before_mean', 'after_mean', 'change_pct', 'direction', 'score']
+
+
+def noise_variance(matrix):
+    """
+    Robust per-series noise variance from the median absolute first difference.
+
+    Differencing removes level shifts, so the shifts being searched for do not
+    inflate the estimate. Flat series fall back to their variance, then 1.
+    """
+    if matrix.shape[1] < 2:
+        return np.ones(len(matrix))
+    mad = np.median(np.abs(np.diff(matrix, axis=1)), axis=1)
+    variance = (1.4826 * mad) ** 2 / 2
+    variance = np.where(variance > 0, variance, matrix.var(axis=1))
+    return np.maximum(variance, 1.0)
+
+
+def _segment_bounds(cuts):
+    """
+    Start and end of the segment around every split position.
+
+    cuts is a boolean (series x days + 1) matrix of segment boundaries (the
+    first and last column always set). For each position t = 1..days-1,
+    returns the last boundary before t and the first boundary after t.
+    """
+    positions = np.arange(cuts.shape[1])
+    last = np.maximum.accumulate(np.where(cuts, positions, 0), axis=1)
+    following = np.minimum.accumulate(np.where(cuts, positions, cuts.shape[1] - 1)[:, ::-1], axis=1)[:, ::-1]
+    return last[:, :-2], following[:, 2:]
+
+
+def _split_gain(cumsum, cuts):
+    """
+    Drop in squared error from splitting each series' segment at every position.
+
+    Returns a (series x days - 1) matrix for positions 1..days-1; positions
+    that are already boundaries or would leave a regime shorter than
+    MIN_SEGMENT get -inf.
+    """
+    start, end = _segment_bounds(cuts)
+    split = np.arange(1, cuts.shape[1] - 1)[None, :]
+    left = split - start
+    right = end - split
+    at = np.take_along_axis
+    before = cumsum[:, 1:-1] - at(cumsum, start, axis=1)
+    after = at(cumsum, end, axis=1) - cumsum[:, 1:-1]
+    valid = (left >= MIN_SEGMENT) & (right >= MIN_SEGMENT) & ~cuts[:, 1:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gain = before ** 2 / left + after ** 2 / right - (before + after) ** 2 / (left + right)
+    return np.where(valid, gain, -np.inf)
+
+
+def segment_series(matrix, max_shifts=MAX_SHIFTS, penalty=PENALTY):
+    """
+    Change points of every row of a (series x days) matrix.
+
+    Returns (series, positions, gain): row index, first day index of the new
+    regime and the squared-error drop of each accepted change point.
+    """
+    n_series, n_days = matrix.shape
+    cuts = np.zeros((n_series, n_days + 1), dtype=bool)
+    cuts[:, [0, -1]] = True
+    if n_days < 2 * MIN_SEGMENT:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    cumsum = np.concatenate([np.zeros((n_series, 1)), np.cumsum(matrix, axis=1)], axis=1)
+    threshold = penalty * noise_variance(matrix) * np.log(n_days)
+
+    # Binary segmentation: every series gains at most one change point per round
+    rows = np.arange(n_series)
+    active = np.ones(n_series, dtype=bool)
+    for _ in range(max_shifts):
+        gain = _split_gain(cumsum[active], cuts[active])
+        best = gain.argmax(axis=1)
+        accept = gain[np.arange(len(best)), best] > threshold[active]
+        if not accept.any():
+            break
+        idx = rows[active]
+        cuts[idx[accept], best[accept] + 1] = True
+        active[idx[~accept]] = False
+
+    series, positions = np.nonzero(cuts[:, 1:-1])
+    positions = positions + 1
+    # Squared-error drop of each change point given its neighbouring boundaries
+    start, end = _segment_bounds(cuts)
+    s, e = start[series, positions - 1], end[series, positions - 1]
+    before = cumsum[series, positions] - cumsum[series, s]
+    after = cumsum[series, e] - cumsum[series, positions]
+    gain = before ** 2 / (positions - s) + after ** 2 / (e - positions) - (before + after) ** 2 / (e - s)
+    return series, positions, gain
+
+
+def detect_regime_shifts(facts):
+    """Regime shifts of every district's enrolment and demographic series, in SHIFT_COLUMNS layout."""
+    print("\n📉 Detecting district regime shifts...")
+
+    blocks = [series_matrix(facts, 'district', column) for column in METRICS.values()]
+    labels, dates = blocks[0][0], blocks[0][1]
+    matrix = np.vstack([block[2] for block in blocks])
+    if matrix.shape[1] < 2 * MIN_SEGMENT:
+        print("   Not enough days to segment")
+        return pd.DataFrame(columns=SHIFT_COLUMNS)
+
+    series, positions, gain = segment_series(matrix)
+    cumsum = np.concatenate([np.zeros((len(matrix), 1)), np.cumsum(matrix, axis=1)], axis=1)
+
+    # Means of the regimes either side of each change point
+    bounds = pd.DataFrame({'series': series, 'position': positions})
+    previous = bounds.groupby('series')['position'].shift(1, fill_value=0).to_numpy()
+    following = bounds.groupby('series')['position'].shift(-1, fill_value=matrix.shape[1]).to_numpy()
+    before_mean = (cumsum[series, positions] - cumsum[series, previous]) / (positions - previous)
+    after_mean = (cumsum[series, following] - cumsum[series, positions]) / (following - positions)
+
+    district = series % len(labels)
+    shifts = pd.DataFrame({
+        'state': labels['state'].to_numpy()[district],
+        'district': labels['district'].to_numpy()[district],
+        'metric': np.array(list(METRICS))[series // len(labels)],
+        'date': dates[positions],
+        'before_mean': before_mean.round(1),
+        'after_mean': after_mean.round(1),
+        'change_pct': np.where(before_mean > 0, (after_mean - before_mean) / np.maximum(before_mean, 1e-9) * 100,
+                               np.nan).round(1),
+        'direction': np.where(after_mean > before_mean, 'increase', 'decrease'),
+        'score': (gain / noise_variance(matrix)[series]).round(1),
+    })
+    shifts = shifts.sort_values(['date', 'state', 'district', 'metric'], kind='stable').reset_index(drop=True)
+
+    print(f"   Series segmented: {len(matrix):,} over {matrix.shape[1]} days | "
+          f"Regime shifts: {len(shifts):,} in {shifts[['state', 'district']].drop_duplicates().shape[0]:,} districts")
+
+    return shifts
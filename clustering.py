@@ -0,0 +1,267 @@
+"""
+🧩 DISTRICT CLUSTERING
+Aadhaar Life Cycle Intelligence Platform
+
+District segments from the innovation outputs, as a pipeline stage instead of
+a notebook pass:
+
+    processed_data/district_features.parquet  - one feature row per district
+    processed_data/district_clusters.parquet/state=<state>/
+                                              - the features plus a cluster label,
+                                                as of the last day of the facts
+
+Each district's feature vector combines its enrolment age mix, migration
+index, service desert score and its state's SDG sub-scores. Vectors are
+standardized and clustered with mini-batch k-means, refined with full k-means
+steps, against the centroids of the previous run
+(processed_data/cluster_centroids.npz, kept in feature units so a new scaling
+does not invalidate them). Small deltas keep those centroids:
+the model is refitted, warm-started from them, only when one step of k-means
+would move some centroid by more than DRIFT_THRESHOLD standard deviations.
+Refitted centroids are matched to the previous ones, and a district keeps its
+previous cluster unless another centroid is closer by more than HYSTERESIS
+standard deviations, so districts near a boundary do not flip between runs.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from facts import rollup_facts
+from ingestion import PROCESSED_PATH, remove_dataset, replace_partitioned
+
+# Segments and mini-batch size
+N_CLUSTERS = 3
+BATCH_SIZE = 256
+
+# Centroid movement (in standard deviations) that triggers a refit, and how much
+# closer (in standard deviations) another centroid must be to relabel a district
+DRIFT_THRESHOLD = 0.25
+HYSTERESIS = 0.25
+
+# Full k-means steps refining each mini-batch fit
+REFINE_STEPS = 20
+
+# Columns of the feature table the clusters are fitted on
+FEATURE_COLUMNS = [
+    'pct_0_5', 'pct_5_17', 'pct_18_plus',
+    'migration_index', 'desert_score',
+    'sdg_16_9_identity', 'sdg_1_3_protection', 'sdg_4_1_education', 'sdg_10_2_inclusion',
+]
+
+SDG_COLUMNS = ['sdg_16_9_identity', 'sdg_1_3_protection', 'sdg_4_1_education', 'sdg_10_2_inclusion']
+
+CENTROIDS_PATH = PROCESSED_PATH / 'cluster_centroids.npz'
+CLUSTERS_PATH = PROCESSED_PATH / 'district_clusters.parquet'
+
+
+def build_district_features(facts, district_migration, service_deserts, sdg_scores):
+    """
+    Feature table of every district with enrolments.
+
+    Age bands come from the fact table; migration, desert and SDG columns are
+    joined from the innovation outputs (SDG sub-scores are per state).
+    """
+    ages = rollup_facts(facts, 'district', ['total_enrol', 'age_0_5', 'age_5_17', 'age_18_greater'])
+    features = ages[ages['total_enrol'] > 0].reset_index(drop=True)
+    for col, band in [('pct_0_5', 'age_0_5'), ('pct_5_17', 'age_5_17'), ('pct_18_plus', 'age_18_greater')]:
+        features[col] = (features[band] / features['total_enrol'] * 100).round(2)
+
+    deserts = service_deserts[['state', 'district', 'unique_pincodes', 'enrol_per_pincode', 'desert_score']]
+    migration = district_migration[['state', 'district', 'migration_index']]
+    sdg = sdg_scores[['state'] + SDG_COLUMNS]
+    for frame, keys in [(deserts, ['state', 'district']), (migration, ['state', 'district']), (sdg, ['state'])]:
+        frame = frame.astype({col: str for col in keys})
+        features = features.merge(frame, on=keys, how='left')
+
+    features = features.rename(columns={'unique_pincodes': 'pincode'})
+    features[FEATURE_COLUMNS] = features[FEATURE_COLUMNS].fillna(0.0)
+    return features
+
+
+def load_centroids(path=CENTROIDS_PATH):
+    """
+    Saved clustering, or None if missing or fitted on other features.
+
+    Returns (centroids, labels): centroids in feature units, one row per
+    cluster, and the previous label of each district as a Series keyed by
+    (state, district).
+    """
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        if data['features'].tolist() != FEATURE_COLUMNS:
+            return None
+        index = pd.MultiIndex.from_arrays([data['states'], data['districts']], names=['state', 'district'])
+        return data['centroids'], pd.Series(data['labels'], index=index)
+
+
+def save_centroids(centroids, clusters, path=CENTROIDS_PATH):
+    """Write the centroids and district labels atomically (readers never see a half-written file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.savez(f, features=np.array(FEATURE_COLUMNS), centroids=centroids,
+                 states=clusters['state'].to_numpy(dtype=str), districts=clusters['district'].to_numpy(dtype=str),
+                 labels=clusters['cluster'].to_numpy())
+    os.replace(tmp, path)
+
+
+def lloyd_step(Z, centroids):
+    """
+    One full k-means step: each centroid moved to the mean of its nearest districts.
+
+    Returns (new centroids, cluster sizes); a centroid left without districts
+    stays where it is.
+    """
+    nearest = np.linalg.norm(Z[:, None, :] - centroids[None, :, :], axis=2).argmin(axis=1)
+    sizes = np.bincount(nearest, minlength=len(centroids))
+    sums = np.zeros_like(centroids)
+    np.add.at(sums, nearest, Z)
+    moved = centroids.copy()
+    moved[sizes > 0] = sums[sizes > 0] / sizes[sizes > 0, None]
+    return moved, sizes
+
+
+def centroid_drift(Z, centroids):
+    """
+    Largest distance one k-means step would move a centroid (standardized units).
+
+    A centroid left without districts counts as infinite drift.
+    """
+    moved, sizes = lloyd_step(Z, centroids)
+    if (sizes == 0).any():
+        return np.inf
+    return float(np.linalg.norm(moved - centroids, axis=1).max())
+
+
+def refine(Z, centroids, steps=REFINE_STEPS):
+    """
+    Centroids after full k-means steps until they stop moving (at most steps).
+
+    Mini-batch centroids are only near a fixed point; refining them makes the
+    next run's drift measure changes in the features, not batch noise.
+    Returns (centroids, cluster sizes).
+    """
+    for _ in range(steps):
+        moved, sizes = lloyd_step(Z, centroids)
+        converged = np.allclose(moved, centroids, rtol=0, atol=1e-9)
+        centroids = moved
+        if converged:
+            break
+    return centroids, sizes
+
+
+def sticky_labels(Z, centroids, previous_labels):
+    """
+    Cluster of each district, preferring its previous cluster.
+
+    A district keeps its previous label unless the nearest centroid is closer
+    than the previous one by more than HYSTERESIS; districts without a
+    previous label (NaN) take the nearest. Returns (labels, distances to the
+    assigned centroids).
+    """
+    distance = np.linalg.norm(Z[:, None, :] - centroids[None, :, :], axis=2)
+    labels = distance.argmin(axis=1)
+    rows = np.flatnonzero(~np.isnan(previous_labels))
+    keep = previous_labels[rows].astype(np.intp)
+    stay = distance[rows, keep] - distance[rows, labels[rows]] <= HYSTERESIS
+    labels[rows[stay]] = keep[stay]
+    return labels.astype(np.int32), distance[np.arange(len(labels)), labels]
+
+
+def stable_order(centroids, previous, sizes):
+    """
+    Label of each fitted cluster.
+
+    With previous centroids, clusters take the label of the previous centroid
+    they are matched to (minimum total distance); otherwise labels follow
+    cluster size, largest first.
+    """
+    if previous is None:
+        order = np.argsort(-sizes, kind='stable')
+        labels = np.empty(len(order), dtype=np.int32)
+        labels[order] = np.arange(len(order))
+        return labels
+    from scipy.optimize import linear_sum_assignment
+
+    cost = ((centroids[:, None, :] - previous[None, :, :]) ** 2).sum(axis=2)
+    rows, cols = linear_sum_assignment(cost)
+    labels = np.empty(len(centroids), dtype=np.int32)
+    labels[rows] = cols
+    return labels
+
+
+def cluster_districts(features, n_clusters=N_CLUSTERS):
+    """
+    Cluster label of every district in the feature table.
+
+    Keeps the saved centroids while their drift stays within DRIFT_THRESHOLD;
+    otherwise refits (mini-batch, then refined with full k-means steps),
+    warm-started from the saved centroids when they were fitted on the same
+    features and number of clusters. Districts are then
+    labelled with hysteresis against their previous labels (sticky_labels),
+    and the centroids and labels are saved for the next run. Returns the
+    feature table with cluster and distance-to-centroid columns.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+
+    print("\n🧩 Clustering districts...")
+
+    clusters = features.copy()
+    k = min(n_clusters, len(clusters))
+    if k == 0:
+        clusters['cluster'] = pd.Series(dtype=np.int32)
+        clusters['centroid_distance'] = pd.Series(dtype=np.float64)
+        return clusters
+
+    X = clusters[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    center, scale = X.mean(axis=0), X.std(axis=0)
+    scale[scale == 0] = 1.0
+    Z = (X - center) / scale
+
+    saved = load_centroids()
+    previous, previous_labels = saved if saved is not None and len(saved[0]) == k else (None, None)
+    keys = pd.MultiIndex.from_frame(clusters[['state', 'district']].astype(str))
+    before = (previous_labels.reindex(keys).to_numpy(dtype=np.float64) if previous_labels is not None
+              else np.full(len(clusters), np.nan))
+
+    drift = centroid_drift(Z, (previous - center) / scale) if previous is not None else np.inf
+    if drift <= DRIFT_THRESHOLD:
+        centroids = previous
+        mode = f'saved centroids, drift {drift:.2f}'
+    else:
+        if previous is not None:
+            model = MiniBatchKMeans(k, init=(previous - center) / scale, n_init=1,
+                                    batch_size=BATCH_SIZE, random_state=0).fit(Z)
+        else:
+            model = MiniBatchKMeans(k, n_init=3, batch_size=BATCH_SIZE, random_state=0).fit(Z)
+        fitted, sizes = refine(Z, model.cluster_centers_)
+        order = stable_order(fitted, None if previous is None else (previous - center) / scale, sizes)
+        centroids = np.empty_like(fitted)
+        centroids[order] = fitted * scale + center
+        mode = 'warm start' if previous is not None else 'cold start'
+
+    labels, distance = sticky_labels(Z, (centroids - center) / scale, before)
+    clusters['cluster'] = labels
+    clusters['centroid_distance'] = distance.round(3)
+    save_centroids(centroids, clusters)
+
+    print(f"   Districts clustered: {len(clusters):,} into {k} segments ({mode})")
+    seen = ~np.isnan(before)
+    if previous_labels is not None:
+        print(f"   Label changes since last run: {int((before[seen] != labels[seen]).sum()):,} "
+              f"of {int(seen.sum()):,} districts")
+
+    return clusters
+
+
+def build_clusters(facts, district_migration, service_deserts, sdg_scores):
+    """District feature table and its clusters, in that order; the clusters are also written state-partitioned."""
+    features = build_district_features(facts, district_migration, service_deserts, sdg_scores)
+    clusters = cluster_districts(features)
+    if len(clusters):
+        clusters['as_of'] = facts['date'].max()
+        replace_partitioned(clusters, CLUSTERS_PATH, date=None)
+    else:
+        remove_dataset(CLUSTERS_PATH)
+    return features, clusters
@@ -0,0 +1,124 @@
+"""
+🛣️ MIGRATION CORRIDORS
+Aadhaar Life Cycle Intelligence Platform
+
+Estimated district-to-district migration corridors:
+
+    processed_data/migration_corridors.parquet  - the TOP_K strongest corridors
+
+Each district's weekly demographic updates are compared with its own
+baseline. A week well below the baseline is read as people leaving (a drop
+in a source district) and a week well above it as people arriving (a surge
+in a receiving district). Every week, each source's missing volume is split
+across that week's surges in proportion to their size, and the weekly
+pairings are summed into an origin x destination matrix.
+
+Only districts with a drop or a surge in the same week are ever paired, so
+the drop and surge matrices are stored sparse and their product is a sparse
+(districts x districts) matrix: ~1000 x 1000 pairs over the whole history
+stay in memory, and only the top-k corridors are turned into rows.
+"""
+
+import numpy as np
+import pandas as pd
+from forecasting import series_matrix
+
+# Days per period, |z| beyond which a week is a drop or a surge, and corridors kept
+PERIOD = 7
+Z_THRESHOLD = 2.0
+TOP_K = 100
+
+CORRIDOR_COLUMNS = ['origin_state', 'origin_district', 'destination_state', 'destination_district',
+                    'estimated_flow', 'origin_share', 'weeks', 'interstate']
+
+
+def weekly_matrix(facts, column='total_demo'):
+    """
+    Weekly totals of a column per district, as (labels, week starts, matrix).
+
+    Weeks run from the first date of the fact table; a trailing partial
+    week is left out.
+    """
+    labels, dates, daily = series_matrix(facts, 'district', column)
+    weeks = daily.shape[1] // PERIOD
+    matrix = daily[:, :weeks * PERIOD].reshape(len(daily), weeks, PERIOD).sum(axis=2)
+    return labels, dates[:weeks * PERIOD:PERIOD], matrix
+
+
+def drops_and_surges(matrix):
+    """
+    Missing and excess volume of each district-week against the district's baseline.
+
+    The baseline is the district's median week and the spread its scaled
+    median absolute deviation; weeks within Z_THRESHOLD spreads count as
+    neither. Returns two non-negative (districts x weeks) arrays.
+    """
+    baseline = np.median(matrix, axis=1, keepdims=True)
+    spread = np.maximum(1.4826 * np.median(np.abs(matrix - baseline), axis=1, keepdims=True), 1.0)
+    z = (matrix - baseline) / spread
+    drops = np.where(z < -Z_THRESHOLD, baseline - matrix, 0.0)
+    surges = np.where(z > Z_THRESHOLD, matrix - baseline, 0.0)
+    return drops, surges
+
+
+def corridor_matrix(drops, surges):
+    """
+    Sparse origin x destination flow estimate and co-occurring week counts.
+
+    flow[i, j] sums, over weeks, source i's missing volume times receiver j's
+    share of that week's total surge.
+    """
+    from scipy import sparse
+
+    totals = surges.sum(axis=0)
+    shares = sparse.csr_matrix(np.divide(surges, totals, out=np.zeros_like(surges), where=totals > 0))
+    drops = sparse.csr_matrix(drops)
+    flow = (drops @ shares.T).tocoo()
+    weeks = ((drops > 0).astype(np.int32) @ (shares > 0).astype(np.int32).T).tocsr()
+    return flow, weeks
+
+
+def top_corridors(flow, weeks, labels, k=TOP_K):
+    """The k largest entries of the flow matrix as corridor rows, strongest first."""
+    if flow.nnz == 0:
+        return pd.DataFrame(columns=CORRIDOR_COLUMNS)
+    if flow.nnz > k:
+        keep = np.argpartition(-flow.data, k - 1)[:k]
+    else:
+        keep = np.arange(flow.nnz)
+    keep = keep[np.argsort(-flow.data[keep], kind='stable')]
+    origin, destination, volume = flow.row[keep], flow.col[keep], flow.data[keep]
+    outflow = np.asarray(flow.tocsr().sum(axis=1)).ravel()
+
+    states, districts = labels['state'].to_numpy(), labels['district'].to_numpy()
+    return pd.DataFrame({
+        'origin_state': states[origin],
+        'origin_district': districts[origin],
+        'destination_state': states[destination],
+        'destination_district': districts[destination],
+        'estimated_flow': volume.round(0).astype(np.int64),
+        'origin_share': (volume / outflow[origin] * 100).round(1),
+        'weeks': np.asarray(weeks[origin, destination]).ravel().astype(np.int64),
+        'interstate': states[origin] != states[destination],
+    }, columns=CORRIDOR_COLUMNS)
+
+
+def estimate_corridors(facts, k=TOP_K):
+    """Top-k estimated district migration corridors, in CORRIDOR_COLUMNS layout."""
+    print("\n🛣️ Estimating district migration corridors...")
+
+    labels, _, matrix = weekly_matrix(facts)
+    if matrix.shape[1] == 0:
+        print("   Not enough days for a full week")
+        return pd.DataFrame(columns=CORRIDOR_COLUMNS)
+    drops, surges = drops_and_surges(matrix)
+    flow, weeks = corridor_matrix(drops, surges)
+    corridors = top_corridors(flow, weeks, labels, k)
+
+    pairs = len(labels) * (len(labels) - 1)
+    print(f"   Districts: {len(labels):,} over {matrix.shape[1]} weeks | Corridor pairs: {flow.nnz:,} "
+          f"({flow.nnz / max(pairs, 1):.1%} of all pairs) | Kept: {len(corridors):,}")
+    if len(corridors):
+        print(f"   Interstate corridors: {int(corridors['interstate'].sum()):,} of the top {len(corridors):,}")
+
+    return corridors
@@ -0,0 +1,140 @@
+"""
+🔎 DRILL-DOWN INDEX
+Aadhaar Life Cycle Intelligence Platform
+
+Pre-aggregated pyramid of the aggregation cube behind the dashboard's
+state → district → pincode drill-down:
+
+    processed_data/drilldown_national.arrow  - one row per date
+    processed_data/drilldown_state.arrow     - per (state, date)
+    processed_data/drilldown_district.arrow  - per (state, district, date)
+    processed_data/drilldown_pincode.arrow   - per (state, district, pincode, date)
+
+Every level is sorted by its keys and then by date, and written as Arrow IPC
+so the dashboard memory-maps it once for all sessions. DrilldownIndex keeps
+offset tables of each key prefix; a selection is one dictionary lookup plus
+a searchsorted over the dates of that slice, so a drill-down rerun costs
+time proportional to the rows it shows rather than to the whole dataset.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from ingestion import DATASETS, PROCESSED_PATH, read_arrow_mapped
+from aggregation import ROW_COLUMNS, measure_columns
+
+# Pyramid levels, coarsest first, with their keys (each level is also sorted by date)
+LEVELS = {
+    'national': [],
+    'state': ['state'],
+    'district': ['state', 'district'],
+    'pincode': ['state', 'district', 'pincode'],
+}
+
+VALUE_COLUMNS = [c for name in DATASETS for c in measure_columns(name)] + list(ROW_COLUMNS.values())
+
+
+def pyramid_path(level):
+    """Arrow IPC file of one pyramid level."""
+    return PROCESSED_PATH / f'drilldown_{level}.arrow'
+
+
+def build_pyramid(cube):
+    """
+    All pyramid levels from the cube's pincode-day fact table.
+
+    Returns one frame per level in LEVELS order, sorted by keys then date,
+    with state and district as categoricals in alphabetical order.
+    """
+    cube = cube.assign(**{
+        col: cube[col].astype('category').cat.reorder_categories(sorted(cube[col].astype('category').cat.categories))
+        for col in ['state', 'district']
+    })
+    return tuple(
+        cube.groupby(keys + ['date'], observed=True)[VALUE_COLUMNS].sum().reset_index()
+        for keys in LEVELS.values()
+    )
+
+
+class DrilldownIndex:
+    """
+    Offset tables over one sorted pyramid level.
+
+    offsets[n] maps every distinct n-column key prefix (as names) to the
+    (start, end) row range it occupies; within a full key the rows are in
+    date order, so date ranges resolve by binary search.
+    """
+
+    def __init__(self, table, keys):
+        self.table = table.combine_chunks()
+        self.keys = keys
+        self.dates = self.table.column('date').chunk(0).to_numpy() if len(self.table) else np.array([], 'M8[ns]')
+        codes, names = [], []
+        for key in keys:
+            column = self.table.column(key).chunk(0) if len(self.table) else pa.array([])
+            if pa.types.is_dictionary(column.type):
+                codes.append(column.indices.to_numpy(zero_copy_only=False))
+                names.append(column.dictionary.to_pylist())
+            else:
+                codes.append(column.to_numpy(zero_copy_only=False))
+                names.append(None)
+        self.offsets = {0: {(): (0, len(self.table))}}
+        self._children = {}
+        for n in range(1, len(keys) + 1):
+            self.offsets[n] = self._prefix_offsets(codes[:n], names[:n])
+            for prefix in self.offsets[n]:
+                self._children.setdefault(prefix[:-1], []).append(prefix[-1])
+
+    def _prefix_offsets(self, codes, names):
+        """(start, end) of each run of equal key prefixes."""
+        size = len(self.table)
+        change = np.zeros(size, dtype=bool)
+        if size:
+            change[0] = True
+        for column in codes:
+            change[1:] |= column[1:] != column[:-1]
+        starts = np.flatnonzero(change)
+        ends = np.append(starts[1:], size)
+        prefixes = zip(*[
+            [labels[c] for c in column[starts]] if labels is not None else column[starts].tolist()
+            for column, labels in zip(codes, names)
+        ])
+        return {prefix: (int(s), int(e)) for prefix, s, e in zip(prefixes, starts, ends)}
+
+    @classmethod
+    def open(cls, level):
+        """Memory-map a pyramid level written by the pipeline."""
+        return cls(read_arrow_mapped(pyramid_path(level)), LEVELS[level])
+
+    def children(self, prefix=()):
+        """Key values one level below prefix, in sorted order."""
+        return self._children.get(tuple(prefix), [])
+
+    def date_range(self):
+        """(first, last) date of the level, or None if empty."""
+        if len(self.dates) == 0:
+            return None
+        return pd.Timestamp(self.dates.min()), pd.Timestamp(self.dates.max())
+
+    def rows(self, prefix=(), start=None, end=None):
+        """
+        Rows under a key prefix within [start, end], as a DataFrame.
+
+        Only the prefix's rows are converted; for a full key the date range
+        is found by binary search, otherwise the slice is masked by date.
+        """
+        lo, hi = self.offsets[len(prefix)].get(tuple(prefix), (0, 0))
+        start = np.datetime64(pd.Timestamp(start), 'ns') if start is not None else None
+        end = np.datetime64(pd.Timestamp(end), 'ns') if end is not None else None
+        if len(prefix) == len(self.keys):
+            dates = self.dates[lo:hi]
+            first = lo + (np.searchsorted(dates, start, 'left') if start is not None else 0)
+            last = lo + (np.searchsorted(dates, end, 'right') if end is not None else len(dates))
+            return self.table.slice(first, last - first).to_pandas()
+        df = self.table.slice(lo, hi - lo).to_pandas()
+        keep = np.ones(len(df), dtype=bool)
+        if start is not None:
+            keep &= self.dates[lo:hi] >= start
+        if end is not None:
+            keep &= self.dates[lo:hi] <= end
+        return df[keep].reset_index(drop=True)
@@ -0,0 +1,261 @@
+"""
+🦆 DUCKDB ANALYTIC STORE
+Aadhaar Life Cycle Intelligence Platform
+
+Loads the clean enrolment, biometric and demographic datasets into a local
+DuckDB file (processed_data/uidai.duckdb) and defines the five innovations
+as SQL views over it:
+
+    migration_flow, life_events_framework, life_events_monthly,
+    age_cohort_forecast, service_deserts, sdg_alignment
+
+DuckDB is embedded (no server), so the store works on offline machines. The
+dashboard's SQL Explorer page runs ad-hoc queries on it through a shared
+read-only connection.
+
+    python duckdb_store.py           # (re)build the store from the clean datasets
+
+tests/test_duckdb_store.py checks every view against the pandas calculators.
+"""
+
+import os
+import duckdb
+import pandas as pd
+from ingestion import DATASETS, PROCESSED_PATH, clean_columns, clean_path
+
+DUCKDB_PATH = PROCESSED_PATH / 'uidai.duckdb'
+
+# SQL views reproducing the pandas innovation outputs
+INNOVATION_VIEWS = [
+    'migration_flow',
+    'life_events_framework',
+    'life_events_monthly',
+    'age_cohort_forecast',
+    'service_deserts',
+    'sdg_alignment',
+]
+
+# Fractional rank with ties averaged, as pandas rank(pct=True)
+PCT_RANK = "(rank() OVER (ORDER BY {col}) + (count(*) OVER (PARTITION BY {col}) - 1) / 2.0) / count(*) OVER ()"
+
+VIEWS = {
+    # Rows whose keys are all present: the rows the aggregation cube counts
+    **{
+        f'{name}_valid': f"""
+            SELECT * FROM {name}
+            WHERE state IS NOT NULL AND district IS NOT NULL AND date IS NOT NULL
+        """
+        for name in DATASETS
+    },
+
+    'migration_flow': f"""
+        WITH enrol AS (
+            SELECT state, sum(total_enrol)::BIGINT AS total_enrol FROM enrolment_valid GROUP BY state
+        ), demo AS (
+            SELECT state, sum(total_demo)::BIGINT AS total_demo FROM demographic_valid GROUP BY state
+        ), flow AS (
+            SELECT coalesce(enrol.state, demo.state) AS state,
+                   coalesce(total_enrol, 0) AS total_enrol,
+                   coalesce(total_demo, 0) AS total_demo
+            FROM enrol FULL OUTER JOIN demo ON enrol.state = demo.state
+        ), indexed AS (
+            SELECT *, round_even(total_demo / CASE WHEN total_enrol = 0 THEN 1 ELSE total_enrol END, 2)
+                      AS migration_index
+            FROM flow
+        ), ranked AS (
+            SELECT *, median(migration_index) OVER () AS median_index,
+                   {PCT_RANK.format(col='migration_index')} AS pct
+            FROM indexed
+        )
+        SELECT state, total_enrol, total_demo, migration_index,
+               CASE WHEN migration_index > median_index * 1.5 THEN 'Migration Hub (Receiving)'
+                    WHEN migration_index < median_index * 0.7 THEN 'Migration Source (Sending)'
+                    ELSE 'Balanced' END AS migration_type,
+               round_even(pct * 100, 1) AS migration_intensity
+        FROM ranked
+        ORDER BY state
+    """,
+
+    'life_events_framework': """
+        WITH volumes AS (
+            SELECT 1 AS ord, sum(age_0_5)::BIGINT AS volume FROM enrolment_valid
+            UNION ALL SELECT 2, sum(age_5_17)::BIGINT FROM enrolment_valid
+            UNION ALL SELECT 3, sum(bio_age_5_17)::BIGINT FROM biometric_valid
+            UNION ALL SELECT 4, sum(demo_age_17_)::BIGINT FROM demographic_valid
+        )
+        SELECT life_event, age_group, primary_activity, volume, policy_action
+        FROM (VALUES
+            (1, 'Birth Registration', '0-5 years', 'New Enrollment', 'Link with birth certificate registration'),
+            (2, 'School Admission', '5-17 years', 'New Enrollment', 'Partner with schools for enrollment drives'),
+            (3, 'Board Exam/College', '15-18 years', 'Biometric Update', 'Mandatory biometric update reminders'),
+            (4, 'Employment/Marriage', '18+ years', 'Demo Update', 'Address change facilitation services')
+        ) AS events(ord, life_event, age_group, primary_activity, policy_action)
+        JOIN volumes USING (ord)
+        ORDER BY ord
+    """,
+
+    'life_events_monthly': """
+        SELECT month(date) AS month,
+               sum(age_0_5)::BIGINT AS age_0_5,
+               sum(age_5_17)::BIGINT AS age_5_17,
+               sum(age_18_greater)::BIGINT AS age_18_greater,
+               sum(total_enrol)::BIGINT AS total_enrol,
+               ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'][month(date)] AS month_name
+        FROM enrolment_valid
+        GROUP BY month(date)
+        ORDER BY month
+    """,
+
+    'age_cohort_forecast': """
+        WITH state_age AS (
+            SELECT state,
+                   sum(age_0_5)::BIGINT AS age_0_5,
+                   sum(age_5_17)::BIGINT AS age_5_17,
+                   sum(age_18_greater)::BIGINT AS age_18_greater,
+                   sum(total_enrol)::BIGINT AS total_enrol
+            FROM enrolment_valid
+            GROUP BY state
+        )
+        SELECT *,
+               round_even(age_0_5 / total_enrol * 100, 1) AS pct_infant,
+               round_even(age_5_17 / total_enrol * 100, 1) AS pct_child,
+               round_even(age_18_greater / total_enrol * 100, 1) AS pct_adult,
+               age_0_5 AS bio_demand_2031,
+               age_5_17 AS bio_demand_2036,
+               age_5_17 AS demo_demand_2031,
+               round_even((age_0_5 + age_5_17) / total_enrol * 100, 1) AS growth_potential
+        FROM state_age
+        ORDER BY state
+    """,
+
+    'service_deserts': f"""
+        WITH pincode_stats AS (
+            SELECT state, district, pincode,
+                   sum(total_enrol)::BIGINT AS total_enrol,
+                   count(DISTINCT date) AS active_days
+            FROM enrolment_valid
+            GROUP BY state, district, pincode
+        ), district_stats AS (
+            SELECT state, district,
+                   count(DISTINCT pincode) AS unique_pincodes,
+                   sum(total_enrol)::BIGINT AS total_enrol,
+                   avg(active_days) AS avg_active_days
+            FROM pincode_stats
+            GROUP BY state, district
+        ), density AS (
+            SELECT *, round_even(total_enrol / unique_pincodes, 0) AS enrol_per_pincode FROM district_stats
+        ), scored AS (
+            SELECT *, enrol_per_pincode < median(enrol_per_pincode) OVER () * 0.3 AS is_service_desert,
+                   round_even(100 - {PCT_RANK.format(col='enrol_per_pincode')} * 100, 0) AS desert_score
+            FROM density
+        )
+        SELECT *,
+               CASE WHEN desert_score >= 80 THEN 'Critical'
+                    WHEN desert_score >= 60 THEN 'High'
+                    WHEN desert_score >= 40 THEN 'Medium'
+                    ELSE 'Low' END AS priority
+        FROM scored
+        ORDER BY state, district
+    """,
+
+    'sdg_alignment': f"""
+        WITH coverage AS (
+            SELECT state,
+                   sum(total_enrol)::BIGINT AS total_enrol,
+                   sum(age_0_5)::BIGINT AS age_0_5,
+                   sum(age_5_17)::BIGINT AS age_5_17,
+                   sum(age_18_greater)::BIGINT AS age_18_greater,
+                   count(DISTINCT pincode) AS pincode,
+                   count(DISTINCT district) AS district
+            FROM enrolment_valid
+            GROUP BY state
+        ), indicators AS (
+            SELECT coverage.*, coalesce(population, 1000000)::DOUBLE AS population
+            FROM coverage LEFT JOIN state_population USING (state)
+        ), goals AS (
+            SELECT *,
+                   round_even(least(greatest(total_enrol / population * 100, 0), 100), 1) AS sdg_16_9_identity,
+                   round_even(least(greatest(age_18_greater / (population * 0.65) * 100, 0), 100), 1)
+                       AS sdg_1_3_protection,
+                   round_even(least(greatest(age_5_17 / (population * 0.25) * 100, 0), 100), 1) AS sdg_4_1_education,
+                   round_even(pincode / max(pincode) OVER () * 100, 1) AS sdg_10_2_inclusion
+            FROM indicators
+        ), scored AS (
+            SELECT *,
+                   round_even({PCT_RANK.format(col='sdg_16_9_identity')} * 40 +
+                              {PCT_RANK.format(col='sdg_1_3_protection')} * 25 +
+                              {PCT_RANK.format(col='sdg_4_1_education')} * 20 +
+                              {PCT_RANK.format(col='sdg_10_2_inclusion')} * 15, 1) AS sdg_alignment_score
+            FROM goals
+        )
+        SELECT *,
+               CASE WHEN sdg_alignment_score >= 80 THEN 'Leader'
+                    WHEN sdg_alignment_score >= 60 THEN 'Achiever'
+                    WHEN sdg_alignment_score >= 40 THEN 'Emerging'
+                    ELSE 'Lagging' END AS sdg_level
+        FROM scored
+        ORDER BY state
+    """,
+}
+
+
+def _literal(value):
+    """SQL string literal."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def build_store(path=DUCKDB_PATH):
+    """
+    (Re)build the DuckDB store from the clean datasets.
+
+    The file is written aside and swapped in, so open read-only connections
+    keep seeing the previous store until they reconnect.
+    """
+    from breakthrough_innovations import INDIA_STATE_POPULATION
+
+    print("🦆 Building DuckDB store...")
+    tmp = path.parent / f'.{path.name}.tmp'
+    for stale in (tmp, tmp.with_name(tmp.name + '.wal')):
+        if stale.exists():
+            stale.unlink()
+
+    con = duckdb.connect(str(tmp))
+    try:
+        for name in DATASETS:
+            files = _literal(clean_path(name) / '**' / '*.parquet')
+            con.execute(f"""
+                CREATE TABLE {name} AS
+                SELECT {', '.join(clean_columns(name))}
+                FROM read_parquet({files}, hive_partitioning = true, hive_types_autocast = false)
+                ORDER BY state, district, pincode, date
+            """)
+            rows = con.execute(f"SELECT count(*) FROM {name}").fetchone()[0]
+            print(f"   {name}: {rows:,} rows")
+
+        population = pd.DataFrame(list(INDIA_STATE_POPULATION.items()), columns=['state', 'population'])
+        con.execute("CREATE TABLE state_population AS SELECT * FROM population")
+
+        for view, sql in VIEWS.items():
+            con.execute(f"CREATE VIEW {view} AS {sql}")
+        con.execute("CHECKPOINT")
+    finally:
+        con.close()
+
+    os.replace(tmp, path)
+    print(f"   Views: {', '.join(INNOVATION_VIEWS)}")
+    print(f"✅ Store written to {path}")
+
+
+def connect(path=DUCKDB_PATH):
+    """Read-only connection to the store that cannot touch other files."""
+    return duckdb.connect(str(path), read_only=True, config={'enable_external_access': False})
+
+
+def main():
+    """(Re)build the store from the clean datasets."""
+    build_store()
+
+
+if __name__ == "__main__":
+    main()
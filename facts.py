@@ -0,0 +1,114 @@
+"""
+🧾 FACT TABLE ROLLUPS
+Aadhaar Life Cycle Intelligence Platform
+
+State, district and pincode rollups of the pincode-day fact table (the
+aggregation cube, see aggregation.py). Its rows carry integer state_id /
+district_id surrogate keys, so a rollup is one np.bincount per column over
+the key codes instead of a groupby or a merge, and every source's age bands
+come out side by side. Cross-dataset metrics are then column arithmetic:
+
+    processed_data/district_migration.parquet  - migration index per district
+    processed_data/pincode_migration.parquet   - migration index per pincode
+
+The life-events activity cube (processed_data/life_events_cube.parquet) is
+built the same way: every age-band count of every row lands in its dense
+(state, year-month, age band, activity) cell through a single np.bincount.
+"""
+
+import numpy as np
+import pandas as pd
+from aggregation import ROW_COLUMNS, measure_columns
+from ingestion import DATASETS
+
+# Name columns identifying each rollup level
+LEVEL_KEYS = {
+    'state': ['state'],
+    'district': ['state', 'district'],
+    'pincode': ['state', 'district', 'pincode'],
+}
+
+VALUE_COLUMNS = [c for name in DATASETS for c in measure_columns(name)] + list(ROW_COLUMNS.values())
+
+# Axes of the activity cube, and the (age band, activity) cell of each count column
+AGE_BANDS = ['0-5', '5-17', '18+']
+ACTIVITIES = ['enrolment', 'biometric', 'demographic']
+BAND_COLUMNS = {
+    'age_0_5': ('0-5', 'enrolment'),
+    'age_5_17': ('5-17', 'enrolment'),
+    'age_18_greater': ('18+', 'enrolment'),
+    'bio_age_5_17': ('5-17', 'biometric'),
+    'bio_age_17_': ('18+', 'biometric'),
+    'demo_age_5_17': ('5-17', 'demographic'),
+    'demo_age_17_': ('18+', 'demographic'),
+}
+
+# (age band, activity) cell behind each life event of the framework
+LIFE_EVENT_CELLS = [('0-5', 'enrolment'), ('5-17', 'enrolment'), ('5-17', 'biometric'), ('18+', 'demographic')]
+
+
+def level_codes(facts, level):
+    """
+    Dense group code of every fact row at a level, plus one representative row per group.
+
+    Groups are numbered in name order (the surrogate keys are assigned
+    alphabetically), so rollups come out sorted.
+    """
+    if level == 'state':
+        keys = facts['state_id'].to_numpy()
+    elif level == 'district':
+        keys = facts['district_id'].to_numpy()
+    else:
+        keys = (facts['district_id'].to_numpy().astype(np.int64) << 20) | facts['pincode'].to_numpy()
+    _, first, codes = np.unique(keys, return_index=True, return_inverse=True)
+    return codes.ravel(), first
+
+
+def rollup_facts(facts, level, columns=VALUE_COLUMNS):
+    """Sum of each value column per state, district or pincode, with plain string names."""
+    codes, first = level_codes(facts, level)
+    out = facts[LEVEL_KEYS[level]].iloc[first].reset_index(drop=True)
+    out = out.astype({col: str for col in ['state', 'district'] if col in out.columns})
+    for col in columns:
+        out[col] = np.bincount(codes, weights=facts[col].to_numpy(), minlength=len(first)).astype(np.int64)
+    return out
+
+
+def activity_cube(facts):
+    """
+    Dense activity volumes per (state, year-month, age band, activity).
+
+    Returns (states, months, cube): state names in name order, the first day
+    of every month from the first to the last date, and an int64 array of
+    shape (states, months, AGE_BANDS, ACTIVITIES). Cells no source reports
+    (e.g. biometric updates at 0-5) stay 0.
+    """
+    codes, first = level_codes(facts, 'state')
+    states = facts['state'].iloc[first].astype(str).to_numpy()
+    month = facts['date'].to_numpy().astype('datetime64[M]')
+    start = month.min() if len(month) else np.datetime64('1970-01', 'M')
+    month = (month - start).astype(np.int64)
+    n_months = int(month.max()) + 1 if len(month) else 0
+    months = pd.DatetimeIndex(start + np.arange(n_months))
+
+    # Cell of every (row, count column) pair, then one weighted bincount
+    cells = len(AGE_BANDS) * len(ACTIVITIES)
+    offset = np.array([AGE_BANDS.index(band) * len(ACTIVITIES) + ACTIVITIES.index(activity)
+                       for band, activity in BAND_COLUMNS.values()])
+    index = (codes * n_months + month)[:, None] * cells + offset[None, :]
+    volume = np.bincount(index.ravel(), weights=facts[list(BAND_COLUMNS)].to_numpy(dtype=np.float64).ravel(),
+                         minlength=len(states) * n_months * cells)
+    cube = volume.astype(np.int64).reshape(len(states), n_months, len(AGE_BANDS), len(ACTIVITIES))
+    return states, months, cube
+
+
+def cube_frame(states, months, cube):
+    """The activity cube as a long frame: one row per cell, zeros included."""
+    shape = cube.shape
+    return pd.DataFrame({
+        'state': np.repeat(states, shape[1] * shape[2] * shape[3]),
+        'month': np.tile(np.repeat(months, shape[2] * shape[3]), shape[0]),
+        'age_band': np.tile(np.repeat(AGE_BANDS, shape[3]), shape[0] * shape[1]),
+        'activity': np.tile(ACTIVITIES, shape[0] * shape[1] * shape[2]),
+        'volume': cube.ravel(),
+    })
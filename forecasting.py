@@ -0,0 +1,217 @@
+"""
+🔮 BATCHED FORECASTING
+Aadhaar Life Cycle Intelligence Platform
+
+30-day enrolment forecasts with intervals for the nation, every state and
+every district:
+
+    processed_data/national_forecast_30days.parquet
+    processed_data/state_forecasts_30days.parquet
+    processed_data/district_forecasts_30days.parquet
+
+Each geography's daily series is one row of a (series x days) matrix built
+from the fact table, and an additive Holt-Winters model with weekly
+seasonality is fitted to all rows at once: the smoothing recursion steps
+through the days as NumPy operations over (parameter grid x series), and each
+series keeps the grid point with the lowest one-step-ahead error. Series the
+grid fits worse than a seasonal naive forecast are refitted one at a time with
+a continuous optimizer in a process pool. Intervals come from the residual
+variance of the chosen model.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import numpy as np
+import pandas as pd
+from facts import LEVEL_KEYS, level_codes
+from ingestion import PROCESSED_PATH
+
+# Forecast horizon and seasonal period (days)
+HORIZON = 30
+SEASON = 7
+
+# Interval width (Prophet's default, as in the notebook forecasts)
+INTERVAL = 0.8
+
+# Smoothing parameter grid searched for every series at once
+ALPHAS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.7)
+BETAS = (0.0, 0.01, 0.05, 0.1)
+GAMMAS = (0.0, 0.05, 0.1, 0.3)
+
+FORECAST_FILES = {
+    'national': PROCESSED_PATH / 'national_forecast_30days.parquet',
+    'state': PROCESSED_PATH / 'state_forecasts_30days.parquet',
+    'district': PROCESSED_PATH / 'district_forecasts_30days.parquet',
+}
+
+
+def series_matrix(facts, level, column='total_enrol'):
+    """
+    Daily series of a column per geography, as (labels, dates, matrix).
+
+    The matrix has one row per label and one column per calendar day from
+    the first to the last date of the fact table; days without rows are 0.
+    """
+    days = facts['date'].to_numpy().astype('datetime64[D]')
+    dates = pd.date_range(days.min(), days.max(), freq='D') if len(days) else pd.DatetimeIndex([])
+    day = (days - days.min()).astype(np.int64) if len(days) else days.astype(np.int64)
+    if level == 'national':
+        labels, codes = pd.DataFrame(index=[0]), np.zeros(len(facts), dtype=np.int64)
+    else:
+        codes, first = level_codes(facts, level)
+        labels = facts[LEVEL_KEYS[level]].iloc[first].astype(str).reset_index(drop=True)
+    matrix = np.bincount(codes * len(dates) + day, weights=facts[column].to_numpy(),
+                         minlength=len(labels) * len(dates)).reshape(len(labels), len(dates))
+    return labels, dates, matrix
+
+
+def _initial_states(y):
+    """
+    Level, trend and seasonal offsets from the first two seasons of each series.
+
+    Series shorter than one season start non-seasonal: level from their mean,
+    trend from their average daily change and zero seasonal offsets.
+    """
+    days = y.shape[1]
+    if days < SEASON:
+        level = y.mean(axis=1) if days else np.zeros(len(y))
+        trend = (y[:, -1] - y[:, 0]) / (days - 1) if days > 1 else np.zeros(len(y))
+        return level, trend, np.zeros((len(y), SEASON))
+    first = y[:, :SEASON]
+    level = first.mean(axis=1)
+    if days >= 2 * SEASON:
+        trend = (y[:, SEASON:2 * SEASON].mean(axis=1) - level) / SEASON
+    else:
+        trend = np.zeros(len(y))
+    return level, trend, first - level[:, None]
+
+
+def holt_winters(y, alpha, beta, gamma):
+    """
+    Run the additive Holt-Winters recursion over every series.
+
+    y is (series x days); alpha/beta/gamma broadcast against (grid x series)
+    (e.g. shape (G, 1) for a shared grid, (1, S) for one set per series).
+    Returns (sse, level, trend, season) after the last day, each with a
+    leading grid axis; season[..., k] is the offset for day index k mod SEASON.
+    """
+    level, trend, season = _initial_states(y)
+    shape = np.broadcast_shapes(np.shape(alpha), np.shape(beta), np.shape(gamma), (1, len(y)))
+    level = np.broadcast_to(level, shape).copy()
+    trend = np.broadcast_to(trend, shape).copy()
+    season = np.broadcast_to(season, shape + (SEASON,)).copy()
+    sse = np.zeros(shape)
+    for t in range(y.shape[1]):
+        k = t % SEASON
+        error = y[:, t] - (level + trend + season[..., k])
+        sse += error * error
+        new_level = alpha * (y[:, t] - season[..., k]) + (1 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1 - beta) * trend
+        season[..., k] = gamma * (y[:, t] - new_level) + (1 - gamma) * season[..., k]
+        level = new_level
+    return sse, level, trend, season
+
+
+def _refit_series(y):
+    """Smoothing parameters of one series by bounded continuous optimization (process pool worker)."""
+    from scipy.optimize import minimize
+
+    y = y[None, :]
+    result = minimize(lambda p: holt_winters(y, *p)[0][0, 0], x0=[0.2, 0.01, 0.05],
+                      bounds=[(0, 1)] * 3, method='L-BFGS-B')
+    return result.x
+
+
+def refit_series(matrix, max_workers=None):
+    """Parameters of each row refitted independently; rows are spread over a process pool."""
+    if len(matrix) == 0:
+        return np.empty((0, 3))
+    workers = min(len(matrix), max_workers or os.cpu_count() or 1)
+    # Spawned workers: the pipeline calls this from scheduler threads
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return np.array(list(pool.map(_refit_series, matrix, chunksize=max(1, len(matrix) // (4 * workers)))))
+
+
+def fit_batch(matrix):
+    """
+    Fit every series on the shared parameter grid.
+
+    Returns (params, sigma2, states, refit): the chosen (alpha, beta, gamma)
+    per series, the one-step residual variance, the final (level, trend,
+    season), and a mask of series the grid fits worse than seasonal naive.
+    """
+    grid = np.array(list(product(ALPHAS, BETAS, GAMMAS)))
+    sse, level, trend, season = holt_winters(matrix, *(grid[:, [i]] for i in range(3)))
+    best = np.nanargmin(np.where(np.isfinite(sse), sse, np.inf), axis=0)
+    rows = np.arange(matrix.shape[0])
+    days = matrix.shape[1]
+    sigma2 = sse[best, rows] / max(days, 1)
+    naive = ((matrix[:, SEASON:] - matrix[:, :-SEASON]) ** 2).mean(axis=1) if days > SEASON \
+        else np.full(len(matrix), np.inf)
+    refit = ~np.isfinite(sigma2) | (sigma2 > naive)
+    states = (level[best, rows], trend[best, rows], season[best, rows])
+    return grid[best], sigma2, states, refit
+
+
+def forecast(params, sigma2, states, days, horizon=HORIZON):
+    """
+    Point forecasts and interval bounds for the next horizon days.
+
+    Returns (trend, weekly, yhat, lower, upper), each (series x horizon).
+    The h-step variance uses the additive Holt-Winters multipliers
+    c_j = alpha (1 + j beta) + gamma [j = 0 mod SEASON].
+    """
+    from scipy.stats import norm
+
+    alpha, beta, gamma = (params[:, [i]] for i in range(3))
+    level, trend, season = states
+    steps = np.arange(1, horizon + 1)
+    trend_path = level[:, None] + steps * trend[:, None]
+    weekly = season[:, (days + steps - 1) % SEASON]
+    yhat = trend_path + weekly
+
+    j = np.arange(1, horizon)
+    c = alpha * (1 + j * beta) + gamma * (j % SEASON == 0)
+    multiplier = np.concatenate([np.ones((len(params), 1)), 1 + np.cumsum(c * c, axis=1)], axis=1)
+    half_width = norm.ppf(0.5 + INTERVAL / 2) * np.sqrt(sigma2[:, None] * multiplier)
+    return trend_path, weekly, np.clip(yhat, 0, None), np.clip(yhat - half_width, 0, None), \
+        np.clip(yhat + half_width, 0, None)
+
+
+def forecast_level(facts, level, horizon=HORIZON):
+    """Forecast frame of every series at a level (long format: one row per series and day)."""
+    labels, dates, matrix = series_matrix(facts, level)
+    if matrix.shape[1] == 0:
+        return pd.DataFrame(columns=['ds', 'yhat', 'yhat_lower', 'yhat_upper'] + LEVEL_KEYS.get(level, []))
+    params, sigma2, states, refit = fit_batch(matrix)
+    if refit.any():
+        params[refit] = refit_series(matrix[refit])
+        sse, *refitted = holt_winters(matrix[refit], *(params[refit][None, :, i] for i in range(3)))
+        sigma2[refit] = sse[0] / matrix.shape[1]
+        for state, new in zip(states, refitted):
+            state[refit] = new[0]
+    trend, weekly, yhat, lower, upper = forecast(params, sigma2, states, matrix.shape[1], horizon)
+    print(f"   {level.title()}: {len(matrix):,} series, {int(refit.sum())} refitted individually")
+
+    ds = pd.date_range(dates[-1] + pd.Timedelta(days=1), periods=horizon, freq='D')
+    out = pd.DataFrame({
+        'ds': np.tile(ds, len(matrix)),
+        'yhat': yhat.ravel(),
+        'yhat_lower': lower.ravel(),
+        'yhat_upper': upper.ravel(),
+    })
+    if level == 'national':
+        out['trend'] = trend.ravel()
+        out['weekly'] = weekly.ravel()
+        out['day_of_week'] = out['ds'].dt.day_name()
+    for col in LEVEL_KEYS.get(level, []):
+        out[col] = np.repeat(labels[col].to_numpy(), horizon)
+    return out
+
+
+def build_forecasts(facts, horizon=HORIZON):
+    """National, state and district forecast frames (in FORECAST_FILES order)."""
+    print("\n🔮 Forecasting daily enrolments for every geography...")
+    return tuple(forecast_level(facts, level, horizon) for level in FORECAST_FILES)
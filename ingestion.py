@@ -0,0 +1,745 @@
+"""
+📥 DATA INGESTION - SHARED CLEAN DATASET CACHE
+Aadhaar Life Cycle Intelligence Platform
+
+Parses the raw UIDAI API dumps in raw_data/ and writes typed "clean" Parquet
+datasets to processed_data/, which both the Streamlit dashboard and the batch
+pipeline read (state/district stored as categoricals, with state spellings
+mapped to canonical names through STATE_ALIASES):
+
+    processed_data/enrolment_clean.parquet/
+    processed_data/biometric_clean.parquet/
+    processed_data/demographic_clean.parquet/
+
+Each clean dataset is a Hive-partitioned directory (state=<state>/month=<YYYY-MM>/)
+holding one part per raw file in every partition it touches. Raw files are
+named by record range (api_data_aadhar_enrolment_1000000_1006029.csv), and a
+manifest (processed_data/clean_manifest.json) records the size and mtime of
+every raw file already ingested. Ingestion is incremental: only new or
+changed range files are parsed, parts for deleted files are dropped, and a
+pincode-day rollup per dataset (processed_data/<name>_daily.parquet/, laid
+out the same way) is updated from the delta so the innovation outputs can be
+refreshed without rescanning the whole history. Distinct counts cannot be
+retracted that way, so each part also gets sparse HyperLogLog sketches
+(processed_data/<name>_sketches/<column>/<part>.parquet, see SKETCHES),
+which load_sketches() merges across the current parts.
+
+Partitioned files are zstd-compressed with dictionary encoding and sorted by
+district, pincode and date within each partition, so read_partitioned()
+filters on state or date prune whole partitions and use row-group statistics
+for the rest (see partition_filter()).
+
+Numeric columns follow a compact, validated schema (uint16 counts, uint32
+totals, int32 pincode); see column_schema().
+
+Run this script to ingest new raw files:
+    python ingestion.py [--force] [--memory-report]
+
+Set UIDAI_BACKEND=polars to parse raw files with Polars.
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pa_compute
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as pa_ds
+from pathlib import Path
+from glob import glob
+from sketches import hll_frame, merge_hll
+
+# Paths
+BASE_PATH = Path('.')
+RAW_PATH = BASE_PATH / 'raw_data'
+PROCESSED_PATH = BASE_PATH / 'processed_data'
+MANIFEST_PATH = PROCESSED_PATH / 'clean_manifest.json'
+
+MANIFEST_VERSION = 4
+
+# Parsing backend: 'pandas' (default) or 'polars' (see polars_backend.py)
+BACKEND = os.environ.get('UIDAI_BACKEND', 'pandas')
+
+# Record range suffix of raw file names, e.g. ..._1000000_1006029.csv
+RANGE_PATTERN = re.compile(r'_(\d+)_(\d+)\.csv$')
+
+# Grain of the incrementally maintained rollups
+ROLLUP_KEYS = ['state', 'district', 'pincode', 'date']
+
+# Compact column schema (validated on ingest): narrow unsigned counts, int32 pincode
+COUNT_DTYPE = np.uint16
+TOTAL_DTYPE = np.uint32
+PINCODE_DTYPE = np.int32
+PINCODE_RANGE = (100000, 999999)
+
+# Hive partitioning of clean datasets and pincode-level outputs
+PARTITION_COLUMNS = ['state', 'month']
+PARTITIONING = pa_ds.partitioning(
+    pa.schema([(col, pa.string()) for col in PARTITION_COLUMNS]), flavor='hive'
+)
+# Snapshot tables (one row per key as of the last day, no date to split by)
+# are partitioned by state only
+STATE_PARTITIONING = pa_ds.partitioning(pa.schema([('state', pa.string())]), flavor='hive')
+# Rows are sorted by these columns inside each partition (tight row-group statistics)
+PARTITION_SORT = ['district', 'pincode', 'date']
+ROW_GROUP_ROWS = 128 * 1024
+PARQUET_WRITE_OPTIONS = pa_ds.ParquetFileFormat().make_write_options(compression='zstd', use_dictionary=True)
+
+# Dictionary type of name columns in Arrow tables (one type for every file,
+# so tables read from several files concatenate without copying)
+ARROW_DICTIONARY = pa.dictionary(pa.int32(), pa.string())
+
+# Default chunk size of the out-of-core (chunked) mode, in MB of raw CSV
+CHUNK_MB = 64
+
+# Raw CSV columns read as text (normalized/parsed after reading)
+RAW_TEXT_COLUMNS = {'date': str, 'state': str, 'district': str}
+
+# Canonical state names for legacy/variant spellings (keys are already title-cased)
+STATE_ALIASES = {
+    'Andaman & Nicobar Islands': 'Andaman And Nicobar Islands',
+    'Andaman & Nicobar': 'Andaman And Nicobar Islands',
+    'Andaman And Nicobar': 'Andaman And Nicobar Islands',
+    'Chhatisgarh': 'Chhattisgarh',
+    'Dadra & Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Dadra And Nagar Haveli': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Daman & Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Dadra & Nagar Haveli & Daman & Diu': 'Dadra And Nagar Haveli And Daman And Diu',
+    'Jammu & Kashmir': 'Jammu And Kashmir',
+    'Nct Of Delhi': 'Delhi',
+    'Orissa': 'Odisha',
+    'Pondicherry': 'Puducherry',
+    'Tamilnadu': 'Tamil Nadu',
+    'Telengana': 'Telangana',
+    'Uttaranchal': 'Uttarakhand',
+    'West Bangal': 'West Bengal',
+    'West Bengli': 'West Bengal',
+    'Westbengal': 'West Bengal',
+}
+
+# Dataset definitions: raw file prefix, count columns and derived total column
+DATASETS = {
+    'biometric': {
+        'counts': ['bio_age_5_17', 'bio_age_17_'],
+        'total': 'total_bio',
+    },
+    'demographic': {
+        'counts': ['demo_age_5_17', 'demo_age_17_'],
+        'total': 'total_demo',
+    },
+    'enrolment': {
+        'counts': ['age_0_5', 'age_5_17', 'age_18_greater'],
+        'total': 'total_enrol',
+    },
+}
+
+# Distinct-count sketches kept per part next to a dataset's rollup:
+# {dataset: {counted column: group keys}} (merged for sketch mode, see sketches.py)
+SKETCHES = {
+    'enrolment': {'pincode': ['state', 'district'], 'district': ['state']},
+}
+
+
+def raw_files(name):
+    """Raw CSV files for a dataset, ordered by record range."""
+    files = glob(str(RAW_PATH / f'api_data_aadhar_{name}*.csv'))
+    return sorted(files, key=lambda f: (record_range(f) or (float('inf'), 0), Path(f).name))
+
+
+def record_range(path):
+    """(start, end) record range encoded in a raw file name, or None."""
+    match = RANGE_PATTERN.search(Path(path).name)
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+
+def clean_path(name):
+    """Location of the clean Parquet dataset (a Hive-partitioned directory)."""
+    return PROCESSED_PATH / f'{name}_clean.parquet'
+
+
+def rollup_path(name):
+    """Location of the pincode-day rollup for a dataset (a Hive-partitioned directory)."""
+    return PROCESSED_PATH / f'{name}_daily.parquet'
+
+
+def sketch_path(name, col):
+    """Directory of the per-part distinct-count sketches of one column of a dataset."""
+    return PROCESSED_PATH / f'{name}_sketches' / col
+
+
+def clean_columns(name):
+    """Column order of a clean dataset."""
+    spec = DATASETS[name]
+    return ['date', 'state', 'district', 'pincode'] + spec['counts'] + [spec['total']]
+
+
+def rollup_columns(name):
+    """Column order of a pincode-day rollup."""
+    spec = DATASETS[name]
+    return ROLLUP_KEYS + spec['counts'] + [spec['total'], 'rows']
+
+
+def part_name(raw_file):
+    """Name of the clean part written for a single raw file (zero-padded so parts sort by range)."""
+    rng = record_range(raw_file)
+    stem = f'{rng[0]:012d}-{rng[1]:012d}' if rng else Path(raw_file).stem
+    return f'part-{stem}'
+
+
+def part_files(name, part):
+    """Files of one clean part, across all the partitions it was written to."""
+    return sorted(clean_path(name).glob(f'*/*/{part}-*.parquet'))
+
+
+def file_fingerprint(path):
+    """Size/mtime fingerprint of one raw file."""
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def read_manifest():
+    """Load the clean dataset manifest (empty if missing or outdated)."""
+    if not MANIFEST_PATH.exists():
+        return {'version': MANIFEST_VERSION, 'datasets': {}}
+    try:
+        manifest = json.loads(MANIFEST_PATH.read_text())
+    except (OSError, ValueError):
+        return {'version': MANIFEST_VERSION, 'datasets': {}}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'datasets': {}}
+    return manifest
+
+
+def write_manifest(manifest):
+    """Atomically write the clean dataset manifest."""
+    PROCESSED_PATH.mkdir(exist_ok=True)
+    tmp = MANIFEST_PATH.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def ingested_sources(manifest=None):
+    """Fingerprint of every ingested raw file, keyed '<dataset>/<file name>' (from the manifest)."""
+    manifest = manifest if manifest is not None else read_manifest()
+    return {f'{name}/{fname}': info['fingerprint']
+            for name, entry in manifest['datasets'].items() for fname, info in entry.get('files', {}).items()}
+
+
+def normalize_name(value):
+    """Canonical spelling of a state/district name: trimmed, single-spaced, title case."""
+    return ' '.join(str(value).split()).title()
+
+
+def encode_names(values, aliases=None):
+    """
+    Normalize a name column as a categorical.
+
+    Only the distinct raw spellings are normalized (and mapped through the
+    alias table); rows just keep integer codes into the canonical names.
+    """
+    codes, uniques = pd.factorize(values)
+    names = [normalize_name(v) for v in uniques]
+    if aliases:
+        names = [aliases.get(n, n) for n in names]
+    # Several raw spellings can collapse onto the same canonical name
+    name_codes, categories = pd.factorize(pd.Index(names, dtype=object), sort=True)
+    codes = np.where(codes >= 0, name_codes[codes], -1)
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def parse_dates(values):
+    """Parse dd-mm-YYYY dates, converting each distinct string only once."""
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(uniques, format='%d-%m-%Y').astype('datetime64[ns]')
+    return np.where(codes >= 0, parsed.values[codes], np.datetime64('NaT', 'ns'))
+
+
+def column_schema(name):
+    """Target dtype and accepted (min, max) range of each numeric column of a dataset."""
+    spec = DATASETS[name]
+    schema = {'pincode': (PINCODE_DTYPE, *PINCODE_RANGE)}
+    for col in spec['counts']:
+        schema[col] = (COUNT_DTYPE, 0, np.iinfo(COUNT_DTYPE).max)
+    schema[spec['total']] = (TOTAL_DTYPE, 0, np.iinfo(TOTAL_DTYPE).max)
+    return schema
+
+
+def apply_schema(df, name):
+    """Check numeric columns are complete and in range, then cast them to the compact schema."""
+    for col, (dtype, low, high) in column_schema(name).items():
+        values = df[col]
+        missing = values.isna().sum()
+        if missing:
+            raise ValueError(f"{name}.{col}: {missing:,} missing value(s)")
+        bad = (values < low) | (values > high)
+        if bad.any():
+            raise ValueError(
+                f"{name}.{col}: {bad.sum():,} value(s) outside [{low}, {high}] "
+                f"(e.g. {values[bad].iloc[0]})"
+            )
+        df[col] = values.astype(dtype)
+    return df
+
+
+def clean_frame(df, name):
+    """Parse dates, normalize names (as categoricals), add the total and apply the compact schema."""
+    spec = DATASETS[name]
+    df['date'] = parse_dates(df['date'])
+    df['state'] = encode_names(df['state'], STATE_ALIASES)
+    df['district'] = encode_names(df['district'])
+    df[spec['total']] = df[spec['counts']].sum(axis=1)
+    return apply_schema(df, name)
+
+
+def raw_column_types(name):
+    """Explicit Arrow types of a raw CSV: text dictionary-encoded while reading, numbers as int64."""
+    types = {col: ARROW_DICTIONARY for col in RAW_TEXT_COLUMNS}
+    for col in ['pincode'] + DATASETS[name]['counts']:
+        types[col] = pa.int64()
+    return types
+
+
+def read_csv_arrow(path, name):
+    """Read one raw CSV with Arrow's multithreaded parser (empty/NA text becomes null, as in pandas)."""
+    options = pa_csv.ConvertOptions(column_types=raw_column_types(name), strings_can_be_null=True)
+    return pa_csv.read_csv(path, convert_options=options)
+
+
+def parse_raw(path, name, backend=None):
+    """
+    Parse and clean one raw CSV file into a DataFrame.
+
+    Arrow's multithreaded reader splits the file across cores, and each Arrow
+    column is released as soon as it is copied into the frame, so peak memory
+    stays close to the size of the result.
+    """
+    if (backend or BACKEND) == 'polars':
+        from polars_backend import read_raw
+        return read_raw(path, name)
+    table = read_csv_arrow(path, name)
+    df = table.to_pandas(self_destruct=True, split_blocks=True)
+    del table
+    return clean_frame(df, name)
+
+
+def stream_raw(files, name, chunk_mb=CHUNK_MB):
+    """Yield cleaned DataFrames of about chunk_mb of raw CSV each, one file after another."""
+    read_options = pa_csv.ReadOptions(block_size=int(chunk_mb * 2**20))
+    convert_options = pa_csv.ConvertOptions(column_types=raw_column_types(name), strings_can_be_null=True)
+    for path in files:
+        for batch in pa_csv.open_csv(path, read_options=read_options, convert_options=convert_options):
+            yield clean_frame(batch.to_pandas(), name)
+
+
+def chunked_rollup(name, chunk_mb=CHUNK_MB):
+    """
+    Pincode-day rollup of a dataset computed straight from raw_data/ in bounded memory.
+
+    Each chunk is reduced to partial (state, district, pincode, date) sums and
+    row counts, which merge by addition, and to its distinct-count sketches,
+    which merge by register max. Partials are folded into the running result
+    whenever they outgrow it, so memory tracks the number of pincode-days
+    rather than the number of raw rows. Returns (rollup, {column: sketch}).
+    """
+    merged, pending, pending_rows, sketches = None, [], 0, []
+    for chunk in stream_raw(raw_files(name), name, chunk_mb):
+        partial = rollup(chunk, name)
+        pending.append(partial)
+        pending_rows += len(partial)
+        sketches.append(build_sketches(chunk, name))
+        if pending_rows >= (len(merged) if merged is not None else 0):
+            merged = combine_rollups([merged] + pending, name)
+            pending, pending_rows, sketches = [], 0, [merge_sketches(sketches, name)]
+    merged = combine_rollups([merged] + pending, name)
+    if merged is None:
+        raise FileNotFoundError(f"No raw files found for '{name}' in {RAW_PATH}")
+    return merged, merge_sketches(sketches, name)
+
+
+def write_parquet(df, target):
+    """Atomically write a DataFrame to Parquet (hidden temp file, then rename)."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.parent / f'.{target.name}.tmp'
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+
+
+def _partitioned_table(df, date='date'):
+    """Arrow table of a frame with its state (and, unless date is None, month) partition columns, sorted."""
+    df = df.sort_values([c for c in PARTITION_SORT if c in df.columns], kind='stable')
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    table = table.set_column(table.schema.get_field_index('state'), 'state', table['state'].cast(pa.string()))
+    if date is None:
+        return table
+    return table.append_column('month', pa_compute.strftime(table[date], '%Y-%m'))
+
+
+def write_partitioned(df, target, part, date='date'):
+    """Add a frame to a partitioned dataset as files named <part>-<i>.parquet."""
+    pa_ds.write_dataset(
+        _partitioned_table(df, date), target, format='parquet',
+        partitioning=PARTITIONING if date is not None else STATE_PARTITIONING,
+        basename_template=f'{part}-{{i}}.parquet', file_options=PARQUET_WRITE_OPTIONS,
+        max_rows_per_group=ROW_GROUP_ROWS, existing_data_behavior='overwrite_or_ignore',
+    )
+
+
+def replace_partitioned(df, target, date='date'):
+    """
+    Atomically replace a partitioned dataset (written aside, then swapped in).
+
+    date names the column whose month partitions the rows; snapshot tables
+    pass None to be partitioned by state only. A legacy single-file target
+    is replaced the same way.
+    """
+    tmp = target.parent / f'.{target.name}.tmp'
+    old = target.parent / f'.{target.name}.old'
+    for path in (tmp, old):
+        remove_dataset(path)
+    write_partitioned(df, tmp, 'part', date)
+    if target.exists():
+        os.replace(target, old)
+    os.replace(tmp, target)
+    remove_dataset(old)
+
+
+def remove_dataset(path):
+    """Delete a dataset, whether a partitioned directory or a single (legacy) file, if it exists."""
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def remove_part(name, part):
+    """Delete the files of one clean part and any partition directories left empty."""
+    for path in part_files(name, part):
+        path.unlink()
+        for directory in (path.parent, path.parent.parent):
+            if not any(directory.iterdir()):
+                directory.rmdir()
+
+
+def partition_filter(states=None, start=None, end=None):
+    """
+    Dataset filter for a set of states and an inclusive date range.
+
+    State and month conditions prune partitions (whole directories are
+    skipped); the date condition is checked against row-group statistics.
+    """
+    conditions = []
+    if states is not None:
+        conditions.append(pa_ds.field('state').isin(list(states)))
+    if start is not None:
+        start = pd.Timestamp(start)
+        conditions += [pa_ds.field('month') >= start.strftime('%Y-%m'), pa_ds.field('date') >= start]
+    if end is not None:
+        end = pd.Timestamp(end)
+        conditions += [pa_ds.field('month') <= end.strftime('%Y-%m'), pa_ds.field('date') <= end]
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_partitioned(source, columns, filter=None, base=None):
+    """
+    Read a partitioned dataset (a directory, or a list of its files under base).
+
+    state comes back as a categorical and the month partition column is
+    dropped unless requested.
+    """
+    files = [str(f) for f in source] if isinstance(source, list) else str(source)
+    dataset = pa_ds.dataset(files, format='parquet', partitioning=PARTITIONING,
+                            partition_base_dir=str(base) if base is not None else None)
+    df = dataset.to_table(columns=columns, filter=filter).to_pandas()
+    if 'state' in df.columns:
+        df['state'] = df['state'].astype('category')
+    return df
+
+
+def read_part(name, part):
+    """Rows of one clean part."""
+    return read_partitioned(part_files(name, part), clean_columns(name), base=clean_path(name))
+
+
+def read_clean(name, states=None, start=None, end=None, columns=None):
+    """Read a clean dataset, touching only the partitions and row groups matching the filters."""
+    return read_partitioned(clean_path(name), columns or clean_columns(name), partition_filter(states, start, end))
+
+
+def write_arrow(df, target):
+    """Atomically write a DataFrame as an uncompressed (memory-mappable) Arrow IPC file."""
+    table = pa.Table.from_pandas(df, preserve_index=False).replace_schema_metadata(None)
+    table = table.cast(pa.schema([
+        pa.field(f.name, ARROW_DICTIONARY) if pa.types.is_dictionary(f.type) else f
+        for f in table.schema
+    ]))
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Per-process temporary name: several dashboard processes may refresh one mirror
+    tmp = target.parent / f'.{target.name}.{os.getpid()}.tmp'
+    with pa.OSFile(str(tmp), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, target)
+
+
+def read_arrow_mapped(path):
+    """Memory-map one Arrow IPC file as a read-only pyarrow Table (no data is copied)."""
+    return pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def arrow_mirror(path):
+    """
+    Arrow IPC mirror of a Parquet file (<stem>.arrow next to it), for read_arrow_mapped().
+
+    The mirror is (re)written when it is missing or older than the Parquet file.
+    """
+    mirror = path.with_suffix('.arrow')
+    if not mirror.exists() or mirror.stat().st_mtime_ns < path.stat().st_mtime_ns:
+        write_arrow(pd.read_parquet(path), mirror)
+    return mirror
+
+
+def rollup(df, name):
+    """Aggregate clean rows to the (state, district, pincode, date) grain."""
+    spec = DATASETS[name]
+    value_cols = spec['counts'] + [spec['total']]
+    grouped = df.groupby(ROLLUP_KEYS, sort=False, observed=True)
+    # Sums leave the narrow unsigned dtypes; int64 keeps retractions signed
+    out = grouped[value_cols].sum().astype('int64')
+    out['rows'] = grouped.size()
+    return out.reset_index()
+
+
+def combine_rollups(frames, name):
+    """Merge partial rollups by summing; keys whose row count reaches zero are dropped."""
+    frames = [f for f in frames if f is not None and len(f) > 0]
+    if not frames:
+        return None
+    spec = DATASETS[name]
+    value_cols = spec['counts'] + [spec['total'], 'rows']
+    combined = pd.concat(frames, ignore_index=True)
+    combined = combined.groupby(ROLLUP_KEYS, observed=True)[value_cols].sum().reset_index()
+    return combined[combined['rows'] > 0].reset_index(drop=True)
+
+
+def build_sketches(df, name):
+    """Sparse HyperLogLog sketches of a dataset's SKETCHES columns over some clean rows, {column: frame}."""
+    return {col: hll_frame(df, by, col) for col, by in SKETCHES.get(name, {}).items()}
+
+
+def merge_sketches(sketches, name):
+    """Merge a non-empty list of build_sketches() results into one {column: frame}."""
+    return {col: merge_hll([s[col] for s in sketches]) for col in SKETCHES.get(name, {})}
+
+
+def write_sketches(df, name, part):
+    """Store the sketches of one clean part."""
+    for col, frame in build_sketches(df, name).items():
+        write_parquet(frame, sketch_path(name, col) / f'{part}.parquet')
+
+
+def remove_sketches(name, part):
+    """Delete the sketches of one clean part."""
+    for col in SKETCHES.get(name, {}):
+        (sketch_path(name, col) / f'{part}.parquet').unlink(missing_ok=True)
+
+
+def sketches_missing(name, part):
+    """True if any sketch of a clean part is not stored."""
+    return any(not (sketch_path(name, col) / f'{part}.parquet').exists() for col in SKETCHES.get(name, {}))
+
+
+def load_sketches(name):
+    """Stored sketches of a dataset merged across its parts, {column: frame} (columns with none stored are left out)."""
+    return {col: merge_hll([pd.read_parquet(path)]) for col in SKETCHES.get(name, {})
+            if (path := sketch_path(name, col)).is_dir() and any(path.iterdir())}
+
+
+def _negate(df, name):
+    """Rollup with all measures negated (used to retract a replaced/removed part)."""
+    spec = DATASETS[name]
+    df = df.copy()
+    for col in spec['counts'] + [spec['total'], 'rows']:
+        df[col] = -df[col]
+    return df
+
+
+def sync_dataset(name, manifest, force=False, backend=None):
+    """
+    Bring one clean dataset in line with raw_data/.
+
+    Only raw files that are new or whose fingerprint changed are parsed;
+    parts of files that disappeared are removed. The pincode-day rollup is
+    updated from the delta, and each part's distinct-count sketches are
+    stored or dropped with it. Returns a summary dict of what changed.
+    """
+    files = raw_files(name)
+    target = clean_path(name)
+    entry = manifest['datasets'].get(name, {})
+    ingested = entry.get('files', {})
+
+    if not files:
+        # No raw data available (e.g. deployed with processed_data only)
+        return {'added': [], 'replaced': [], 'removed': []}
+
+    current = {Path(f).name: f for f in files}
+    parts_missing = any(
+        (info['rows'] and not part_files(name, info['part'])) or sketches_missing(name, info['part'])
+        for info in ingested.values()
+    )
+    if (force or parts_missing or not target.is_dir()
+            or not rollup_path(name).exists()):
+        # Full rebuild: forced, legacy single-file layout or incomplete store
+        remove_dataset(target)
+        for col in SKETCHES.get(name, {}):
+            remove_dataset(sketch_path(name, col))
+        ingested = {}
+
+    added = [n for n in current if n not in ingested]
+    replaced = [n for n in current if n in ingested and ingested[n]['fingerprint'] != file_fingerprint(current[n])]
+    removed = [n for n in ingested if n not in current]
+
+    if not (added or replaced or removed):
+        return {'added': [], 'replaced': [], 'removed': []}
+
+    deltas = []
+    if rollup_path(name).exists() and ingested:
+        deltas.append(read_partitioned(rollup_path(name), rollup_columns(name)))
+
+    # Retract the previous contribution of replaced/removed files
+    for fname in replaced + removed:
+        old_part = ingested.pop(fname)['part']
+        deltas.append(_negate(rollup(read_part(name, old_part), name), name))
+        remove_part(name, old_part)
+        remove_sketches(name, old_part)
+
+    # Parse the new and changed files one at a time, each written out before the
+    # next is read. If one fails, the parts written so far are dropped: the
+    # manifest still lists the retracted parts, so the next sync rebuilds.
+    written = []
+    try:
+        for fname in added + replaced:
+            df = parse_raw(current[fname], name, backend)
+            part = part_name(fname)
+            written.append(part)
+            write_partitioned(df, target, part)
+            write_sketches(df, name, part)
+            deltas.append(rollup(df, name))
+            ingested[fname] = {
+                'fingerprint': file_fingerprint(current[fname]),
+                'part': part,
+                'rows': len(df),
+            }
+            del df
+    except Exception:
+        for part in written:
+            remove_part(name, part)
+            remove_sketches(name, part)
+        raise
+
+    combined = combine_rollups(deltas, name)
+    if combined is not None:
+        replace_partitioned(combined, rollup_path(name))
+    else:
+        remove_dataset(rollup_path(name))
+
+    manifest['datasets'][name] = {
+        'files': ingested,
+        'rows': sum(f['rows'] for f in ingested.values()),
+    }
+    write_manifest(manifest)
+    return {'added': added, 'replaced': replaced, 'removed': removed}
+
+
+def sync_all(force=False, backend=None):
+    """Incrementally ingest every dataset; returns {name: summary}."""
+    manifest = read_manifest()
+    return {name: sync_dataset(name, manifest, force, backend) for name in DATASETS}
+
+
+def load_clean_dataset(name, force=False, manifest=None, backend=None):
+    """Load one clean dataset, ingesting any new raw files first."""
+    manifest = manifest if manifest is not None else read_manifest()
+    sync_dataset(name, manifest, force, backend)
+    if not clean_path(name).exists():
+        raise FileNotFoundError(f"No raw files found for '{name}' in {RAW_PATH}")
+    return read_clean(name)
+
+
+def load_clean_data(force=False, backend=None):
+    """Load the biometric, demographic and enrolment clean datasets."""
+    manifest = read_manifest()
+    df_bio = load_clean_dataset('biometric', force, manifest, backend)
+    df_demo = load_clean_dataset('demographic', force, manifest, backend)
+    df_enrol = load_clean_dataset('enrolment', force, manifest, backend)
+    return df_bio, df_demo, df_enrol
+
+
+def load_rollups():
+    """Load the biometric, demographic and enrolment pincode-day rollups."""
+    return tuple(read_partitioned(rollup_path(name), rollup_columns(name))
+                 for name in ['biometric', 'demographic', 'enrolment'])
+
+
+def load_chunked_rollups(chunk_mb=CHUNK_MB):
+    """
+    Biometric, demographic and enrolment pincode-day rollups streamed from raw_data/ (nothing is cached).
+
+    Returns (rollups, sketches), sketches holding {dataset: {column: sketch}}
+    merged over the chunks.
+    """
+    names = ['biometric', 'demographic', 'enrolment']
+    results = [chunked_rollup(name, chunk_mb) for name in names]
+    return tuple(df for df, _ in results), {name: sketches for name, (_, sketches) in zip(names, results)}
+
+
+def memory_report():
+    """Print per-column memory of each dataset as default pd.read_csv loads it vs. the clean schema."""
+    print("\n🧠 Memory report (bytes per column)")
+    for name in DATASETS:
+        files = raw_files(name)
+        if not files or not clean_path(name).exists():
+            print(f"   {name}: no data")
+            continue
+        before = pd.concat([pd.read_csv(f) for f in files], ignore_index=True).memory_usage(deep=True, index=False)
+        after = read_clean(name).memory_usage(deep=True, index=False)
+
+        print(f"\n   {name}")
+        print(f"   {'column':<18} {'before':>14} {'after':>14} {'ratio':>7}")
+        for col in after.index:
+            old = before.get(col)
+            ratio = f"{old / after[col]:.1f}x" if old else '-'
+            old = f"{old:,}" if old else '-'
+            print(f"   {col:<18} {old:>14} {after[col]:>14,} {ratio:>7}")
+        print(f"   {'TOTAL':<18} {before.sum():>14,} {after.sum():>14,} {before.sum() / after.sum():>6.1f}x")
+
+
+def main():
+    """Ingest new or changed raw files into the clean datasets."""
+    parser = argparse.ArgumentParser(description="Ingest raw UIDAI dumps into the clean datasets.")
+    parser.add_argument('--force', action='store_true', help="rebuild every clean dataset from scratch")
+    parser.add_argument('--memory-report', action='store_true',
+                        help="print per-column memory before/after the compact schema")
+    args = parser.parse_args()
+
+    print("📥 Ingesting raw data...")
+    for name, summary in sync_all(args.force).items():
+        if any(summary.values()):
+            print(f"   {name}: +{len(summary['added'])} new, "
+                  f"{len(summary['replaced'])} changed, {len(summary['removed'])} removed file(s)")
+        else:
+            print(f"   {name}: up to date")
+
+    if args.memory_report:
+        memory_report()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+⚡ POLARS BACKEND
+Aadhaar Life Cycle Intelligence Platform
+
+Polars lazy implementation of ingestion and of the aggregation cube. Raw CSVs
+and clean Parquet parts are scanned lazily and aggregated with the streaming
+engine on all cores, so the row-level history never has to fit in pandas
+memory. Only the small cube rollups are materialized (as pandas frames), and
+the innovation calculators score them with the same code as the pandas path,
+so both backends produce identical outputs.
+
+Select it with:
+    python breakthrough_innovations.py --backend polars
+    UIDAI_BACKEND=polars streamlit run app.py
+"""
+
+import polars as pl
+from ingestion import (DATASETS, PARTITION_COLUMNS, RAW_TEXT_COLUMNS, STATE_ALIASES, apply_schema,
+                       clean_path, rollup_path)
+from aggregation import CUBE_KEYS, ROW_COLUMNS, as_fact_table, measure_columns
+
+# Streaming engine: bounded memory, all cores
+ENGINE = 'streaming'
+
+
+def scan_raw(files, name):
+    """Lazy query parsing and cleaning raw CSV files (same rules as ingestion.clean_frame)."""
+    spec = DATASETS[name]
+    return pl.scan_csv(files, schema_overrides={c: pl.String for c in RAW_TEXT_COLUMNS}).with_columns(
+        pl.col('date').str.strptime(pl.Date, '%d-%m-%Y').cast(pl.Datetime('ns')),
+        _normalize_name(pl.col('state')).replace(STATE_ALIASES).cast(pl.Categorical),
+        _normalize_name(pl.col('district')).cast(pl.Categorical),
+        pl.sum_horizontal(spec['counts']).alias(spec['total']),
+    )
+
+
+def _normalize_name(expr):
+    """Polars equivalent of ingestion.normalize_name."""
+    return expr.str.strip_chars().str.replace_all(r'\s+', ' ').str.to_titlecase()
+
+
+def read_raw(path, name):
+    """Parse and clean one raw CSV file into a pandas DataFrame with the compact schema."""
+    return apply_schema(scan_raw(path, name).collect(engine=ENGINE).to_pandas(), name)
+
+
+def scan_partitioned(path):
+    """Lazy scan of a Hive-partitioned dataset (state/month read from the directory names)."""
+    return pl.scan_parquet(str(path / '**' / '*.parquet'), hive_partitioning=True,
+                           hive_schema={col: pl.String for col in PARTITION_COLUMNS})
+
+
+def scan_clean(name):
+    """Lazy scan over all parts of a clean dataset."""
+    return scan_partitioned(clean_path(name))
+
+
+def scan_rollup(name):
+    """Lazy scan of a dataset's pincode-day rollup."""
+    return scan_partitioned(rollup_path(name))
+
+
+def _aggregate_source(lf, name):
+    """Group one source down to the cube grain."""
+    has_rows = 'rows' in lf.collect_schema().names()
+    rows = pl.col('rows').sum() if has_rows else pl.len().cast(pl.Int64)
+    return (
+        lf.drop_nulls(CUBE_KEYS)
+        .group_by(CUBE_KEYS)
+        .agg([pl.col(c).cast(pl.Int64).sum() for c in measure_columns(name)] + [rows.alias(ROW_COLUMNS[name])])
+    )
+
+
+def cube_query(enrol, bio, demo):
+    """Lazy (state, district, pincode, date) cube over the three sources."""
+    # Join on plain strings: categorical keys from different files need not share a dictionary
+    enrol, bio, demo = (lf.with_columns(pl.col('state', 'district').cast(pl.String)) for lf in (enrol, bio, demo))
+    cube = _aggregate_source(enrol, 'enrolment')
+    for lf, name in [(bio, 'biometric'), (demo, 'demographic')]:
+        cube = cube.join(_aggregate_source(lf, name), on=CUBE_KEYS, how='full', coalesce=True)
+    value_cols = [c for name in DATASETS for c in measure_columns(name)] + list(ROW_COLUMNS.values())
+    return cube.with_columns(pl.col(value_cols).fill_null(0).cast(pl.Int64))
+
+
+def cube_inputs(cube):
+    """
+    Lazy equivalent of aggregation.cube_inputs.
+
+    All rollups are collected together so the cube is computed once.
+    """
+    all_measures = [c for name in DATASETS for c in measure_columns(name)]
+    row_cols = list(ROW_COLUMNS.values())
+
+    pincode = (
+        cube.group_by(['state', 'district', 'pincode'])
+        .agg(pl.col(all_measures + row_cols).sum(),
+             (pl.col('enrol_rows') > 0).sum().cast(pl.Int64).alias('active_days'))
+        .sort(['state', 'district', 'pincode'])
+    )
+    daily = cube.group_by('date').agg(pl.col(all_measures + row_cols).sum()).sort('date')
+    state = pincode.group_by('state').agg(pl.col(all_measures + row_cols).sum()).sort('state')
+
+    queries = {
+        'state': state,
+        'enrol_state': state.filter(pl.col('enrol_rows') > 0),
+        'demo_state': state.filter(pl.col('demo_rows') > 0),
+        'enrol_daily': daily.filter(pl.col('enrol_rows') > 0),
+        'bio_daily': daily.filter(pl.col('bio_rows') > 0),
+        'demo_daily': daily.filter(pl.col('demo_rows') > 0),
+        'enrol_pincode': pincode.filter(pl.col('enrol_rows') > 0),
+        'pincode_daily': cube.with_columns(pl.col('state', 'district').cast(pl.Categorical)),
+    }
+    frames = pl.collect_all(list(queries.values()), engine=ENGINE)
+    inputs = {key: frame.to_pandas() for key, frame in zip(queries, frames)}
+    # Same surrogate keys and fact-table row order as the pandas cube
+    inputs['pincode_daily'] = as_fact_table(inputs['pincode_daily'])
+    return inputs
+
+
+def load_cube_inputs(incremental=False):
+    """Cube rollups computed lazily from the clean datasets (or pincode-day rollups)."""
+    print("\n🧊 Building aggregation cube (polars, streaming)...")
+
+    scan = scan_rollup if incremental else scan_clean
+    inputs = cube_inputs(cube_query(scan('enrolment'), scan('biometric'), scan('demographic')))
+
+    print(f"   Pincodes: {len(inputs['enrol_pincode']):,} | Days: {len(inputs['enrol_daily']):,}")
+
+    return inputs
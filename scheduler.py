@@ -0,0 +1,146 @@
+"""
+🗓️ STAGE SCHEDULER
+Aadhaar Life Cycle Intelligence Platform
+
+A small DAG scheduler for the innovation pipeline. Each stage declares the
+artifacts it consumes and the artifacts it produces; stages whose inputs are
+ready run concurrently, and every output mapped to a file is written by the
+worker as soon as its stage finishes (Parquet, or Arrow IPC for .arrow
+paths). Per-stage wall times are reported at the end.
+
+The stages are pandas/NumPy code that holds the GIL, so threads only overlap
+I/O. Stages marked process=True run in a pool of worker processes instead:
+their function and inputs are pickled to the worker, which writes the file
+outputs itself and sends the artifacts back. Light stages stay on threads,
+where shipping the inputs would cost more than the work. With a single
+worker (e.g. one CPU) everything runs in-process, one stage at a time.
+"""
+
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from ingestion import write_arrow, write_parquet
+
+
+@dataclass
+class Stage:
+    """
+    One unit of pipeline work.
+
+    func is called with the input artifacts (in declared order) and returns
+    the output artifact, or a tuple of them when it declares several.
+    outputs maps each artifact name to a Parquet (or .arrow) path, or None
+    to keep it in memory only. process=True runs a CPU-bound stage in a
+    worker process; func must then be picklable (a module-level function or
+    a functools.partial of one, not a lambda).
+    """
+    name: str
+    func: callable
+    inputs: tuple = ()
+    outputs: dict = field(default_factory=dict)
+    process: bool = False
+
+
+def _validate(stages, available):
+    """Reject duplicate producers, unknown inputs and cycles before running."""
+    producers = {}
+    for stage in stages:
+        for artifact in stage.outputs:
+            if artifact in producers or artifact in available:
+                raise ValueError(f"Artifact '{artifact}' is produced more than once")
+            producers[artifact] = stage.name
+    for stage in stages:
+        missing = [a for a in stage.inputs if a not in producers and a not in available]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' needs unknown artifact(s): {missing}")
+
+    # Kahn's algorithm over the artifact dependencies
+    ready = set(available)
+    pending = list(stages)
+    while pending:
+        runnable = [s for s in pending if all(a in ready for a in s.inputs)]
+        if not runnable:
+            raise ValueError(f"Cycle between stages: {[s.name for s in pending]}")
+        for stage in runnable:
+            ready.update(stage.outputs)
+            pending.remove(stage)
+
+
+def _run_stage(stage, args):
+    """Execute a stage and write its file outputs; returns (outputs, seconds)."""
+    start = time.perf_counter()
+    result = stage.func(*args)
+    names = list(stage.outputs)
+    values = [result] if len(names) == 1 else list(result)
+    produced = dict(zip(names, values))
+
+    for artifact, path in stage.outputs.items():
+        if path is not None:
+            # Atomic replace: readers never see a half-written file
+            writer = write_arrow if path.suffix == '.arrow' else write_parquet
+            writer(produced[artifact], path)
+
+    return produced, time.perf_counter() - start
+
+
+def run_stages(stages, max_workers=None, artifacts=None):
+    """
+    Run stages as soon as their inputs are available.
+
+    At most max_workers stages (default: one per CPU) run at a time;
+    process stages go to a worker process pool, the rest to threads.
+    Returns (artifacts, timings) where timings maps stage name to wall
+    seconds. The first stage failure cancels the remaining work and is
+    re-raised.
+    """
+    artifacts = dict(artifacts or {})
+    _validate(stages, artifacts)
+
+    max_workers = max_workers or min(len(stages), os.cpu_count() or 1) or 1
+    timings = {}
+    pending = list(stages)
+    running = {}
+    start = time.perf_counter()
+
+    # Spawned workers: the scheduler's own threads may be running when a worker starts
+    use_processes = max_workers > 1 and any(s.process for s in stages)
+    process_pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn')) \
+        if use_processes else nullcontext()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as threads, process_pool as processes:
+        while pending or running:
+            ready = [s for s in pending if all(a in artifacts for a in s.inputs)]
+            for stage in ready[:max_workers - len(running)]:
+                args = [artifacts[a] for a in stage.inputs]
+                pool = processes if stage.process and use_processes else threads
+                running[pool.submit(_run_stage, stage, args)] = stage
+                pending.remove(stage)
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                try:
+                    produced, seconds = future.result()
+                except Exception:
+                    for other in running:
+                        other.cancel()
+                    raise
+                artifacts.update(produced)
+                timings[stage.name] = seconds
+
+    timings['total'] = time.perf_counter() - start
+    return artifacts, timings
+
+
+def print_timings(timings):
+    """Per-stage wall time report."""
+    total = timings.get('total', 0.0)
+    stage_sum = sum(t for name, t in timings.items() if name != 'total')
+    print("\n⏱️ Stage timings:")
+    for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        if name != 'total':
+            print(f"   {name:<20} {seconds:8.2f}s")
+    print(f"   {'wall clock':<20} {total:8.2f}s (sum of stages {stage_sum:.2f}s)")
@@ -0,0 +1,277 @@
+"""
+📐 MERGEABLE SKETCHES
+Aadhaar Life Cycle Intelligence Platform
+
+Constant-memory summaries for the statistics that do not combine by simple
+addition across chunks, partitions or incremental batches:
+
+    HyperLogLog  - distinct counts (pincodes per district, districts per state)
+    KLLSketch    - medians and percentile ranks (migration/desert thresholds)
+
+Distinct counts are kept as sparse HyperLogLog frames (hll_frame()): one row
+per group and register that is set, so a sketch grows with the distinct
+values of each group rather than with 2^p registers per group. Frames merge
+by a per-register max (merge_hll()) and fold to any lower precision
+(fold_hll()), so ingestion stores one sketch per raw-file part at
+HLL_MAX_PRECISION next to the rollups, the chunked mode merges one per chunk,
+and sketch mode reads them at the precision its error target needs:
+    python breakthrough_innovations.py --sketch 0.01
+
+Medians and percentile ranks run over derived per-geography values (service
+density, migration index) that change with every partition, so their KLL
+sketches are built per call over those values.
+"""
+
+import numpy as np
+import pandas as pd
+
+# HLL register count bounds (2^4 .. 2^18 registers)
+HLL_MIN_PRECISION = 4
+HLL_MAX_PRECISION = 18
+
+# Seed of the KLL compaction coin flips (fixed so runs are reproducible)
+KLL_SEED = 0
+
+
+def _hash(values):
+    """Stable 64-bit hash of each value."""
+    return pd.util.hash_array(np.asarray(values), categorize=False)
+
+
+def _bit_length(x):
+    """Number of significant bits of each uint64 (0 for 0), without float rounding."""
+    x = x.copy()
+    bits = np.zeros(x.shape, dtype=np.int64)
+    for shift in (32, 16, 8, 4, 2, 1):
+        big = x >= (np.uint64(1) << np.uint64(shift))
+        bits[big] += shift
+        x[big] >>= np.uint64(shift)
+    return bits + (x > 0)
+
+
+def hll_precision(error):
+    """Register bits giving roughly the requested relative standard error (1.04 / sqrt(2^p))."""
+    p = int(np.ceil(np.log2((1.04 / error) ** 2)))
+    return min(max(p, HLL_MIN_PRECISION), HLL_MAX_PRECISION)
+
+
+def _hll_registers(values, p):
+    """Register index and value (position of the leftmost 1-bit after the index bits) of each hashed value."""
+    h = _hash(values)
+    index = (h >> np.uint64(64 - p)).astype(np.int64)
+    rest = h & np.uint64((1 << (64 - p)) - 1)
+    rho = ((64 - p) - _bit_length(rest) + 1).astype(np.uint8)
+    return index, rho
+
+
+def _hll_estimate(harmonic, zeros, m):
+    """
+    Cardinality estimate from the sum of 2^-register over all m registers and
+    the number of empty registers (with small-range linear counting).
+    """
+    alpha = 0.7213 / (1 + 1.079 / m) if m >= 128 else {16: 0.673, 32: 0.697, 64: 0.709}[m]
+    raw = alpha * m * m / harmonic
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class HyperLogLog:
+    """Distinct-count sketch; relative standard error is about 1.04 / sqrt(2^p)."""
+
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros((1, 1 << p), dtype=np.uint8)
+
+    @classmethod
+    def for_error(cls, error):
+        return cls(hll_precision(error))
+
+    def update(self, values):
+        index, rho = _hll_registers(np.asarray(values), self.p)
+        np.maximum.at(self.registers[0], index, rho)
+        return self
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge HyperLogLog sketches of precision {self.p} and {other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        m = self.registers.shape[-1]
+        harmonic = np.sum(np.exp2(-self.registers.astype(np.float64)), axis=-1)
+        return float(_hll_estimate(harmonic, np.sum(self.registers == 0, axis=-1), m)[0])
+
+
+class KLLSketch:
+    """
+    Quantile sketch (KLL compactors); normalized rank error is about
+    2.296 / k^0.9723 (the double-sided bound of the Apache DataSketches KLL).
+
+    Level i holds items of weight 2^i. A full level is sorted and every other
+    item (random offset) is promoted to the next level.
+    """
+
+    def __init__(self, k=200, seed=KLL_SEED):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def for_error(cls, error):
+        return cls(max(int(np.ceil((2.296 / error) ** (1 / 0.9723))), 8))
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(np.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays behind; the rest is halved into the next level
+                odd, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self._rng.integers(2)::2]
+                self.levels[level] = odd
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values):
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=np.float64)])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self._compress()
+        return self
+
+    def _weighted(self):
+        """Retained items in sorted order with their weights."""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(v), 2 ** i, dtype=np.int64) for i, v in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], weights[order]
+
+    def quantile(self, q):
+        """q-quantile with linear interpolation (numpy's default on exact input)."""
+        items, weights = self._weighted()
+        if len(items) == 0:
+            return np.nan
+        starts = np.cumsum(weights) - weights
+        position = q * (weights.sum() - 1)
+        lo = items[np.searchsorted(starts, np.floor(position), side='right') - 1]
+        hi = items[np.searchsorted(starts, np.ceil(position), side='right') - 1]
+        return lo + (hi - lo) * (position - np.floor(position))
+
+    def rank(self, values):
+        """Fractional rank of each value, ties averaged (pandas rank(pct=True) on exact input)."""
+        items, weights = self._weighted()
+        cum = np.concatenate([[0], np.cumsum(weights)])
+        values = np.asarray(values, dtype=np.float64)
+        below = cum[np.searchsorted(items, values, side='left')]
+        equal = cum[np.searchsorted(items, values, side='right')] - below
+        return (below + (equal + 1) / 2) / cum[-1]
+
+
+def hll_frame(df, by, col, p=HLL_MAX_PRECISION):
+    """
+    Sparse HyperLogLog sketch of col per group of by.
+
+    One row per group and register that is set: the group keys (categoricals
+    as strings, so sketches of different parts concatenate), 'register' and
+    its value 'rho'. Rows with missing keys or values are not counted.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    df = df.loc[df[by].notna().all(axis=1) & df[col].notna()]
+    register, rho = _hll_registers(df[col].to_numpy(), p)
+    keys = df[by].astype({c: str for c in by if isinstance(df[c].dtype, pd.CategoricalDtype)})
+    frame = keys.reset_index(drop=True).assign(register=register.astype(np.int32), rho=rho)
+    return merge_hll([frame])
+
+
+def _hll_keys(frame):
+    """Group key columns of a sparse sketch."""
+    return [c for c in frame.columns if c not in ('register', 'rho')]
+
+
+def merge_hll(frames, by=None):
+    """Union of sparse sketches of the same precision (max of each register), per group of by (default: their keys)."""
+    merged = pd.concat(frames, ignore_index=True)
+    by = _hll_keys(merged) if by is None else ([by] if isinstance(by, str) else list(by))
+    return merged.groupby(by + ['register'], sort=False, observed=True)['rho'].max().reset_index()
+
+
+def fold_hll(frame, p_from, p_to):
+    """
+    Sparse sketch folded from precision p_from to p_to <= p_from.
+
+    The index bits dropped from each register move in front of the bits its
+    value was counted from: a register whose dropped bits are not all zero
+    gets the position of their leftmost 1-bit, the others add their length.
+    """
+    shift = p_from - p_to
+    if shift == 0:
+        return frame
+    register = frame['register'].to_numpy()
+    low = (register & ((1 << shift) - 1)).astype(np.uint64)
+    rho = np.where(low > 0, shift - _bit_length(low) + 1, shift + frame['rho'].to_numpy(dtype=np.int64))
+    folded = frame.assign(register=register >> shift, rho=rho.astype(np.uint8))
+    return merge_hll([folded])
+
+
+def hll_counts(frame, by, p):
+    """Distinct-count estimate of each group of by from a sparse sketch of precision p (keys may be finer)."""
+    by = [by] if isinstance(by, str) else list(by)
+    registers = merge_hll([frame], by)
+    m = 1 << p
+    grouped = registers.assign(inverse=np.exp2(-registers['rho'].astype(np.float64))).groupby(by, sort=False)
+    harmonic = grouped['inverse'].sum()
+    zeros = m - grouped.size()
+    return pd.Series(np.round(_hll_estimate(harmonic + zeros, zeros, m)).astype(np.int64), index=harmonic.index)
+
+
+def kll_sketch(values, error):
+    """KLL sketch of an array."""
+    return KLLSketch.for_error(error).update(values)
+
+
+def distinct_counts(df, by, col, error=None, sketch=None):
+    """
+    Distinct values of col per group of by (groupby nunique when error is None).
+
+    With an error target the counts are HyperLogLog estimates, read from
+    sketch when given (a merged hll_frame() of col at HLL_MAX_PRECISION,
+    grouped by by or finer keys) and otherwise sketched from df itself.
+    """
+    grouped = df.groupby(by, observed=True)
+    if error is None:
+        return grouped[col].nunique()
+    p = hll_precision(error)
+    keys = [by] if isinstance(by, str) else list(by)
+    sketch = hll_frame(df, keys, col, p) if sketch is None else fold_hll(sketch, HLL_MAX_PRECISION, p)
+    counts = hll_counts(sketch, keys, p)
+    index = grouped[col].size().index
+    return counts.reindex(index, fill_value=0).rename(col)
+
+
+def median(values, error=None):
+    """Median of a Series (exact when error is None)."""
+    if error is None:
+        return values.median()
+    return kll_sketch(values.dropna(), error).quantile(0.5)
+
+
+def percentile_rank(values, error=None):
+    """Fractional rank of each value, like values.rank(pct=True) (exact when error is None)."""
+    if error is None:
+        return values.rank(pct=True)
+    ranks = kll_sketch(values.dropna(), error).rank(values)
+    return pd.Series(ranks, index=values.index).where(values.notna())
@@ -0,0 +1,134 @@
+"""
+Shared test helpers: the top-level pipeline modules on sys.path, and a small
+synthetic raw_data/ tree for checking incremental runs against full rebuilds.
+
+The pipeline resolves raw_data/ and processed_data/ relative to the working
+directory, so each run happens in its own directory under tmp_path.
+"""
+
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from ingestion import DATASETS  # noqa: E402
+
+# Synthetic geography: three pincodes per district
+STATES = {
+    'Bihar': ['Gaya', 'Patna'],
+    'Karnataka': ['Bagalkot', 'Bangalore'],
+    'Kerala': ['Kochi', 'Thrissur'],
+}
+FIRST_DATE = pd.Timestamp('2025-01-01')
+
+# Raw files written per dataset: (first day, end day) offsets from FIRST_DATE
+FILE_DAYS = [(0, 80), (80, 110)]
+NEW_FILE_DAYS = (110, 120)
+
+
+def pincodes():
+    """(state, district, pincode) of every synthetic pincode."""
+    rows, pincode = [], 800001
+    for state, districts in STATES.items():
+        for district in districts:
+            for _ in range(3):
+                rows.append((state, district, pincode))
+                pincode += 1
+    return rows
+
+
+def raw_rows(name, days, seed):
+    """Raw CSV rows of a dataset over a day range: most pincodes report on most days."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for day in range(*days):
+        date = (FIRST_DATE + pd.Timedelta(days=day)).strftime('%d-%m-%Y')
+        for i, (state, district, pincode) in enumerate(pincodes()):
+            if rng.random() < 0.8:
+                counts = rng.poisson(3 + i % 5, len(DATASETS[name]['counts']))
+                rows.append([date, state, district, pincode, *counts])
+    return pd.DataFrame(rows, columns=['date', 'state', 'district', 'pincode'] + DATASETS[name]['counts'])
+
+
+def raw_file(root, name, index):
+    """Path of the index-th raw file of a dataset (named by record range, like the API dumps)."""
+    start = (list(DATASETS).index(name) + 1) * 1_000_000 + index * 10_000
+    return root / 'raw_data' / f'api_data_aadhar_{name}_{start}_{start + 10_000}.csv'
+
+
+def write_raw(root, name, index, days):
+    """Write the index-th raw file of a dataset covering a day range."""
+    path = raw_file(root, name, index)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    raw_rows(name, days, seed=len(name) * 100 + index).to_csv(path, index=False)
+
+
+def add_new_files(root):
+    """A new range file per dataset with the days after the current history."""
+    for name in DATASETS:
+        write_raw(root, name, len(FILE_DAYS), NEW_FILE_DAYS)
+
+
+def relabel_district(root):
+    """
+    Replace the first demographic file with one whose Bangalore rows are labelled Bagalkot.
+
+    Daily national totals are unchanged: volume only moves between districts.
+    """
+    path = raw_file(root, 'demographic', 0)
+    rows = pd.read_csv(path, dtype=str)
+    rows.loc[rows['district'] == 'Bangalore', 'district'] = 'Bagalkot'
+    rows.to_csv(path, index=False)
+
+
+def remove_file(root):
+    """Remove the oldest biometric range file."""
+    raw_file(root, 'biometric', 0).unlink()
+
+
+# Raw data changes an incremental run has to match a full rebuild on
+CHANGES = {
+    'new file': add_new_files,
+    'changed file': relabel_district,
+    'removed file': remove_file,
+}
+
+
+@pytest.fixture
+def raw_tree(tmp_path, monkeypatch):
+    """
+    Working directory holding the initial synthetic raw files.
+
+    Returns (root, rebuild): rebuild() copies root's current raw_data/ to a
+    fresh directory and makes it the working directory, for a full run to
+    compare against.
+    """
+    root = tmp_path / 'incremental'
+    for name in DATASETS:
+        for index, days in enumerate(FILE_DAYS):
+            write_raw(root, name, index, days)
+    monkeypatch.chdir(root)
+
+    def rebuild():
+        full = tmp_path / 'full'
+        shutil.copytree(root / 'raw_data', full / 'raw_data')
+        monkeypatch.chdir(full)
+        return full
+
+    return root, rebuild
+
+
+def normalized(df):
+    """Frame with categorical columns as strings, rows in a canonical order and a fresh index."""
+    df = df.astype({col: str for col in df.columns if isinstance(df[col].dtype, pd.CategoricalDtype)})
+    return df.sort_values(list(df.columns), kind='stable').reset_index(drop=True)
+
+
+def assert_same_rows(actual, expected):
+    """Assert two frames hold the same rows, in any order."""
+    pd.testing.assert_frame_equal(normalized(actual), normalized(expected)[list(actual.columns)])
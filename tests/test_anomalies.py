@@ -0,0 +1,44 @@
+"""Incremental runs of the streaming anomaly store (anomalies.py) against full rebuilds."""
+
+import re
+import pandas as pd
+import pytest
+from anomalies import DAILY_ROLLUPS, load_anomaly_events, detect_anomalies
+from breakthrough_innovations import load_inputs
+from conftest import CHANGES, FIRST_DATE, NEW_FILE_DAYS, assert_same_rows
+from ingestion import sync_all
+
+
+def run(incremental):
+    """Ingest raw_data/ and bring the anomaly store up to date; returns (summary, logged events)."""
+    sync_all()
+    inputs = load_inputs(incremental)
+    summary = detect_anomalies(inputs['pincode_daily'], {key: inputs[key] for key in DAILY_ROLLUPS}, incremental)
+    return summary, load_anomaly_events()
+
+
+@pytest.mark.parametrize('change', list(CHANGES))
+def test_incremental_matches_full_rebuild(raw_tree, change):
+    root, rebuild = raw_tree
+    run(incremental=False)
+    CHANGES[change](root)
+    summary, events = run(incremental=True)
+
+    rebuild()
+    expected_summary, expected_events = run(incremental=False)
+
+    assert_same_rows(summary, expected_summary)
+    assert_same_rows(events, expected_events)
+
+
+def test_unchanged_history_absorbs_only_new_days(raw_tree, capsys):
+    root, _ = raw_tree
+    run(incremental=False)
+    CHANGES['new file'](root)
+    capsys.readouterr()
+    run(incremental=True)
+
+    facts = load_inputs(incremental=True)['pincode_daily']
+    new_rows = (facts['date'] >= FIRST_DATE + pd.Timedelta(days=NEW_FILE_DAYS[0])).sum()
+    absorbed = int(re.search(r'Rows absorbed: ([\d,]+)', capsys.readouterr().out).group(1).replace(',', ''))
+    assert absorbed == new_rows
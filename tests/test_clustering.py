@@ -0,0 +1,69 @@
+"""Cluster labels of the district clustering stage (clustering.py) across runs on changing features."""
+
+import numpy as np
+import pandas as pd
+import pytest
+from clustering import FEATURE_COLUMNS, cluster_districts, load_centroids
+
+DISTRICTS = 300
+
+
+@pytest.fixture
+def features(tmp_path, monkeypatch):
+    """Feature table of three overlapping district segments, in a working directory of its own."""
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    segment = rng.integers(0, 3, DISTRICTS)
+    values = rng.normal(segment[:, None] * 0.5, 1.0, (DISTRICTS, len(FEATURE_COLUMNS)))
+    frame = pd.DataFrame(values, columns=FEATURE_COLUMNS)
+    frame.insert(0, 'state', [f'State {i % 10}' for i in range(DISTRICTS)])
+    frame.insert(1, 'district', [f'District {i}' for i in range(DISTRICTS)])
+    return frame
+
+
+def nudged(features, size, seed=1):
+    """Features with every value moved by normal noise of the given size (in standard deviations)."""
+    rng = np.random.default_rng(seed)
+    scale = features[FEATURE_COLUMNS].std(ddof=0).to_numpy()
+    moved = features.copy()
+    moved[FEATURE_COLUMNS] += rng.normal(0, size, (len(features), len(FEATURE_COLUMNS))) * scale
+    return moved
+
+
+def test_small_delta_keeps_centroids_and_labels(features, capsys):
+    first = cluster_districts(features)
+    centroids, _ = load_centroids()
+    capsys.readouterr()
+    second = cluster_districts(nudged(features, 0.05))
+
+    assert 'saved centroids' in capsys.readouterr().out
+    np.testing.assert_array_equal(load_centroids()[0], centroids)
+    assert (second['cluster'] == first['cluster']).all()
+
+
+def test_district_moved_onto_another_centroid_is_relabelled(features):
+    first = cluster_districts(features)
+    centroids, _ = load_centroids()
+    moved = features.copy()
+    label = first.loc[0, 'cluster']
+    other = (label + 1) % len(centroids)
+    moved.loc[0, FEATURE_COLUMNS] = centroids[other]
+    second = cluster_districts(moved)
+
+    assert second.loc[0, 'cluster'] == other
+    assert (second['cluster'].iloc[1:] == first['cluster'].iloc[1:]).all()
+
+
+def test_drift_refits_and_keeps_labels_of_matched_segments(features, capsys):
+    first = cluster_districts(features)
+    centroids, _ = load_centroids()
+    # The outermost segment moves further out: the centroids drift, the segments stay the same
+    outer = first['cluster'] == first.loc[features[FEATURE_COLUMNS].sum(axis=1).idxmax(), 'cluster']
+    shifted = features.copy()
+    shifted[FEATURE_COLUMNS] += outer.to_numpy()[:, None] * 2.0
+    capsys.readouterr()
+    second = cluster_districts(shifted)
+
+    assert 'warm start' in capsys.readouterr().out
+    assert not np.allclose(load_centroids()[0], centroids)
+    assert (second['cluster'] == first['cluster']).all()
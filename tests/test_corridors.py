@@ -0,0 +1,45 @@
+"""Tests for the estimated district migration corridors (corridors.py)."""
+
+import numpy as np
+import pandas as pd
+from corridors import CORRIDOR_COLUMNS, PERIOD, estimate_corridors
+
+DISTRICTS = [('Bihar', 'Patna'), ('Delhi', 'New Delhi'), ('Kerala', 'Kochi')]
+
+
+def make_facts(weeks, demo):
+    """Fact rows of one pincode per district; demo(district, week) gives each day's demographic updates."""
+    dates = pd.date_range('2025-01-01', periods=weeks * PERIOD, freq='D')
+    rows = [
+        {'date': date, 'state': state, 'district': district, 'state_id': i, 'district_id': i,
+         'pincode': 800001 + i, 'total_demo': demo(i, day // PERIOD)}
+        for day, date in enumerate(dates)
+        for i, (state, district) in enumerate(DISTRICTS)
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_flat_short_series_has_no_corridors():
+    corridors = estimate_corridors(make_facts(2, lambda district, week: 100))
+
+    assert corridors.empty
+    assert list(corridors.columns) == CORRIDOR_COLUMNS
+
+
+def test_drop_pairs_with_same_week_surge():
+    def demo(district, week):
+        if week == 4 and district == 0:
+            return 10
+        if week == 4 and district == 1:
+            return 190
+        return 100
+
+    corridors = estimate_corridors(make_facts(8, demo))
+
+    assert len(corridors) == 1
+    top = corridors.iloc[0]
+    assert (top['origin_district'], top['destination_district']) == ('Patna', 'New Delhi')
+    assert top['estimated_flow'] == 90 * PERIOD
+    assert top['weeks'] == 1
+    assert top['interstate']
+    assert np.isclose(top['origin_share'], 100.0)
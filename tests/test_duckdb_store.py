@@ -0,0 +1,53 @@
+"""The DuckDB innovation views (duckdb_store.py) against the pandas calculators."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import breakthrough_innovations as bi
+from duckdb_store import INNOVATION_VIEWS, build_store, connect
+from ingestion import sync_all
+
+
+def expected_outputs():
+    """Pandas output each innovation view reproduces, from the current rollups."""
+    inputs = bi.load_inputs(incremental=True)
+    life_events, monthly, _ = bi.calculate_life_events(inputs['pincode_daily'])
+    return {
+        'migration_flow': bi.calculate_migration_flow(inputs['enrol_state'], inputs['demo_state']),
+        'life_events_framework': life_events,
+        'life_events_monthly': monthly,
+        'age_cohort_forecast': bi.calculate_age_cohort_forecast(inputs['enrol_state']),
+        'service_deserts': bi.calculate_service_deserts(inputs['enrol_pincode']),
+        'sdg_alignment': bi.calculate_sdg_alignment(inputs['enrol_pincode'], inputs['bio_daily'], inputs['demo_daily']),
+    }
+
+
+@pytest.fixture
+def store(raw_tree, tmp_path):
+    """Read-only connection to a store built from the synthetic raw files, and the pandas outputs."""
+    sync_all()
+    path = tmp_path / 'uidai.duckdb'
+    build_store(path)
+    con = connect(path)
+    yield con, expected_outputs()
+    con.close()
+
+
+def assert_same_frame(sql_df, pandas_df):
+    """Same columns and rows in the same order, numbers equal (to float precision) and labels identical."""
+    assert list(sql_df.columns) == list(pandas_df.columns)
+    assert len(sql_df) == len(pandas_df)
+    for col in pandas_df.columns:
+        left, right = sql_df[col].reset_index(drop=True), pandas_df[col].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(right) and not pd.api.types.is_bool_dtype(right):
+            np.testing.assert_allclose(left.astype(float), right.astype(float), rtol=1e-12, atol=1e-9,
+                                       equal_nan=True, err_msg=col)
+        else:
+            assert left.astype(str).tolist() == right.astype(str).tolist(), col
+
+
+@pytest.mark.parametrize('view', INNOVATION_VIEWS)
+def test_view_matches_pandas_calculator(store, view):
+    con, expected = store
+
+    assert_same_frame(con.execute(f"SELECT * FROM {view}").fetch_df(), expected[view])
@@ -0,0 +1,85 @@
+"""Incremental ingestion (ingestion.py): syncing a change must match ingesting from scratch."""
+
+import pandas as pd
+import pytest
+from conftest import CHANGES, NEW_FILE_DAYS, assert_same_rows, raw_file, write_raw
+from ingestion import (DATASETS, load_rollups, part_files, part_name, read_clean, read_manifest, remove_dataset,
+                       replace_partitioned, sync_all)
+
+
+def stores():
+    """Clean dataset and pincode-day rollup of every dataset, by name."""
+    rollups = dict(zip(['biometric', 'demographic', 'enrolment'], load_rollups()))
+    return {name: (read_clean(name), rollups[name]) for name in DATASETS}
+
+
+@pytest.mark.parametrize('change', list(CHANGES))
+def test_incremental_sync_matches_full_ingest(raw_tree, change):
+    root, rebuild = raw_tree
+    sync_all()
+    CHANGES[change](root)
+    summary = sync_all()
+    incremental, rows = stores(), read_manifest()['datasets']
+
+    rebuild()
+    sync_all()
+    expected, expected_rows = stores(), read_manifest()['datasets']
+
+    assert any(any(changes.values()) for changes in summary.values())
+    for name in DATASETS:
+        for actual, full in zip(incremental[name], expected[name]):
+            assert_same_rows(actual, full)
+        assert rows[name]['rows'] == expected_rows[name]['rows']
+
+
+def test_failed_sync_drops_its_parts_and_recovers(raw_tree):
+    root, rebuild = raw_tree
+    sync_all()
+    # Two new enrolment files: the first parses, the second has an invalid pincode
+    write_raw(root, 'enrolment', 2, NEW_FILE_DAYS)
+    write_raw(root, 'enrolment', 3, NEW_FILE_DAYS)
+    bad = raw_file(root, 'enrolment', 3)
+    rows = pd.read_csv(bad, dtype=str)
+    rows.loc[0, 'pincode'] = '42'
+    rows.to_csv(bad, index=False)
+
+    with pytest.raises(ValueError, match='pincode'):
+        sync_all()
+    assert not part_files('enrolment', part_name(raw_file(root, 'enrolment', 2).name))
+
+    rows.loc[0, 'pincode'] = '800001'
+    rows.to_csv(bad, index=False)
+    sync_all()
+    incremental = stores()
+
+    rebuild()
+    sync_all()
+    expected = stores()
+
+    for name in DATASETS:
+        for actual, full in zip(incremental[name], expected[name]):
+            assert_same_rows(actual, full)
+
+
+def test_unchanged_raw_data_is_not_reparsed(raw_tree):
+    sync_all()
+    summary = sync_all()
+
+    assert not any(any(changes.values()) for changes in summary.values())
+
+
+def test_snapshot_replaces_legacy_flat_file(tmp_path):
+    target = tmp_path / 'pincode_anomalies.parquet'
+    pd.DataFrame({'pincode': [800001]}).to_parquet(target)
+    snapshot = pd.DataFrame({'state': ['Bihar', 'Kerala'], 'district': ['Gaya', 'Kochi'],
+                             'as_of': pd.Timestamp('2025-04-30')})
+
+    replace_partitioned(snapshot, target, date=None)
+    assert sorted(path.name for path in target.iterdir()) == ['state=Bihar', 'state=Kerala']
+    assert_same_rows(pd.read_parquet(target)[snapshot.columns], snapshot)
+
+    remove_dataset(target)
+    assert not target.exists()
+    pd.DataFrame({'pincode': [800001]}).to_parquet(target)
+    remove_dataset(target)
+    assert not target.exists()
@@ -0,0 +1,160 @@
+"""Sketch mode (sketches.py) against exact mode, and sketches merged across parts, chunks and incremental runs."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import breakthrough_innovations as bi
+from conftest import CHANGES, FILE_DAYS, assert_same_rows, raw_file
+from ingestion import load_chunked_rollups, load_sketches, sync_all
+from sketches import (HLL_MAX_PRECISION, KLLSketch, distinct_counts, fold_hll, hll_counts, hll_frame, hll_precision,
+                      merge_hll)
+
+ERROR = 0.01
+PARTITIONS = 8
+
+# Three standard errors of the distinct counts; the quantile sketches are sized for ERROR
+HLL_BOUND = 3 * 1.04 / np.sqrt(1 << hll_precision(ERROR))
+RANK_BOUND = ERROR
+
+
+@pytest.fixture
+def values():
+    """Grouped values with a few thousand distinct values per group."""
+    rng = np.random.default_rng(0)
+    n = 200_000
+    return pd.DataFrame({'state': rng.choice(['Bihar', 'Kerala', 'Punjab'], n),
+                         'district': rng.choice(['North', 'South'], n),
+                         'pincode': rng.integers(100_000, 120_000, n)})
+
+
+def partitions(df, n=PARTITIONS):
+    """Split a frame into n contiguous partitions."""
+    return [df.iloc[rows] for rows in np.array_split(np.arange(len(df)), n)]
+
+
+def count_error(approx, exact):
+    """Worst relative error of distinct counts, allowing an off-by-one (a register collision) on tiny counts."""
+    return float(((approx - exact).abs() - 1).clip(lower=0).div(exact).max())
+
+
+def test_merged_partition_sketches_match_single_pass(values):
+    by = ['state', 'district']
+    merged = merge_hll([hll_frame(part, by, 'pincode') for part in partitions(values)])
+
+    assert_same_rows(merged, hll_frame(values, by, 'pincode'))
+
+
+def test_folded_sketch_matches_sketch_at_lower_precision(values):
+    p = hll_precision(ERROR)
+    folded = fold_hll(hll_frame(values, 'state', 'pincode'), HLL_MAX_PRECISION, p)
+
+    assert_same_rows(folded, hll_frame(values, 'state', 'pincode', p))
+
+
+@pytest.mark.parametrize('by', ['state', ['state', 'district']])
+def test_distinct_counts_within_error(values, by):
+    exact = distinct_counts(values, by, 'pincode')
+    approx = distinct_counts(values, by, 'pincode', ERROR)
+    stored = distinct_counts(values, by, 'pincode', ERROR, hll_frame(values, ['state', 'district'], 'pincode'))
+
+    assert count_error(approx, exact) <= HLL_BOUND
+    pd.testing.assert_series_equal(stored, approx)
+
+
+def test_sketch_grows_with_distinct_values_not_registers():
+    df = pd.DataFrame({'state': ['Bihar'] * 3 + ['Kerala'] * 2, 'pincode': [800001, 800002, 800001, 682001, 682001]})
+    sketch = hll_frame(df, 'state', 'pincode')
+
+    assert len(sketch) == 3
+    assert hll_counts(sketch, 'state', HLL_MAX_PRECISION).to_dict() == {'Bihar': 2, 'Kerala': 1}
+
+
+def test_merged_kll_ranks_and_median_within_error(values):
+    data = values['pincode'].to_numpy(dtype=np.float64)
+    merged = KLLSketch.for_error(ERROR)
+    for part in np.array_split(data, PARTITIONS):
+        merged.merge(KLLSketch.for_error(ERROR).update(part))
+
+    true_rank = pd.Series(data).rank(pct=True).to_numpy()
+    assert np.abs(merged.rank(data) - true_rank).max() <= RANK_BOUND
+    # Ties: q is a valid median if at most half the values lie below it and at least half at or below it
+    q = merged.quantile(0.5)
+    assert max((data < q).mean() - 0.5, 0.5 - (data <= q).mean(), 0.0) <= RANK_BOUND
+
+
+def test_exact_input_kll_matches_pandas():
+    data = pd.Series([5.0, 1.0, 3.0, 3.0, 8.0, 2.0])
+    sketch = KLLSketch.for_error(ERROR).update(data)
+
+    assert sketch.quantile(0.5) == data.median()
+    np.testing.assert_allclose(sketch.rank(data), data.rank(pct=True))
+
+
+def test_calculators_in_sketch_mode_match_exact_mode(raw_tree):
+    sync_all()
+    inputs = bi.load_inputs(sketches=True)
+    pincode, sketches = inputs['enrol_pincode'], inputs['enrol_sketches']
+
+    exact = bi.calculate_service_deserts(pincode)
+    approx = bi.calculate_service_deserts(pincode, ERROR, sketches)
+    assert count_error(approx['unique_pincodes'], exact['unique_pincodes']) <= HLL_BOUND
+    # Rank error of the sketch alone: exact ranks of the same (approximate) densities
+    exact_score = (100 - approx['enrol_per_pincode'].rank(pct=True) * 100).round(0)
+    assert (approx['desert_score'] - exact_score).abs().max() / 100 <= RANK_BOUND + 0.01
+
+    exact = bi.calculate_sdg_alignment(pincode, inputs['bio_daily'], inputs['demo_daily'])
+    approx = bi.calculate_sdg_alignment(pincode, inputs['bio_daily'], inputs['demo_daily'], ERROR, sketches)
+    for col in ['pincode', 'district']:
+        assert count_error(approx[col], exact[col]) <= HLL_BOUND
+
+    exact = bi.calculate_migration_flow(inputs['enrol_state'], inputs['demo_state'])
+    approx = bi.calculate_migration_flow(inputs['enrol_state'], inputs['demo_state'], ERROR)
+    assert (approx['migration_intensity'] - exact['migration_intensity']).abs().max() / 100 <= RANK_BOUND + 0.001
+
+
+def relabel_enrolment_district(root):
+    """Label Kochi's rows in the last enrolment file as a new district, Kannur."""
+    path = raw_file(root, 'enrolment', len(FILE_DAYS) - 1)
+    rows = pd.read_csv(path, dtype=str)
+    rows.loc[rows['district'] == 'Kochi', 'district'] = 'Kannur'
+    rows.to_csv(path, index=False)
+
+
+def remove_enrolment_state(root):
+    """Remove the first enrolment file and Kerala's rows from the rest: Kerala's pincodes leave the sketches."""
+    raw_file(root, 'enrolment', 0).unlink()
+    for index in range(1, len(FILE_DAYS)):
+        path = raw_file(root, 'enrolment', index)
+        rows = pd.read_csv(path, dtype=str)
+        rows[rows['state'] != 'Kerala'].to_csv(path, index=False)
+
+
+# The shared changes, plus changes to the sketched (enrolment) files themselves
+SKETCH_CHANGES = {**CHANGES, 'changed enrolment file': relabel_enrolment_district,
+                  'removed enrolment file': remove_enrolment_state}
+
+
+@pytest.mark.parametrize('change', list(SKETCH_CHANGES))
+def test_stored_sketches_after_incremental_sync_match_full_rebuild(raw_tree, change):
+    root, rebuild = raw_tree
+    sync_all()
+    SKETCH_CHANGES[change](root)
+    sync_all()
+    incremental = load_sketches('enrolment')
+
+    rebuild()
+    sync_all()
+    expected = load_sketches('enrolment')
+
+    assert set(incremental) == set(expected) == {'pincode', 'district'}
+    for col in expected:
+        assert_same_rows(incremental[col], expected[col])
+
+
+def test_chunked_sketches_match_stored_sketches(raw_tree):
+    sync_all()
+    stored = load_sketches('enrolment')
+    _, chunked = load_chunked_rollups(chunk_mb=0.01)
+
+    for col in stored:
+        assert_same_rows(chunked['enrolment'][col], stored[col])
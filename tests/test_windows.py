@@ -0,0 +1,41 @@
+"""Incremental runs of the rolling-window state (windows.py) against full replays."""
+
+import re
+import pytest
+from breakthrough_innovations import load_inputs
+from conftest import CHANGES, NEW_FILE_DAYS, assert_same_rows
+from ingestion import sync_all
+from windows import WINDOWS, update_windows
+
+
+def run(incremental):
+    """Ingest raw_data/ and bring the window state up to the last day."""
+    sync_all()
+    return update_windows(load_inputs(incremental)['pincode_daily'], incremental)
+
+
+@pytest.mark.parametrize('change', list(CHANGES))
+def test_incremental_matches_full_replay(raw_tree, change):
+    root, rebuild = raw_tree
+    run(incremental=False)
+    CHANGES[change](root)
+    windows = run(incremental=True)
+
+    rebuild()
+    expected = run(incremental=False)
+
+    assert windows.last_day == expected.last_day
+    for length in WINDOWS:
+        assert_same_rows(windows.district_sums(length), expected.district_sums(length))
+        assert windows.state_pincodes(length).equals(expected.state_pincodes(length))
+
+
+def test_new_days_are_pushed_without_replay(raw_tree, capsys):
+    root, _ = raw_tree
+    run(incremental=False)
+    CHANGES['new file'](root)
+    capsys.readouterr()
+    run(incremental=True)
+
+    pushed = int(re.search(r'\((\d+) day\(s\) pushed\)', capsys.readouterr().out).group(1))
+    assert pushed == NEW_FILE_DAYS[1] - NEW_FILE_DAYS[0]
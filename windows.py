@@ -0,0 +1,266 @@
+"""
+📅 ROLLING WINDOWS
+Aadhaar Life Cycle Intelligence Platform
+
+Sliding 7, 30 and 90 day sums behind the recent-change versions of the
+migration index, desert scores and SDG sub-scores:
+
+    processed_data/district_windows.parquet  - per (window, district)
+    processed_data/state_windows.parquet     - per (window, state)
+
+RollingWindows keeps a ring of the last 90 days of per-district daily sums
+and per-pincode enrolment activity. Moving forward one day adds the new day
+to every window and subtracts the day leaving it, so a day costs
+O(districts + pincodes) however long the history is. The state is saved in
+processed_data/rolling_windows.npz; an incremental run replays only the days
+after the last one it saw. New districts and pincodes are added to the saved
+axes in place with an empty history; the last 90 days are replayed only when
+data inside that horizon changed or a district or pincode disappeared.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+from ingestion import PROCESSED_PATH
+
+# Window lengths in days
+WINDOWS = (7, 30, 90)
+
+# Per-district columns summed over each window
+WINDOW_COLUMNS = ['total_enrol', 'age_5_17', 'age_18_greater', 'enrol_rows', 'total_demo', 'demo_rows']
+
+STATE_PATH = PROCESSED_PATH / 'rolling_windows.npz'
+
+
+def _days(dates):
+    """Day numbers (days since the epoch) of a datetime array."""
+    return dates.astype('datetime64[D]').astype(np.int64)
+
+
+def fact_dimensions(facts):
+    """
+    District and pincode axes of the window state.
+
+    Returns (districts, pincodes): the (state, district) name of each
+    district_id, and the sorted (district_id << 20 | pincode) keys of every
+    pincode row in the fact table.
+    """
+    ids, first = np.unique(facts['district_id'].to_numpy(), return_index=True)
+    districts = facts[['state', 'district']].iloc[first].astype(str).reset_index(drop=True)
+    if not np.array_equal(ids, np.arange(len(ids))):
+        raise ValueError("Fact table district_id values are not dense surrogate keys")
+    pincodes = np.unique((facts['district_id'].to_numpy().astype(np.int64) << 20) | facts['pincode'].to_numpy())
+    return districts, pincodes
+
+
+class RollingWindows:
+    """
+    Window sums over a ring of daily per-district aggregates.
+
+    sums[i] holds the WINDOW_COLUMNS totals of each district over the last
+    windows[i] days up to last_day; active_days[i] counts the days each
+    pincode had enrolment rows in that window.
+    """
+
+    def __init__(self, districts, pincodes, windows=WINDOWS):
+        self.windows = tuple(windows)
+        self.horizon = max(self.windows)
+        self.districts = districts
+        self.pincodes = pincodes
+        self._clear()
+
+    def _clear(self):
+        """Empty every window."""
+        self.ring_days = np.full(self.horizon, -1, dtype=np.int64)
+        self.ring = np.zeros((self.horizon, len(self.districts), len(WINDOW_COLUMNS)), dtype=np.int64)
+        self.ring_active = np.zeros((self.horizon, len(self.pincodes)), dtype=bool)
+        self.sums = np.zeros((len(self.windows), len(self.districts), len(WINDOW_COLUMNS)), dtype=np.int64)
+        self.active_days = np.zeros((len(self.windows), len(self.pincodes)), dtype=np.int32)
+        self.last_day = None
+
+    def _step(self, day, daily, active):
+        """Add one day to every window and drop the day each window leaves behind."""
+        for i, length in enumerate(self.windows):
+            slot = (day - length) % self.horizon
+            if self.ring_days[slot] == day - length:
+                self.sums[i] -= self.ring[slot]
+                self.active_days[i] -= self.ring_active[slot]
+            self.sums[i] += daily
+            self.active_days[i] += active
+        slot = day % self.horizon
+        self.ring_days[slot] = day
+        self.ring[slot] = daily
+        self.ring_active[slot] = active
+        self.last_day = day
+
+    def push(self, day, daily, active):
+        """
+        Slide the windows forward to day (after last_day).
+
+        daily is a (districts x WINDOW_COLUMNS) array and active a boolean per
+        pincode. Calendar days without data in between are pushed as zeros.
+        """
+        if self.last_day is not None and day <= self.last_day:
+            raise ValueError(f"Day {day} does not follow the last day pushed ({self.last_day})")
+        if self.last_day is not None and day - self.last_day > self.horizon:
+            self._clear()
+        if self.last_day is not None:
+            for gap in range(self.last_day + 1, day):
+                self._step(gap, 0, False)
+        self._step(day, daily, active)
+
+    def replay(self, facts, start_day):
+        """
+        Push every day from start_day to the last day of the (date-sorted) fact table.
+
+        Returns the number of days with data pushed.
+        """
+        days = _days(facts['date'].to_numpy())
+        lo = np.searchsorted(days, start_day)
+        facts, days = facts.iloc[lo:], days[lo:]
+        if len(days) == 0:
+            return 0
+        district = facts['district_id'].to_numpy()
+        pincode = np.searchsorted(self.pincodes, (district.astype(np.int64) << 20) | facts['pincode'].to_numpy())
+        values = facts[WINDOW_COLUMNS].to_numpy(dtype=np.int64)
+        enrolled = facts['enrol_rows'].to_numpy() > 0
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        starts, ends = np.r_[0, bounds], np.r_[bounds, len(days)]
+        for start, end in zip(starts, ends):
+            daily = np.zeros((len(self.districts), len(WINDOW_COLUMNS)), dtype=np.int64)
+            np.add.at(daily, district[start:end], values[start:end])
+            active = np.zeros(len(self.pincodes), dtype=bool)
+            active[pincode[start:end][enrolled[start:end]]] = True
+            self.push(int(days[start]), daily, active)
+        return len(starts)
+
+    def grow(self, districts, pincodes):
+        """
+        Move the state onto (larger) district and pincode axes.
+
+        Districts and pincodes already held keep their history at their new
+        positions (surrogate district ids shift when a district is inserted);
+        new ones start with zero history. Returns False, leaving the state
+        untouched, if a held district or pincode is not on the new axes.
+        """
+        if self.districts.equals(districts) and np.array_equal(self.pincodes, pincodes):
+            return True
+        district_map = pd.MultiIndex.from_frame(districts).get_indexer(pd.MultiIndex.from_frame(self.districts))
+        if (district_map < 0).any():
+            return False
+        moved = (district_map[self.pincodes >> 20].astype(np.int64) << 20) | (self.pincodes & ((1 << 20) - 1))
+        pincode_map = np.minimum(np.searchsorted(pincodes, moved), max(len(pincodes) - 1, 0))
+        if len(moved) and not np.array_equal(pincodes[pincode_map], moved):
+            return False
+
+        ring = np.zeros((self.horizon, len(districts), len(WINDOW_COLUMNS)), dtype=np.int64)
+        sums = np.zeros((len(self.windows), len(districts), len(WINDOW_COLUMNS)), dtype=np.int64)
+        ring_active = np.zeros((self.horizon, len(pincodes)), dtype=bool)
+        active_days = np.zeros((len(self.windows), len(pincodes)), dtype=np.int32)
+        ring[:, district_map], sums[:, district_map] = self.ring, self.sums
+        ring_active[:, pincode_map], active_days[:, pincode_map] = self.ring_active, self.active_days
+        self.ring, self.sums, self.ring_active, self.active_days = ring, sums, ring_active, active_days
+        self.districts, self.pincodes = districts, pincodes
+        return True
+
+    def matches(self, facts, districts, pincodes):
+        """
+        True if the state has the same axes and the same days inside its horizon as facts.
+
+        Every slot of the horizon is compared per district and per pincode,
+        so a change that only moves volume between districts is caught.
+        """
+        if (self.last_day is None or not self.districts.equals(districts)
+                or not np.array_equal(self.pincodes, pincodes)):
+            return False
+        days = _days(facts['date'].to_numpy())
+        if len(days) == 0 or days[-1] < self.last_day:
+            return False
+        # Per-slot district sums and active pincodes of the horizon, from the facts and from the ring
+        lo, hi = np.searchsorted(days, [self.last_day - self.horizon + 1, self.last_day + 1])
+        recent = facts.iloc[lo:hi]
+        slot = days[lo:hi] % self.horizon
+        district = recent['district_id'].to_numpy()
+        expected = np.zeros_like(self.ring)
+        np.add.at(expected, (slot, district), recent[WINDOW_COLUMNS].to_numpy(dtype=np.int64))
+        enrolled = recent['enrol_rows'].to_numpy() > 0
+        pincode = np.searchsorted(self.pincodes, (district.astype(np.int64) << 20) | recent['pincode'].to_numpy())
+        expected_active = np.zeros_like(self.ring_active)
+        expected_active[slot[enrolled], pincode[enrolled]] = True
+
+        stale = self.ring_days < self.last_day - self.horizon + 1
+        held, held_active = self.ring.copy(), self.ring_active.copy()
+        held[stale], held_active[stale] = 0, False
+        return np.array_equal(expected, held) and np.array_equal(expected_active, held_active)
+
+    def district_sums(self, length):
+        """Per-district totals over the window of that many days, with distinct enrolling pincodes."""
+        i = self.windows.index(length)
+        out = self.districts.copy()
+        for j, col in enumerate(WINDOW_COLUMNS):
+            out[col] = self.sums[i, :, j]
+        out['unique_pincodes'] = np.bincount((self.pincodes >> 20)[self.active_days[i] > 0],
+                                             minlength=len(self.districts))
+        return out
+
+    def state_pincodes(self, length):
+        """Distinct pincodes with enrolment rows per state over the window."""
+        i = self.windows.index(length)
+        active = self.pincodes[self.active_days[i] > 0]
+        states = self.districts['state'].to_numpy()[active >> 20]
+        return pd.Series(active & ((1 << 20) - 1)).groupby(states).nunique()
+
+    def as_of(self):
+        """Last day covered by the windows, as a timestamp."""
+        return pd.Timestamp(np.datetime64(self.last_day, 'D')) if self.last_day is not None else None
+
+    def save(self, path=STATE_PATH):
+        """Write the state atomically (readers never see a half-written file)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        with open(tmp, 'wb') as f:
+            np.savez(f, windows=np.array(self.windows), last_day=np.int64(-1 if self.last_day is None else self.last_day),
+                     states=self.districts['state'].to_numpy(dtype=str),
+                     districts=self.districts['district'].to_numpy(dtype=str), pincodes=self.pincodes,
+                     ring_days=self.ring_days, ring=self.ring, ring_active=self.ring_active,
+                     sums=self.sums, active_days=self.active_days)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=STATE_PATH, windows=WINDOWS):
+        """Saved state, or None if missing or kept for other window lengths."""
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            if tuple(data['windows'].tolist()) != tuple(windows) or int(data['last_day']) < 0:
+                return None
+            districts = pd.DataFrame({'state': data['states'], 'district': data['districts']}).astype(str)
+            state = cls(districts, data['pincodes'], windows)
+            for name in ['ring_days', 'ring', 'ring_active', 'sums', 'active_days']:
+                setattr(state, name, data[name])
+            state.last_day = int(data['last_day'])
+        return state
+
+
+def update_windows(facts, incremental=False):
+    """
+    Window state brought up to the last day of the fact table.
+
+    Incremental runs resume from the saved state (grown onto any new
+    districts and pincodes) and push only the new days; otherwise (or when
+    the saved state no longer matches) the last 90 days are replayed. The
+    state is saved for the next run.
+    """
+    districts, pincodes = fact_dimensions(facts)
+    windows = RollingWindows.load() if incremental else None
+    if windows is not None and windows.grow(districts, pincodes) and windows.matches(facts, districts, pincodes):
+        start = windows.last_day + 1
+    else:
+        windows = RollingWindows(districts, pincodes)
+        last = _days(facts['date'].to_numpy()[-1:])
+        start = int(last[0]) - windows.horizon + 1 if len(last) else 0
+    pushed = windows.replay(facts, start)
+    windows.save()
+    if windows.last_day is not None:
+        print(f"   Windows as of {windows.as_of():%Y-%m-%d} ({pushed} day(s) pushed)")
+    return windows